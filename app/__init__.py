@@ -17,10 +17,21 @@ def create_app():
     login_manager.init_app(app)
     mail.init_app(app)
     
+    from app.utils.sqlite import init_sqlite
+    init_sqlite(app, db)
+    
+    if app.config.get('METRICS_ENABLED'):
+        from app.utils.metrics import init_metrics
+        init_metrics(app, db)
+    
+    from app.utils.fragment_cache import init_fragment_cache
+    init_fragment_cache(app)
+    
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
+    login_manager.blueprint_login_views['api_v1'] = None  # API clients get a 401, not a redirect
     
-    from app.models.user import User
+    from app.services.identity_service import IdentityService
     
     # Add datetime to Jinja2 globals
     @app.context_processor
@@ -33,18 +44,57 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return IdentityService.load_user(int(user_id))
     
     from app.controllers.auth import auth_bp
     from app.controllers.main import main_bp
     from app.controllers.projects import projects_bp
     from app.controllers.tasks import tasks_bp
     from app.controllers.meetings import meetings_bp
+    from app.controllers.notifications import notifications_bp
+    from app.controllers.search import search_bp
+    from app.controllers.exports import exports_bp
+    from app.controllers.api import api_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(projects_bp)
     app.register_blueprint(tasks_bp)
     app.register_blueprint(meetings_bp)
+    app.register_blueprint(notifications_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(exports_bp)
+    app.register_blueprint(api_bp)
+    
+    from app.commands import register_commands
+    register_commands(app)
+    
+    if app.config.get('RUN_BACKGROUND_JOBS'):
+        start_background_jobs(app)
+    
+    return app
+
+def start_background_jobs(app):
+    """Start the periodic jobs on daemon threads; returns the started jobs.
+    
+    Call this from one process only (`flask run-jobs` or the dev server),
+    or every job runs once per process.
+    """
+    from app.utils.background import start_periodic_job
+    from app.services.meeting_service import MeetingService
+    from app.services.mail_outbox import MailOutboxWorker
+    from app.services.retention_service import RetentionService
+    
+    jobs = [
+        start_periodic_job(app, 'meeting-sweeper', MeetingService.sweep_completed_meetings,
+                           app.config.get('MEETING_SWEEP_INTERVAL')),
+        start_periodic_job(app, 'meeting-reminders', MeetingService.send_due_reminders,
+                           app.config.get('REMINDER_INTERVAL')),
+        start_periodic_job(app, 'retention', RetentionService.apply,
+                           app.config.get('RETENTION_INTERVAL')),
+    ]
     
-    return app
\ No newline at end of file
+    for i in range(app.config.get('MAIL_WORKER_THREADS') or 0):
+        jobs.append(start_periodic_job(app, f'mail-worker-{i}', MailOutboxWorker.process_outbox,
+                                       app.config.get('MAIL_WORKER_INTERVAL')))
+    return [job for job in jobs if job is not None]
\ No newline at end of file
@@ -0,0 +1,175 @@
+import time
+import click
+from app import db
+
+def register_commands(app):
+    """Register maintenance commands on the `flask` CLI"""
+
+    @app.cli.command('repair-task-counters')
+    def repair_task_counters():
+        """Recompute the denormalized task counters on every project."""
+        from app.models.project import Project
+        updated = Project.refresh_task_counters()
+        db.session.commit()
+        click.echo(f'✅ Task counters recomputed for {updated} projects')
+
+    @app.cli.command('repair-notification-counters')
+    def repair_notification_counters():
+        """Recompute every user's unread notification counter."""
+        from app.services.notification_service import NotificationService
+        updated = NotificationService.refresh_unread_counts()
+        db.session.commit()
+        click.echo(f'✅ Unread notification counters recomputed for {updated} users')
+
+    @app.cli.command('reindex-search')
+    def reindex_search():
+        """Create the full-text search index and rebuild it from the database."""
+        from app.services.search_service import SearchService
+        count = SearchService.rebuild(db.session.connection())
+        db.session.commit()
+        click.echo(f'✅ Search index rebuilt with {count} entries')
+
+    @app.cli.command('import-data')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--pi', 'pi_username', required=True, help='Username of the PI who owns the imported projects.')
+    @click.option('--kind', type=click.Choice(['users', 'projects', 'tasks']),
+                  help='Row kind of a CSV file (defaults to the file name, e.g. tasks.csv).')
+    @click.option('--dry-run', is_flag=True, help='Validate only; write nothing.')
+    @click.option('--no-notify', is_flag=True, help='Skip notifications and emails.')
+    def import_data(path, pi_username, kind, dry_run, no_notify):
+        """Bulk import users, projects and tasks from a CSV or JSON file."""
+        from app.models.user import User
+        from app.services.import_service import ImportService
+        pi = User.query.filter_by(username=pi_username, role='pi').first()
+        if pi is None:
+            click.echo(f'❌ No PI with username {pi_username!r}')
+            raise SystemExit(1)
+        with open(path, encoding='utf-8') as source:
+            try:
+                data = ImportService.parse(source.read(), path, kind)
+            except ValueError as e:
+                click.echo(f'❌ {e}')
+                raise SystemExit(1)
+        started = time.perf_counter()
+        report = ImportService.run(data, pi, dry_run=dry_run, notify=not no_notify)
+        for error in report.errors[:50]:
+            click.echo(f'  {error}')
+        counts = ', '.join(f'{count} {name}' for name, count in report.counts.items())
+        if not report.ok:
+            click.echo(f'❌ {len(report.errors)} invalid rows; nothing imported ({counts} valid)')
+            raise SystemExit(1)
+        verb = 'validated' if dry_run else 'imported'
+        click.echo(f'✅ {counts} {verb} in {time.perf_counter() - started:.1f}s')
+
+    @app.cli.command('sweep-meetings')
+    @click.option('--interval', type=int, default=0,
+                  help='Keep running, sweeping every INTERVAL seconds.')
+    def sweep_meetings(interval):
+        """Mark past scheduled meetings as completed."""
+        from app.services.meeting_service import MeetingService
+        while True:
+            updated = MeetingService.sweep_completed_meetings()
+            click.echo(f'✅ {updated} meetings marked as completed')
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    @app.cli.command('send-reminders')
+    @click.option('--interval', type=int, default=0,
+                  help='Keep running, checking every INTERVAL seconds.')
+    def send_reminders(interval):
+        """Queue reminder emails for meetings starting within REMINDER_LEAD_HOURS."""
+        from app.services.meeting_service import MeetingService
+        while True:
+            queued = MeetingService.send_due_reminders()
+            click.echo(f'⏰ {queued} meeting reminders queued')
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    @app.cli.command('apply-retention')
+    @click.option('--notification-days', type=int, default=None,
+                  help='Delete read notifications older than this (defaults to NOTIFICATION_RETENTION_DAYS).')
+    @click.option('--archive-after-days', type=int, default=None,
+                  help='Archive completed projects idle this long (defaults to PROJECT_ARCHIVE_AFTER_DAYS).')
+    @click.option('--dry-run', is_flag=True, help='Only report what would be archived.')
+    def apply_retention(notification_days, archive_after_days, dry_run):
+        """Purge old read notifications and archive long-completed projects."""
+        from app.services.retention_service import RetentionService
+        if dry_run:
+            project_ids, _, _ = RetentionService.archivable_project_ids(archive_after_days)
+            click.echo(f"🗄️ {len(project_ids)} projects would be archived: {', '.join(map(str, project_ids)) or '-'}")
+            return
+        purged = RetentionService.purge_notifications(notification_days)
+        click.echo(f'✅ {purged} read notifications deleted')
+        archived = RetentionService.archive_projects(archive_after_days)
+        click.echo(f'🗄️ {archived} projects archived')
+
+    @app.cli.command('run-jobs')
+    def run_jobs():
+        """Run the periodic background jobs in this process until interrupted."""
+        from app import start_background_jobs
+        from app.services.mail_outbox import get_connection_pool
+        if app.config['RUN_BACKGROUND_JOBS']:
+            click.echo('❌ RUN_BACKGROUND_JOBS is set, so create_app() already started the jobs here')
+            raise SystemExit(1)
+        jobs = start_background_jobs(app)
+        click.echo(f"⏱️ Running {len(jobs)} background jobs: {', '.join(job.name for job in jobs)}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for job in jobs:
+                job.stop()
+            get_connection_pool().close_all()
+
+    @app.cli.command('mail-worker')
+    @click.option('--threads', type=int, default=None,
+                  help='Number of sender threads (defaults to MAIL_WORKER_THREADS).')
+    @click.option('--interval', type=int, default=None,
+                  help='Seconds between outbox polls (defaults to MAIL_WORKER_INTERVAL).')
+    @click.option('--once', is_flag=True, help='Drain the outbox once and exit.')
+    def mail_worker(threads, interval, once):
+        """Deliver queued emails from the outbox."""
+        from app.services.mail_outbox import MailOutboxWorker, get_connection_pool
+        from app.utils.background import start_periodic_job
+        if once:
+            sent = MailOutboxWorker.process_outbox()
+            get_connection_pool().close_all()
+            click.echo(f'✅ {sent} emails sent')
+            return
+        threads = threads or app.config['MAIL_WORKER_THREADS'] or 1
+        app.config['MAIL_WORKER_THREADS'] = threads
+        jobs = [start_periodic_job(app, f'mail-worker-{i}', MailOutboxWorker.process_outbox,
+                                   interval or app.config['MAIL_WORKER_INTERVAL'])
+                for i in range(threads)]
+        click.echo(f'📧 Mail worker running with {threads} threads')
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for job in jobs:
+                job.stop()
+            get_connection_pool().close_all()
+
+    @app.cli.command('check-query-plans')
+    @click.option('--verbose', is_flag=True, help='Print the plan of every query.')
+    def check_query_plans(verbose):
+        """EXPLAIN the queries behind the main pages; exit non-zero on full table scans."""
+        from app.utils.query_plans import check_query_plans as run_check
+        queries = run_check(app)
+        if not queries:
+            click.echo('⚠️  No queries captured; the database needs at least one PI with a project')
+            raise SystemExit(1)
+        failures = [query for query in queries if query.full_scans]
+        for query in queries:
+            if verbose or query.full_scans:
+                status = '❌' if query.full_scans else '✅'
+                click.echo(f'{status} {query.url}\n    {" ".join(query.statement.split())}')
+                for line in query.plan:
+                    click.echo(f'      {line}')
+        if failures:
+            tables = sorted({table for query in failures for table in query.full_scans})
+            click.echo(f'❌ {len(failures)} of {len(queries)} queries scan full tables: {", ".join(tables)}')
+            raise SystemExit(1)
+        click.echo(f'✅ {len(queries)} queries checked, no full table scans')
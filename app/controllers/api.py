@@ -0,0 +1,214 @@
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from flask import Blueprint, Response, request, abort, jsonify
+from flask_login import login_required, current_user
+from werkzeug.exceptions import HTTPException
+from app import db
+from app.models.project import Project
+from app.models.task import Task
+from app.models.meeting import Meeting, meeting_attendees
+from app.models.notification import Notification
+from app.utils.helpers import user_projects_query
+from app.utils.pagination import paginate_keyset
+
+try:
+    import msgpack
+except ImportError:  # msgpack responses are optional
+    msgpack = None
+
+api_bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+GZIP_MIN_BYTES = 1024
+
+class Resource:
+    """A listable model: the fields clients may select, the rows the user
+    may see, the keyset order, and the columns whose values version a row"""
+
+    def __init__(self, fields, scope, order_by, version, filters=None):
+        self.fields = fields
+        self.scope = scope
+        self.order_by = order_by
+        self.version = version
+        self.filters = filters or {}
+
+def _unread_filter(value):
+    """?unread=1 for unread notifications only, ?unread=0 for all of them"""
+    if value not in ('0', '1'):
+        raise ValueError(value)
+    return Notification.is_read.is_(False) if value == '1' else db.true()
+
+def _tasks_scope(user):
+    # Same rows as tasks.my_tasks
+    if user.is_pi():
+        return Task.query.join(Task.project).filter(Project.pi_id == user.id)
+    return Task.query.filter(Task.assigned_to_id == user.id)
+
+def _meetings_scope(user):
+    # Same rows as meetings.calendar, cancelled meetings included
+    if user.is_pi():
+        return Meeting.query.join(Meeting.project).filter(Project.pi_id == user.id)
+    return Meeting.query.join(meeting_attendees).filter(meeting_attendees.c.user_id == user.id)
+
+def _columns(model, names):
+    return {name: getattr(model, name) for name in names}
+
+RESOURCES = {
+    'projects': Resource(
+        fields=_columns(Project, ['id', 'title', 'project_id', 'description', 'start_date', 'end_date', 'status',
+                                  'funding_source', 'funding_amount', 'pi_id', 'task_count', 'todo_count',
+                                  'in_progress_count', 'completed_count', 'overdue_count', 'created_at',
+                                  'updated_at']),
+        scope=user_projects_query,
+        order_by=[Project.id],
+        version=[Project.updated_at],
+        filters={'status': lambda value: Project.status == value},
+    ),
+    'tasks': Resource(
+        fields=_columns(Task, ['id', 'title', 'description', 'status', 'priority', 'due_date', 'project_id',
+                               'assigned_to_id', 'created_by_id', 'created_at', 'updated_at', 'completed_at']),
+        scope=_tasks_scope,
+        order_by=[Task.id],
+        version=[Task.updated_at],
+        filters={'status': lambda value: Task.status == value,
+                 'project_id': lambda value: Task.project_id == int(value)},
+    ),
+    'meetings': Resource(
+        fields=dict(_columns(Meeting, ['id', 'title', 'agenda', 'meeting_date', 'duration_minutes', 'location',
+                                       'meeting_link', 'project_id', 'created_by_id', 'created_at', 'updated_at']),
+                    status=Meeting.effective_status_clause()),
+        scope=_meetings_scope,
+        order_by=[Meeting.meeting_date, Meeting.id],
+        # Past meetings read as completed before any row changes
+        version=[Meeting.updated_at, Meeting.effective_status_clause()],
+        filters={'project_id': lambda value: Meeting.project_id == int(value)},
+    ),
+    'notifications': Resource(
+        fields=_columns(Notification, ['id', 'title', 'message', 'notification_type', 'is_read', 'created_at',
+                                       'project_id', 'task_id', 'meeting_id']),
+        scope=lambda user: Notification.query.filter(Notification.user_id == user.id),
+        order_by=[Notification.id],
+        version=[Notification.is_read],
+        filters={'unread': _unread_filter},
+    ),
+}
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _selected_fields(resource):
+    """Field names from ?fields=, always including id; 400 for unknown names"""
+    requested = request.args.get('fields')
+    if not requested:
+        return list(resource.fields)
+    names = ['id'] + [name for name in dict.fromkeys(requested.split(',')) if name and name != 'id']
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown:
+        abort(400, description=f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def _body_format():
+    if msgpack is not None and request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES) \
+            in MSGPACK_MIMETYPES:
+        return 'msgpack'
+    return 'json'
+
+def _encode(payload, body_format):
+    if body_format == 'msgpack':
+        return msgpack.packb(payload), MSGPACK_MIMETYPES[0]
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8'), 'application/json'
+
+def _respond(payload_fn, etag, body_format):
+    """304 when the client holds etag, otherwise the encoded payload, gzipped when accepted"""
+    use_gzip = 'gzip' in request.accept_encodings
+    etags = (etag, etag + '-gzip')
+    if any(request.if_none_match.contains(candidate) for candidate in etags):
+        response = Response(status=304)
+        response.set_etag(etags[use_gzip])
+    else:
+        body, mimetype = _encode(payload_fn(), body_format)
+        use_gzip = use_gzip and len(body) >= GZIP_MIN_BYTES
+        if use_gzip:
+            body = gzip.compress(body, compresslevel=6)
+        response = Response(body, mimetype=mimetype)
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etags[use_gzip])
+    response.vary.update(('Accept', 'Accept-Encoding', 'Cookie'))
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def _rows(resource, fields, ids):
+    """Only the selected columns, for the given ids, in the given order"""
+    columns = [resource.fields[name].label(name) for name in fields]
+    id_column = resource.fields['id']
+    rows = {row.id: row for row in db.session.execute(db.select(*columns).where(id_column.in_(ids)))}
+    return [{name: _serialize(getattr(rows[row_id], name)) for name in fields} for row_id in ids if row_id in rows]
+
+def _version_tag(name, fields, body_format, keys, extra=''):
+    digest = hashlib.sha1(f'{name}|{",".join(fields)}|{body_format}|{extra}'.encode('utf-8'))
+    for key in keys:
+        digest.update(repr(tuple(key)).encode('utf-8'))
+    return digest.hexdigest()
+
+def _key_query(resource, query):
+    """The scoped query reduced to the id, order and version columns"""
+    key_columns = [resource.fields['id'].label('id')]
+    key_columns += [column.label(f'order_{i}') for i, column in enumerate(resource.order_by)]
+    key_columns += [column.label(f'version_{i}') for i, column in enumerate(resource.version)]
+    return query.with_entities(*key_columns)
+
+def _get_resource(name):
+    resource = RESOURCES.get(name)
+    if resource is None:
+        abort(404)
+    return resource
+
+@api_bp.route('/<name>')
+@login_required
+def list_resource(name):
+    """Keyset-paginated rows: ?fields=a,b, ?limit=, ?cursor= and the resource's filters"""
+    resource = _get_resource(name)
+    fields = _selected_fields(resource)
+    body_format = _body_format()
+    query = resource.scope(current_user)
+    for param, make_filter in resource.filters.items():
+        value = request.args.get(param)
+        if value:
+            try:
+                query = query.filter(make_filter(value))
+            except ValueError:
+                abort(400, description=f'Invalid {param}')
+
+    # Keys and versions first: a client that already has this page gets a
+    # 304 without the selected columns ever being read
+    order_by = [(column, lambda row, i=i: getattr(row, f'order_{i}'))
+                for i, column in enumerate(resource.order_by)]
+    page = paginate_keyset(_key_query(resource, query), order_by)
+    etag = _version_tag(name, fields, body_format, page.items, extra=page.next_cursor or '')
+    ids = [row.id for row in page.items]
+    return _respond(lambda: {'data': _rows(resource, fields, ids), 'next_cursor': page.next_cursor},
+                    etag, body_format)
+
+@api_bp.route('/<name>/<int:id>')
+@login_required
+def get_resource(name, id):
+    resource = _get_resource(name)
+    fields = _selected_fields(resource)
+    body_format = _body_format()
+    key = _key_query(resource, resource.scope(current_user)).filter(resource.fields['id'] == id).first()
+    if key is None:
+        abort(404)
+    etag = _version_tag(name, fields, body_format, [key])
+    return _respond(lambda: {'data': _rows(resource, fields, [id])[0]}, etag, body_format)
+
+@api_bp.errorhandler(HTTPException)
+def handle_http_error(error):
+    response = jsonify(error={'code': error.code, 'name': error.name, 'message': error.description})
+    response.status_code = error.code
+    return response
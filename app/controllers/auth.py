@@ -3,10 +3,18 @@ from flask_login import login_user, logout_user, current_user
 from app import db
 from app.models.user import User
 from app.forms.auth_forms import LoginForm, RegistrationForm
+from app.services.password_service import PasswordService, PasswordPoolFull
+from app.utils.write_queue import run_write
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
+def record_login(user_id, logged_in_at, password_hash=None):
+    user = db.session.get(User, user_id)
+    user.last_login = logged_in_at
+    if password_hash:
+        user.password_hash = password_hash  # upgraded to the current hashing policy
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -15,9 +23,13 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data):
-            user.last_login = datetime.utcnow()
-            db.session.commit()
+        try:
+            valid, new_hash = PasswordService.verify(user, form.password.data) if user else (False, None)
+        except PasswordPoolFull:
+            flash('Too many sign-ins right now. Please try again in a few seconds.', 'warning')
+            return render_template('auth/login.html', form=form), 503, {'Retry-After': '5'}
+        if valid:
+            run_write(record_login, user.id, datetime.utcnow(), new_hash)
             login_user(user)
             next_page = request.args.get('next')
             flash('Logged in successfully!', 'success')
@@ -0,0 +1,27 @@
+from datetime import date
+from flask import Blueprint, request, abort
+from flask_login import login_required, current_user
+from app.services.export_service import ExportService
+from app.utils.export import available_formats, export_response
+
+exports_bp = Blueprint('exports', __name__, url_prefix='/exports')
+
+EXPORTS = {
+    'tasks': ExportService.tasks,
+    'meetings': ExportService.meetings,
+    'funding': ExportService.funding,
+}
+
+@exports_bp.route('/<dataset>.<fmt>')
+@login_required
+def export(dataset, fmt):
+    """Stream a report over the PI's projects, optionally limited by ?project_id="""
+    if not current_user.is_pi():
+        abort(403)
+    if dataset not in EXPORTS or fmt not in available_formats():
+        abort(404)
+    
+    project_id = request.args.get('project_id', type=int)
+    header, rows = EXPORTS[dataset](current_user, project_id)
+    filename = f"{dataset}-{project_id or 'all'}-{date.today().isoformat()}"
+    return export_response(filename, header, rows, fmt)
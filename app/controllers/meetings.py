@@ -1,12 +1,17 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, make_response
 from flask_login import login_required, current_user
 from app import db
-from app.models.meeting import Meeting
+from app.models.meeting import Meeting, meeting_attendees
 from app.models.project import Project
 from app.models.user import User
 from app.forms.meeting_forms import MeetingForm
 from app.services.email_service import EmailService
 from app.services.notification_service import NotificationService
+from app.services.calendar_service import CalendarService
+from app.utils.pagination import paginate_keyset, render_keyset_page
+from app.utils.access import access_required, can_view_meeting
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.http import is_resource_modified
 from datetime import datetime, timedelta
 
 meetings_bp = Blueprint('meetings', __name__, url_prefix='/meetings')
@@ -44,12 +49,14 @@ def create_meeting(project_id):
             meeting.attendees = attendees
         
         db.session.add(meeting)
+        db.session.flush()  # Get the meeting ID
+        if meeting.attendees:
+            NotificationService.create_meeting_notification(meeting, meeting.attendees)
         db.session.commit()
         
         # Send email invitations
         if meeting.attendees:
             EmailService.send_meeting_invitation_email(meeting, meeting.attendees)
-            NotificationService.create_meeting_notification(meeting, meeting.attendees)
         
         flash('Meeting scheduled successfully!', 'success')
         return redirect(url_for('projects.view_project', id=project_id))
@@ -58,13 +65,13 @@ def create_meeting(project_id):
 
 @meetings_bp.route('/<int:id>')
 @login_required
+@access_required(can_view_meeting)
 def view_meeting(id):
-    meeting = Meeting.query.get_or_404(id)
-    
-    # Check permissions
-    if (meeting.project.pi_id != current_user.id and 
-        current_user not in meeting.attendees):
-        abort(403)
+    meeting = Meeting.query.options(
+        joinedload(Meeting.project),
+        joinedload(Meeting.creator),
+        selectinload(Meeting.attendees)
+    ).get_or_404(id)
     
     return render_template('meetings/view.html', meeting=meeting)
 
@@ -79,13 +86,10 @@ def edit_meeting(id):
     
     form = MeetingForm(project=meeting.project, obj=meeting)
     if form.validate_on_submit():
+        # populate_obj assigns the field's data to meeting.attendees, so it must hold users, not ids
+        form.attendees.data = User.query.filter(User.id.in_(form.attendees.data)).all()
         form.populate_obj(meeting)
         
-        # Update attendees
-        if form.attendees.data:
-            attendees = User.query.filter(User.id.in_(form.attendees.data)).all()
-            meeting.attendees = attendees
-        
         db.session.commit()
         flash('Meeting updated successfully!', 'success')
         return redirect(url_for('meetings.view_meeting', id=meeting.id))
@@ -98,31 +102,24 @@ def edit_meeting(id):
 @meetings_bp.route('/calendar')
 @login_required
 def calendar():
-    # Auto-update completed meetings
-    completed_meetings = Meeting.query.filter(
-        Meeting.meeting_date < datetime.now(),
-        Meeting.status == 'scheduled'
-    ).all()
-    
-    for meeting in completed_meetings:
-        meeting.status = 'completed'
-    
-    if completed_meetings:
-        db.session.commit()
+    # Past meetings are shown as completed via Meeting.get_effective_status();
+    # the status column itself is updated by the background sweeper
     
     # Get user's meetings for calendar view
     if current_user.is_pi():
-        meetings = Meeting.query.join(Meeting.project)\
-                              .filter(Project.pi_id == current_user.id,
-                                    Meeting.status.in_(['scheduled', 'completed']))\
-                              .order_by(Meeting.meeting_date).all()
+        query = Meeting.query.join(Meeting.project)\
+                             .filter(Project.pi_id == current_user.id,
+                                     Meeting.status.in_(['scheduled', 'completed']))
     else:
-        meetings = Meeting.query.join(Meeting.attendees)\
-                              .filter(Meeting.attendees.contains(current_user),
-                                    Meeting.status.in_(['scheduled', 'completed']))\
-                              .order_by(Meeting.meeting_date).all()
+        query = Meeting.query.join(meeting_attendees)\
+                             .filter(meeting_attendees.c.user_id == current_user.id,
+                                     Meeting.status.in_(['scheduled', 'completed']))
     
-    return render_template('meetings/calendar.html', meetings=meetings)
+    page = paginate_keyset(query.options(joinedload(Meeting.project), selectinload(Meeting.attendees)),
+                           [(Meeting.meeting_date, lambda meeting: meeting.meeting_date),
+                            (Meeting.id, lambda meeting: meeting.id)])
+    
+    return render_keyset_page(page, 'meetings/calendar.html', 'meetings/_meeting_rows.html', 'meetings')
 
 @meetings_bp.route('/<int:id>/cancel', methods=['POST'])
 @login_required
@@ -137,4 +134,41 @@ def cancel_meeting(id):
     db.session.commit()
     
     flash('Meeting cancelled successfully!', 'success')
-    return redirect(url_for('meetings.calendar'))
\ No newline at end of file
+    return redirect(url_for('meetings.calendar'))
+
+@meetings_bp.route('/feed/<token>.ics')
+def calendar_feed(token):
+    """Subscribable iCalendar feed, authenticated by the token in the URL.
+
+    The ETag is derived from the user's calendar_version, so a client that
+    already has the current feed gets a 304 without any meeting query.
+    """
+    user = CalendarService.get_user_by_token(token)
+    if user is None:
+        abort(404)
+    
+    window = CalendarService.feed_window(request.args.get('past', type=int),
+                                         request.args.get('future', type=int))
+    etag = CalendarService.etag(user, window)
+    last_modified = CalendarService.last_modified(user)
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response(CalendarService.get_feed(user, window))
+        response.mimetype = 'text/calendar'
+        response.headers['Content-Disposition'] = 'inline; filename="meetings.ics"'
+    else:
+        response = make_response('', 304)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # clients revalidate every poll, which costs one user lookup
+    return response
+
+@meetings_bp.route('/feed/regenerate', methods=['POST'])
+@login_required
+def regenerate_feed_token():
+    if current_user.calendar_token:
+        flash('Your calendar feed link has been reset. Update it in your calendar app.', 'success')
+    else:
+        flash('Your calendar feed link is ready.', 'success')
+    CalendarService.regenerate_token(current_user)
+    return redirect(url_for('main.profile'))
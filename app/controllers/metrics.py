@@ -0,0 +1,22 @@
+import hmac
+from flask import Blueprint, Response, current_app, request, abort
+from app.utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+LOOPBACK_ADDRESSES = {'127.0.0.1', '::1'}
+
+def _is_local_request():
+    """Direct from this host; a request relayed by a local reverse proxy does not count"""
+    return request.remote_addr in LOOPBACK_ADDRESSES and 'X-Forwarded-For' not in request.headers
+
+@metrics_bp.route('/metrics')
+def export_metrics():
+    """Prometheus scrape endpoint: bearer token when METRICS_TOKEN is set, otherwise loopback only"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+    elif not _is_local_request():
+        abort(403)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,182 @@
+import json
+import time
+from flask import Blueprint, Response, current_app, jsonify, request, abort, flash, redirect, url_for
+from flask_login import login_required, current_user
+from sqlalchemy import func
+from app import db
+from app.models.user import User
+from app.models.notification import Notification
+from app.services.notification_broker import broker
+from app.services.notification_service import NotificationService
+from app.utils.pagination import paginate_keyset, render_keyset_page, wants_json
+from app.utils.write_queue import run_write
+
+notifications_bp = Blueprint('notifications', __name__, url_prefix='/notifications')
+
+# Upper bound on rows pushed per wake-up; older ones remain on the dashboard
+MAX_PUSHED_NOTIFICATIONS = 20
+
+def get_unread_state(user_id):
+    """Unread count and newest notification id for user in one query.
+
+    Reads the counter column rather than current_user, which may be a
+    cached identity, since streams and polls outlive the request that
+    loaded it.
+    """
+    latest_id = db.select(func.max(Notification.id))\
+                  .where(Notification.user_id == user_id).scalar_subquery()
+    state = db.session.query(User.unread_notification_count, latest_id).filter(User.id == user_id).first()
+    count, latest_id = state or (0, 0)
+    return count or 0, latest_id or 0
+
+def get_notifications_after(user_id, after_id):
+    return Notification.query.filter(Notification.user_id == user_id,
+                                     Notification.id > after_id)\
+                             .order_by(Notification.id.desc())\
+                             .limit(MAX_PUSHED_NOTIFICATIONS).all()[::-1]
+
+def format_sse(event, data, event_id=None):
+    message = f'event: {event}\ndata: {json.dumps(data)}\n'
+    if event_id is not None:
+        message = f'id: {event_id}\n' + message
+    return message + '\n'
+
+@notifications_bp.route('/')
+@login_required
+def list_notifications():
+    """Notification center: the user's notifications, newest first; ?unread=1 for unread only"""
+    query = Notification.query.filter(Notification.user_id == current_user.id)
+    unread_only = request.args.get('unread', type=int) == 1
+    if unread_only:
+        query = query.filter(Notification.is_read.is_(False))
+    page = paginate_keyset(query, [(Notification.id, lambda notification: notification.id)], descending=True)
+    return render_keyset_page(page, 'notifications/list.html', 'notifications/_notification_rows.html',
+                              'notifications', unread_only=unread_only)
+
+def _requested_ids():
+    """Notification ids to mark from the form (`ids`) or a JSON body, or
+    None for all of them (`all`); 400 on anything else"""
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            abort(400)
+        if body.get('all') is True:
+            return None
+        ids = body.get('ids')
+        if not isinstance(ids, list) or not all(type(value) is int for value in ids):
+            abort(400)
+    else:
+        if request.form.get('all'):
+            return None
+        ids = request.form.getlist('ids', type=int)
+    if len(ids) > current_app.config['MAX_PAGE_SIZE']:
+        abort(400)
+    return list(dict.fromkeys(ids))
+
+@notifications_bp.route('/mark-read', methods=['POST'])
+@login_required
+def mark_read():
+    """Mark the selected notifications, or all of them, as read with one UPDATE"""
+    ids = _requested_ids()
+    marked = run_write(NotificationService.mark_read, current_user.id, ids)
+    if wants_json() or request.is_json:
+        return jsonify(marked=marked, count=get_unread_state(current_user.id)[0])
+    if marked:
+        flash(f'{marked} notification{"s" if marked != 1 else ""} marked as read.', 'success')
+    return redirect(url_for('notifications.list_notifications', unread=request.args.get('unread')))
+
+@notifications_bp.route('/unread-count')
+@login_required
+def unread_count():
+    count, latest_id = get_unread_state(current_user.id)
+    response = jsonify(count=count, latest_id=latest_id)
+    response.set_etag(f'{current_user.id}-{count}-{latest_id}')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@notifications_bp.route('/stream')
+@login_required
+def stream():
+    """Server-Sent Events stream of new notifications for the current user.
+
+    Each open stream holds a worker thread, so at most NOTIFICATION_MAX_STREAMS
+    are served per process; beyond that the client gets a 503 and polls instead.
+    """
+    if not current_app.config['NOTIFICATION_STREAM_ENABLED']:
+        abort(404)
+
+    app = current_app._get_current_object()
+    user_id = current_user.id
+    wakeup = broker.subscribe(user_id, limit=app.config['NOTIFICATION_MAX_STREAMS'])
+    if wakeup is None:
+        response = Response('Too many open notification streams', status=503, mimetype='text/plain')
+        response.headers['Retry-After'] = str(app.config['NOTIFICATION_POLL_INTERVAL'])
+        return response
+
+    count, latest_id = get_unread_state(user_id)
+    last_id = request.headers.get('Last-Event-ID', type=int) or latest_id
+    poll_interval = app.config['NOTIFICATION_POLL_INTERVAL']
+    deadline = time.monotonic() + app.config['NOTIFICATION_STREAM_TIMEOUT']
+
+    def generate(last_id):
+        yield 'retry: 3000\n\n'
+        yield format_sse('unread', {'count': count}, last_id)
+        while time.monotonic() < deadline:
+            # Woken immediately by in-process publishes; the timeout covers
+            # notifications committed by other worker processes
+            woken = wakeup.wait(poll_interval)
+            wakeup.clear()
+            with app.app_context():
+                notifications = get_notifications_after(user_id, last_id)
+                payload = [notification.to_dict() for notification in notifications]
+                unread = get_unread_state(user_id)[0] if payload else None
+            if payload:
+                last_id = payload[-1]['id']
+                yield format_sse('notifications', {'notifications': payload, 'count': unread}, last_id)
+            elif not woken:
+                yield ': keep-alive\n\n'
+
+    response = Response(generate(last_id), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs however the response ends, even if the generator never started
+    response.call_on_close(lambda: broker.unsubscribe(user_id, wakeup))
+    return response
+
+@notifications_bp.route('/poll')
+@login_required
+def poll():
+    """Long-polling fallback: waits until notifications newer than `after` exist.
+
+    Waiting shares the NOTIFICATION_MAX_STREAMS budget with streams; when it
+    is used up the poll answers at once and `wait` tells the client how many
+    seconds to pause before polling again.
+    """
+    user_id = current_user.id
+    after = request.args.get('after', type=int)
+    if after is None:
+        after = get_unread_state(user_id)[1]
+
+    wait = 0
+    notifications = get_notifications_after(user_id, after)
+    if not notifications:
+        wakeup = broker.subscribe(user_id, limit=current_app.config['NOTIFICATION_MAX_STREAMS'])
+        if wakeup is None:
+            wait = current_app.config['NOTIFICATION_POLL_INTERVAL']
+        else:
+            try:
+                # Release the connection while waiting so the pool is not pinned
+                db.session.remove()
+                deadline = time.monotonic() + current_app.config['NOTIFICATION_LONGPOLL_TIMEOUT']
+                while not notifications and time.monotonic() < deadline:
+                    wakeup.wait(min(current_app.config['NOTIFICATION_POLL_INTERVAL'],
+                                    max(deadline - time.monotonic(), 0)))
+                    wakeup.clear()
+                    notifications = get_notifications_after(user_id, after)
+            finally:
+                broker.unsubscribe(user_id, wakeup)
+
+    count = get_unread_state(user_id)[0]
+    return jsonify(notifications=[notification.to_dict() for notification in notifications],
+                   count=count,
+                   after=notifications[-1].id if notifications else after,
+                   wait=wait)
@@ -1,20 +1,30 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, jsonify
 from flask_login import login_required, current_user
 from app import db
 from app.models.project import Project
+from app.models.task import Task
+from app.models.meeting import Meeting
 from app.models.user import User
-from app.forms.project_forms import ProjectForm
-from app.utils.helpers import get_user_projects
+from app.models.archived_project import ArchivedProject
+from app.forms.project_forms import ProjectForm, ImportForm
+from app.utils.helpers import user_projects_query
+from app.utils.pagination import paginate_keyset, render_keyset_page, wants_json
+from app.utils.access import access_required, can_view_project
+from app.utils.export import available_formats
 from app.services.email_service import EmailService
 from app.services.notification_service import NotificationService
+from app.services.import_service import ImportService
+from sqlalchemy.orm import joinedload, selectinload, defer
 
 projects_bp = Blueprint('projects', __name__, url_prefix='/projects')
 
 @projects_bp.route('/')
 @login_required
 def list_projects():
-    projects = get_user_projects(current_user)
-    return render_template('projects/list.html', projects=projects)
+    page = paginate_keyset(user_projects_query(current_user).options(selectinload(Project.team_members)),
+                           [(Project.id, lambda project: project.id)])
+    return render_keyset_page(page, 'projects/list.html', 'projects/_project_cards.html', 'projects',
+                              export_formats=available_formats())
 
 @projects_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -44,28 +54,91 @@ def create_project():
             team_members = User.query.filter(User.id.in_(form.team_members.data)).all()
             project.team_members = team_members
         
+        # Notify team members in the same transaction as the project
+        if project.team_members:
+            NotificationService.create_project_assignment_notifications(project, project.team_members)
+        
         db.session.commit()
         flash('Project created successfully!', 'success')
         
         # Send welcome emails to team members
         if project.team_members:
             EmailService.send_project_assignment_email(project, project.team_members)
-            NotificationService.create_project_assignment_notifications(project, project.team_members)
         
         return redirect(url_for('projects.view_project', id=project.id))
     
     return render_template('projects/create.html', form=form)
 
+@projects_bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_projects():
+    if not current_user.is_pi():
+        abort(403)
+    
+    form = ImportForm()
+    report = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            data = ImportService.parse(upload.read().decode('utf-8'), upload.filename, form.kind.data)
+        except (ValueError, UnicodeDecodeError) as e:
+            if wants_json():
+                return jsonify(error=str(e)), 400
+            flash(f'Could not read the file: {e}', 'danger')
+            return render_template('projects/import.html', form=form, report=None)
+        
+        report = ImportService.run(data, current_user, dry_run=form.dry_run.data)
+        if wants_json():
+            return jsonify(report.to_dict()), 200 if report.ok else 422
+        if report.ok and not form.dry_run.data:
+            counts = report.counts
+            flash(f"Imported {counts['users']} users, {counts['projects']} projects "
+                  f"and {counts['tasks']} tasks.", 'success')
+            return redirect(url_for('projects.list_projects'))
+    
+    return render_template('projects/import.html', form=form, report=report)
+
+@projects_bp.route('/archived')
+@login_required
+def list_archived():
+    """The PI's archived projects; the compressed payloads are not read"""
+    if not current_user.is_pi():
+        abort(403)
+    query = ArchivedProject.query.options(defer(ArchivedProject.payload))\
+                                 .filter(ArchivedProject.pi_id == current_user.id)
+    page = paginate_keyset(query, [(ArchivedProject.id, lambda archived: archived.id)])
+    return render_keyset_page(page, 'projects/archived_list.html', 'projects/_archived_rows.html', 'archived')
+
+@projects_bp.route('/archived/<int:id>')
+@login_required
+def view_archived(id):
+    """Read-only view of an archived project, unpacked from its payload"""
+    archived = ArchivedProject.query.get_or_404(id)
+    document = archived.load()
+    # Same audience as the live project: PIs and the team members
+    if not current_user.is_pi() and current_user.id not in document['members']:
+        abort(403)
+    names = {user['id']: user['name'] for user in document['users']}
+    return render_template('projects/archived.html', archived=archived, project=document['project'],
+                           tasks=document['tasks'], meetings=document['meetings'],
+                           members=[names.get(user_id, 'Unknown') for user_id in document['members']],
+                           names=names)
+
 @projects_bp.route('/<int:id>')
 @login_required
+@access_required(can_view_project)
 def view_project(id):
-    project = Project.query.get_or_404(id)
+    project = Project.query.options(
+        selectinload(Project.team_members),
+        selectinload(Project.meetings).selectinload(Meeting.attendees)
+    ).get_or_404(id)
     
-    # Check access permissions
-    if not current_user.is_pi() and current_user not in project.team_members:
-        abort(403)
+    # Called by the template only when the cached task table has to be re-rendered
+    def load_tasks():
+        return Task.query.options(joinedload(Task.assignee)).filter_by(project_id=project.id)\
+                         .order_by(Task.id).all()
     
-    return render_template('projects/view.html', project=project)
+    return render_template('projects/view.html', project=project, load_tasks=load_tasks)
 
 @projects_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -89,19 +162,24 @@ def edit_project(id):
         project.funding_amount = form.funding_amount.data
         
         # Update team members
+        previous_member_ids = {member.id for member in project.team_members}
         if form.team_members.data:
             team_members = User.query.filter(User.id.in_(form.team_members.data)).all()
             project.team_members = team_members
         else:
             project.team_members = []
+        new_members = [member for member in project.team_members
+                       if member.id not in previous_member_ids]
+        
+        if new_members:
+            NotificationService.create_project_assignment_notifications(project, new_members)
         
         db.session.commit()
         flash('Project updated successfully!', 'success')
         
         # Send emails to newly added team members
-        if project.team_members:
-            EmailService.send_project_assignment_email(project, project.team_members)
-            NotificationService.create_project_assignment_notifications(project, project.team_members)
+        if new_members:
+            EmailService.send_project_assignment_email(project, new_members)
         
         return redirect(url_for('projects.view_project', id=project.id))
     
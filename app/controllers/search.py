@@ -0,0 +1,35 @@
+from flask import Blueprint, render_template, request, jsonify, url_for
+from flask_login import login_required, current_user
+from app.services.search_service import SearchService, KIND_CODES
+from app.utils.pagination import get_page_size, wants_json
+
+search_bp = Blueprint('search', __name__)
+
+def result_url(result):
+    if result['kind'] == 'project':
+        return url_for('projects.view_project', id=result['id'])
+    if result['kind'] == 'meeting':
+        return url_for('meetings.view_meeting', id=result['id'])
+    return url_for('tasks.view_task', id=result['task_id'])
+
+@search_bp.route('/search')
+@login_required
+def search():
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('kind')
+    kind = kind if kind in KIND_CODES else None
+    limit = get_page_size()
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    results = SearchService.search(current_user, query, kind=kind, limit=limit + 1, offset=offset)
+    has_next = len(results) > limit
+    results = results[:limit]
+    for result in results:
+        result['url'] = result_url(result)
+    
+    if wants_json():
+        return jsonify(results=[dict(result, snippet=str(result['snippet'])) for result in results],
+                       next_offset=offset + limit if has_next else None)
+    
+    return render_template('search/results.html', query=query, kind=kind, results=results,
+                           offset=offset, limit=limit, has_next=has_next)
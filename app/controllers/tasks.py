@@ -6,19 +6,20 @@ from app.models.project import Project
 from app.forms.task_forms import TaskForm, TaskStatusForm
 from app.services.email_service import EmailService
 from app.services.notification_service import NotificationService
-from datetime import datetime
+from app.services.task_service import TaskService, TaskBatchError
+from app.utils.pagination import paginate_keyset, render_keyset_page
+from app.utils.access import access_required, can_view_project, can_view_task
+from app.utils.write_queue import run_write
+from sqlalchemy.orm import joinedload, selectinload
 
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/tasks')
 
 @tasks_bp.route('/project/<int:project_id>/create', methods=['GET', 'POST'])
 @login_required
+@access_required(can_view_project, 'project_id')
 def create_task(project_id):
     project = Project.query.get_or_404(project_id)
     
-    # Check permissions
-    if not current_user.is_pi() and current_user not in project.team_members:
-        abort(403)
-    
     form = TaskForm(project=project)
     if form.validate_on_submit():
         # Ensure we have team members to assign to
@@ -37,12 +38,13 @@ def create_task(project_id):
         )
         
         db.session.add(task)
+        db.session.flush()  # Get the task ID
+        NotificationService.create_task_assignment_notification(task)
         db.session.commit()
         
         # Send email notification to assignee
         if task.assignee:
             EmailService.send_task_assignment_email(task, task.assignee)
-            NotificationService.create_task_assignment_notification(task)
         
         flash('Task created successfully!', 'success')
         return redirect(url_for('projects.view_project', id=project_id))
@@ -51,17 +53,23 @@ def create_task(project_id):
 
 @tasks_bp.route('/<int:id>')
 @login_required
+@access_required(can_view_task)
 def view_task(id):
-    task = Task.query.get_or_404(id)
-    
-    # Check permissions
-    if (not current_user.is_pi() and 
-        current_user not in task.project.team_members and 
-        task.assigned_to_id != current_user.id):
-        abort(403)
+    task = Task.query.options(
+        joinedload(Task.project),
+        joinedload(Task.assignee),
+        joinedload(Task.creator),
+        selectinload(Task.comments).joinedload(TaskComment.author)
+    ).get_or_404(id)
     
     return render_template('tasks/view.html', task=task)
 
+def set_task_status(task_id, user_id, status, comment):
+    TaskService.set_status(db.session.get(Task, task_id), status)
+    # The optional comment goes in the same transaction
+    if comment:
+        db.session.add(TaskComment(content=comment, task_id=task_id, user_id=user_id))
+
 @tasks_bp.route('/<int:id>/update-status', methods=['GET', 'POST'])
 @login_required
 def update_task_status(id):
@@ -74,23 +82,7 @@ def update_task_status(id):
     
     form = TaskStatusForm()
     if form.validate_on_submit():
-        old_status = task.status
-        task.status = form.status.data
-        
-        if form.status.data == 'completed' and old_status != 'completed':
-            task.completed_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        # Add comment if provided
-        if form.comment.data:
-            comment = TaskComment(
-                content=form.comment.data,
-                task_id=task.id,
-                user_id=current_user.id
-            )
-            db.session.add(comment)
-            db.session.commit()
+        run_write(set_task_status, task.id, current_user.id, form.status.data, form.comment.data)
         
         flash('Task status updated successfully!', 'success')
         return redirect(url_for('tasks.view_task', id=task.id))
@@ -98,26 +90,39 @@ def update_task_status(id):
     form.status.data = task.status
     return render_template('tasks/update_status.html', form=form, task=task)
 
+@tasks_bp.route('/batch', methods=['POST'])
+@login_required
+def batch_update():
+    """Apply many task changes in one transaction, e.g. a reorganized board.
+    
+    Takes a JSON body {"items": [{"id": 1, "status": "completed",
+    "comment": "..."}, ...]}; items may also set priority and
+    assigned_to_id. All items are applied or, with per-item errors, none.
+    JSON only, so browsers will not send it cross-site without a preflight.
+    """
+    if not request.is_json:
+        abort(415)
+    body = request.get_json(silent=True)
+    items = body.get('items') if isinstance(body, dict) else None
+    try:
+        result = run_write(TaskService.apply_batch, current_user.id, items)
+    except TaskBatchError as e:
+        db.session.rollback()
+        return jsonify(errors=e.errors), e.status_code
+    return jsonify(result)
+
+def add_task_comment(task_id, user_id, content):
+    db.session.add(TaskComment(content=content, task_id=task_id, user_id=user_id))
+
 @tasks_bp.route('/<int:id>/comment', methods=['POST'])
 @login_required
+@access_required(can_view_task)
 def add_comment(id):
     task = Task.query.get_or_404(id)
     
-    # Check permissions
-    if (not current_user.is_pi() and 
-        current_user not in task.project.team_members and 
-        task.assigned_to_id != current_user.id):
-        abort(403)
-    
     content = request.form.get('content')
     if content:
-        comment = TaskComment(
-            content=content,
-            task_id=task.id,
-            user_id=current_user.id
-        )
-        db.session.add(comment)
-        db.session.commit()
+        run_write(add_task_comment, task.id, current_user.id, content)
         flash('Comment added successfully!', 'success')
     
     return redirect(url_for('tasks.view_task', id=task.id))
@@ -127,11 +132,15 @@ def add_comment(id):
 def my_tasks():
     if current_user.is_pi():
         # PI sees all tasks from their projects
-        tasks = Task.query.join(Task.project).filter_by(pi_id=current_user.id)\
-                         .order_by(Task.due_date.asc()).all()
+        query = Task.query.join(Task.project).filter(Project.pi_id == current_user.id)
     else:
         # Team members see only their assigned tasks
-        tasks = Task.query.filter_by(assigned_to_id=current_user.id)\
-                         .order_by(Task.due_date.asc()).all()
+        query = Task.query.filter_by(assigned_to_id=current_user.id)
+    
+    # Tasks without a due date sort last; ix_task_assignee_due serves this order
+    page = paginate_keyset(query.options(joinedload(Task.project), joinedload(Task.assignee)),
+                           [(Task.due_date.is_(None), lambda task: task.due_date is None),
+                            (Task.due_date, lambda task: task.due_date),
+                            (Task.id, lambda task: task.id)])
     
-    return render_template('tasks/my_tasks.html', tasks=tasks)
\ No newline at end of file
+    return render_keyset_page(page, 'tasks/my_tasks.html', 'tasks/_task_rows.html', 'tasks')
\ No newline at end of file
@@ -1,5 +1,6 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, DateField, SelectField, FloatField, SubmitField, SelectMultipleField
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from wtforms import StringField, TextAreaField, DateField, SelectField, FloatField, SubmitField, SelectMultipleField, BooleanField
 from wtforms.validators import DataRequired, Length, NumberRange, ValidationError
 from app.models.project import Project
 from app.models.user import User
@@ -35,4 +36,15 @@ class ProjectForm(FlaskForm):
     
     def validate_end_date(self, end_date):
         if self.start_date.data and end_date.data < self.start_date.data:
-            raise ValidationError('End date cannot be before start date.')
\ No newline at end of file
+            raise ValidationError('End date cannot be before start date.')
+
+
+class ImportForm(FlaskForm):
+    file = FileField('CSV or JSON file', validators=[FileRequired(), FileAllowed(['csv', 'json'], 'CSV or JSON files only.')])
+    kind = SelectField('CSV rows are', choices=[
+        ('projects', 'Projects'),
+        ('tasks', 'Tasks'),
+        ('users', 'Users')
+    ])
+    dry_run = BooleanField('Validate only')
+    submit = SubmitField('Import')
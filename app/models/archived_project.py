@@ -0,0 +1,68 @@
+import json
+import zlib
+from datetime import date, datetime
+from app import db
+
+def _rehydrate(value):
+    """Dates and datetimes back from the ISO strings the payload stores"""
+    if isinstance(value, dict):
+        return {key: _rehydrate_field(key, item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rehydrate(item) for item in value]
+    return value
+
+def _rehydrate_field(key, value):
+    if isinstance(value, str) and key.endswith(('_at', '_date')):
+        return datetime.fromisoformat(value) if 'T' in value else date.fromisoformat(value)
+    return _rehydrate(value)
+
+class ArchivedProject(db.Model):
+    """A completed project moved out of the live tables.
+
+    The project, its team, tasks with comments and meetings with attendees
+    are kept as one zlib-compressed JSON document; the columns here are
+    only what listing and access checks need.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    # Live ids can be reused once the project row is gone, so the original is kept separately
+    original_id = db.Column(db.Integer, nullable=False, index=True)
+    project_id = db.Column(db.String(50), nullable=False, index=True)
+    title = db.Column(db.String(200), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    pi_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    meeting_count = db.Column(db.Integer, nullable=False, default=0)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    payload_size = db.Column(db.Integer, nullable=False)  # uncompressed bytes
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def pack(document):
+        """(compressed payload, uncompressed size) for a JSON-serializable document"""
+        raw = json.dumps(document, separators=(',', ':'),
+                         default=lambda value: value.isoformat()).encode('utf-8')
+        return zlib.compress(raw, 6), len(raw)
+
+    def load(self):
+        """The archived document, with dates restored"""
+        return _rehydrate(json.loads(zlib.decompress(self.payload)))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'original_id': self.original_id,
+            'project_id': self.project_id,
+            'title': self.title,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+            'pi_id': self.pi_id,
+            'task_count': self.task_count,
+            'comment_count': self.comment_count,
+            'meeting_count': self.meeting_count,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+    def __repr__(self):
+        return f'<ArchivedProject {self.project_id}>'
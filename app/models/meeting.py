@@ -4,7 +4,8 @@ from app import db
 # Association table for many-to-many relationship between meetings and attendees
 meeting_attendees = db.Table('meeting_attendees',
     db.Column('meeting_id', db.Integer, db.ForeignKey('meeting.id'), primary_key=True),
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Index('ix_meeting_attendees_user_id', 'user_id')
 )
 
 class Meeting(db.Model):
@@ -17,6 +18,12 @@ class Meeting(db.Model):
     meeting_link = db.Column(db.String(500))  # For virtual meetings
     status = db.Column(db.String(20), nullable=False, default='scheduled')  # scheduled, completed, cancelled
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Reminder bookkeeping: claimed by one scheduler run at a time, then marked as sent
+    reminder_sent_at = db.Column(db.DateTime)
+    reminder_claim_token = db.Column(db.String(32))
+    reminder_claimed_at = db.Column(db.DateTime)
     
     # Foreign keys
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
@@ -24,16 +31,65 @@ class Meeting(db.Model):
     
     # Relationships
     creator = db.relationship('User', backref='created_meetings')
-    attendees = db.relationship('User', secondary=meeting_attendees, lazy='subquery',
+    attendees = db.relationship('User', secondary=meeting_attendees, lazy='select',
                               backref=db.backref('meetings_attending', lazy=True))
     
+    __table_args__ = (
+        db.Index('ix_meeting_status_date', 'status', 'meeting_date'),
+        db.Index('ix_meeting_project_date', 'project_id', 'meeting_date'),
+    )
+    
+    def get_effective_status(self):
+        """Status as shown to users: past scheduled meetings read as completed
+        even before the background sweeper has persisted that."""
+        if self.status == 'scheduled' and self.meeting_date < datetime.now():
+            return 'completed'
+        return self.status
+    
+    @classmethod
+    def effective_status_clause(cls, now=None):
+        """SQL form of get_effective_status; without `now`, the time is taken when the statement runs"""
+        if now is None:
+            now = db.bindparam('now', callable_=datetime.now, type_=db.DateTime, unique=True)
+        return db.case(((cls.status == 'scheduled') & (cls.meeting_date < now), 'completed'),
+                       else_=cls.status)
+    
     def get_status_color(self):
         status_colors = {
             'scheduled': 'primary',
             'completed': 'success',
             'cancelled': 'danger'
         }
-        return status_colors.get(self.status, 'secondary')
+        return status_colors.get(self.get_effective_status(), 'secondary')
+    
+    @classmethod
+    def complete_past_meetings(cls, now=None):
+        """Mark every past scheduled meeting as completed with one set-based UPDATE"""
+        now = now or datetime.now()
+        return cls.query.filter(cls.meeting_date < now, cls.status == 'scheduled')\
+                        .update({cls.status: 'completed'}, synchronize_session=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'agenda': self.agenda,
+            'meeting_date': self.meeting_date.isoformat() if self.meeting_date else None,
+            'duration_minutes': self.duration_minutes,
+            'location': self.location,
+            'meeting_link': self.meeting_link,
+            'status': self.get_effective_status(),
+            'project_id': self.project_id,
+            'created_by_id': self.created_by_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
     
     def __repr__(self):
-        return f'<Meeting {self.title}>'
\ No newline at end of file
+        return f'<Meeting {self.title}>'
+
+@db.event.listens_for(Meeting.meeting_date, 'set')
+def _reset_reminder_on_reschedule(target, value, oldvalue, initiator):
+    """A meeting moved to another time gets a fresh reminder"""
+    if target.reminder_sent_at is not None and value != oldvalue:
+        target.reminder_sent_at = None
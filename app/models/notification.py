@@ -21,5 +21,22 @@ class Notification(db.Model):
     task = db.relationship('Task', backref='notifications')
     meeting = db.relationship('Meeting', backref='notifications')
     
+    __table_args__ = (
+        db.Index('ix_notification_user_read_created', 'user_id', 'is_read', 'created_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'message': self.message,
+            'notification_type': self.notification_type,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'project_id': self.project_id,
+            'task_id': self.task_id,
+            'meeting_id': self.meeting_id
+        }
+    
     def __repr__(self):
         return f'<Notification {self.title}>'
\ No newline at end of file
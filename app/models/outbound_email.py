@@ -0,0 +1,33 @@
+import json
+from datetime import datetime
+from app import db
+
+class OutboundEmail(db.Model):
+    """Durable outbox row; delivered asynchronously by the mail worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)  # JSON list of addresses
+    html_body = db.Column(db.Text)
+    text_body = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbound_email_status_next_attempt', 'status', 'next_attempt_at'),
+        db.Index('ix_outbound_email_claim_token', 'claim_token'),
+    )
+
+    def get_recipients(self):
+        return json.loads(self.recipients)
+
+    def set_recipients(self, recipients):
+        self.recipients = json.dumps(list(recipients))
+
+    def __repr__(self):
+        return f'<OutboundEmail {self.id} {self.status}>'
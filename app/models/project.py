@@ -1,10 +1,12 @@
-from datetime import datetime
+from datetime import datetime, date
+from sqlalchemy import select, func
 from app import db
 
 # Association table for many-to-many relationship between projects and team members
 project_members = db.Table('project_members',
     db.Column('project_id', db.Integer, db.ForeignKey('project.id'), primary_key=True),
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Index('ix_project_members_user_id', 'user_id')
 )
 
 class Project(db.Model):
@@ -20,21 +22,70 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Denormalized task counters, maintained by the Task mapper events
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+    todo_count = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    overdue_count = db.Column(db.Integer, nullable=False, default=0)
+    # Bumped with every task insert, update or delete; part of the fragment cache key
+    task_version = db.Column(db.Integer, nullable=False, default=0)
+    
     # Foreign keys
-    pi_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    pi_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     
     # Relationships
     tasks = db.relationship('Task', backref='project', lazy=True, cascade='all, delete-orphan')
     meetings = db.relationship('Meeting', backref='project', lazy=True, cascade='all, delete-orphan')
-    team_members = db.relationship('User', secondary=project_members, lazy='subquery',
+    team_members = db.relationship('User', secondary=project_members, lazy='select',
                                  backref=db.backref('assigned_projects', lazy=True))
     
     def get_progress_percentage(self):
-        total_tasks = len(self.tasks)
-        if total_tasks == 0:
+        if not self.task_count:
             return 0
-        completed_tasks = len([task for task in self.tasks if task.status == 'completed'])
-        return round((completed_tasks / total_tasks) * 100, 1)
+        return round((self.completed_count / self.task_count) * 100, 1)
+    
+    def get_task_counts(self):
+        return {
+            'total': self.task_count or 0,
+            'todo': self.todo_count or 0,
+            'in_progress': self.in_progress_count or 0,
+            'completed': self.completed_count or 0,
+            'overdue': self.overdue_count or 0
+        }
+    
+    @classmethod
+    def refresh_task_counters(cls, project_ids=None):
+        """Recompute the task counters from the task table in one UPDATE.
+        
+        Overdue counts drift as due dates pass without any task write, so this
+        is also meant to be run periodically (see `flask repair-task-counters`).
+        """
+        from app.models.task import Task
+        
+        def count_tasks(*criteria):
+            return select(func.count(Task.id))\
+                .where(Task.project_id == cls.id, *criteria)\
+                .scalar_subquery()
+        
+        stmt = db.update(cls).values(
+            task_count=count_tasks(),
+            todo_count=count_tasks(Task.status == 'todo'),
+            in_progress_count=count_tasks(Task.status == 'in_progress'),
+            completed_count=count_tasks(Task.status == 'completed'),
+            overdue_count=count_tasks(Task.status != 'completed', Task.due_date < date.today()),
+            task_version=cls.task_version + 1,
+            # Bookkeeping, not activity: keep updated_at out of onupdate's reach
+            updated_at=cls.updated_at
+        ).execution_options(synchronize_session=False)
+        if project_ids is not None:
+            stmt = stmt.where(cls.id.in_(project_ids))
+        return db.session.execute(stmt).rowcount
+    
+    def get_cache_version(self):
+        """Changes whenever the project row, its team or any of its tasks change"""
+        updated_at = self.updated_at.isoformat() if self.updated_at else ''
+        return f'{updated_at}-{self.task_version}'
     
     def get_status_color(self):
         status_colors = {
@@ -45,5 +96,29 @@ class Project(db.Model):
         }
         return status_colors.get(self.status, 'secondary')
     
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'project_id': self.project_id,
+            'description': self.description,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'status': self.status,
+            'funding_source': self.funding_source,
+            'funding_amount': self.funding_amount,
+            'pi_id': self.pi_id,
+            'progress': self.get_progress_percentage(),
+            'task_counts': self.get_task_counts(),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
     def __repr__(self):
-        return f'<Project {self.title}>'
\ No newline at end of file
+        return f'<Project {self.title}>'
+
+@db.event.listens_for(Project, 'before_update')
+def _touch_on_team_change(mapper, connection, target):
+    """Team changes only write project_members; touch updated_at so the project's version moves too"""
+    if db.inspect(target).attrs.team_members.history.has_changes():
+        target.updated_at = datetime.utcnow()
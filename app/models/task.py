@@ -1,25 +1,41 @@
-from datetime import datetime
+from datetime import datetime, date
 from app import db
+from app.models.project import Project
+
+# Project counter column maintained for each task status
+STATUS_COUNTERS = {
+    'todo': 'todo_count',
+    'in_progress': 'in_progress_count',
+    'completed': 'completed_count'
+}
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    status = db.Column(db.String(20), nullable=False, default='todo')  # todo, in_progress, completed
+    # active_history so the counter events always see the previous value
+    status = db.column_property(db.Column(db.String(20), nullable=False, default='todo'),
+                                active_history=True)  # todo, in_progress, completed
     priority = db.Column(db.String(20), nullable=False, default='medium')  # low, medium, high
-    due_date = db.Column(db.Date)
+    due_date = db.column_property(db.Column(db.Date), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
     
     # Foreign keys
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.column_property(db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False),
+                                    active_history=True)
     assigned_to_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
     # Relationships
     comments = db.relationship('TaskComment', backref='task', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_task_assigned_to_status', 'assigned_to_id', 'status'),
+        db.Index('ix_task_project_status', 'project_id', 'status'),
+    )
+    
     def get_status_color(self):
         status_colors = {
             'todo': 'secondary',
@@ -36,9 +52,84 @@ class Task(db.Model):
         }
         return priority_colors.get(self.priority, 'secondary')
     
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'status': self.status,
+            'priority': self.priority,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'project_id': self.project_id,
+            'assigned_to_id': self.assigned_to_id,
+            'created_by_id': self.created_by_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+    
     def __repr__(self):
         return f'<Task {self.title}>'
 
+# An assignee's tasks by due date, undated last: serves the "My Tasks" keyset pages
+# without sorting the whole list (an expression index, so it is declared here)
+db.Index('ix_task_assignee_due', Task.__table__.c.assigned_to_id, Task.__table__.c.due_date.is_(None),
+         Task.__table__.c.due_date, Task.__table__.c.id)
+
+def _is_overdue(status, due_date):
+    return status != 'completed' and due_date is not None and due_date < date.today()
+
+def _counter_deltas(status, due_date, sign):
+    """Counter adjustments for adding (sign=1) or removing (sign=-1) a task state"""
+    deltas = {'task_count': sign, 'task_version': 1}
+    if status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[status]] = sign
+    if _is_overdue(status, due_date):
+        deltas['overdue_count'] = sign
+    return deltas
+
+def _apply_counter_deltas(connection, project_id, deltas):
+    project_table = Project.__table__
+    values = {name: project_table.c[name] + delta for name, delta in deltas.items() if delta}
+    if values:
+        # Counter upkeep must not count as project activity for retention
+        connection.execute(project_table.update()
+                           .where(project_table.c.id == project_id)
+                           .values(updated_at=project_table.c.updated_at, **values))
+
+def _previous_value(target, key):
+    history = db.inspect(target).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, key)
+
+@db.event.listens_for(Task, 'after_insert')
+def _task_inserted(mapper, connection, target):
+    _apply_counter_deltas(connection, target.project_id,
+                          _counter_deltas(target.status, target.due_date, 1))
+
+@db.event.listens_for(Task, 'before_delete')
+def _task_deleted(mapper, connection, target):
+    _apply_counter_deltas(connection, target.project_id,
+                          _counter_deltas(target.status, target.due_date, -1))
+
+@db.event.listens_for(Task, 'after_update')
+def _task_updated(mapper, connection, target):
+    old_project_id = _previous_value(target, 'project_id')
+    removed = _counter_deltas(_previous_value(target, 'status'),
+                              _previous_value(target, 'due_date'), -1)
+    added = _counter_deltas(target.status, target.due_date, 1)
+    
+    if old_project_id != target.project_id:
+        _apply_counter_deltas(connection, old_project_id, removed)
+        _apply_counter_deltas(connection, target.project_id, added)
+    else:
+        deltas = dict(removed)
+        for name, delta in added.items():
+            deltas[name] = deltas.get(name, 0) + delta
+        deltas['task_version'] = 1
+        _apply_counter_deltas(connection, target.project_id, deltas)
+
 class TaskComment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
@@ -51,5 +142,9 @@ class TaskComment(db.Model):
     # Relationships
     author = db.relationship('User', backref='task_comments')
     
+    __table_args__ = (
+        db.Index('ix_task_comment_task_id', 'task_id'),
+    )
+    
     def __repr__(self):
         return f'<TaskComment {self.id}>'
\ No newline at end of file
@@ -1,6 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from datetime import datetime
 from app import db
 
@@ -9,20 +9,32 @@ class User(UserMixin, db.Model):
     title = db.Column(db.String(10), nullable=True, default='Mr')
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes need more than 128
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='team_member')  # 'pi' or 'team_member'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     
+    # iCalendar feed: secret URL token, and a version bumped whenever a meeting in the feed changes
+    calendar_token = db.Column(db.String(64), unique=True, index=True)
+    calendar_version = db.Column(db.Integer, nullable=False, default=0)
+    calendar_updated_at = db.Column(db.DateTime)
+    
+    # Unread notifications, kept in step by NotificationService so the navbar badge needs no COUNT
+    unread_notification_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Bumped by IdentityService whenever the user's cached identity goes stale, in every process
+    identity_version = db.Column(db.Integer, nullable=False, default=0)
+    
     # Relationships
     owned_projects = db.relationship('Project', backref='owner', lazy=True, foreign_keys='Project.pi_id')
     assigned_tasks = db.relationship('Task', backref='assignee', lazy=True, foreign_keys='Task.assigned_to_id')
     created_tasks = db.relationship('Task', backref='creator', lazy=True, foreign_keys='Task.created_by_id')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.services.password_service import PasswordService
+        self.password_hash = PasswordService.hash_password(password)
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -30,6 +42,18 @@ class User(UserMixin, db.Model):
     def is_pi(self):
         return self.role == 'pi'
     
+    def get_member_project_ids(self):
+        """Ids of projects the user is a team member of, loaded once per instance"""
+        if getattr(self, '_member_project_ids', None) is None:
+            from app.models.project import project_members
+            self._member_project_ids = frozenset(db.session.scalars(
+                db.select(project_members.c.project_id).where(project_members.c.user_id == self.id)
+            ))
+        return self._member_project_ids
+    
+    def is_member_of(self, project):
+        return project.id in self.get_member_project_ids()
+    
     def get_full_name(self):
         return f"{self.title} {self.first_name} {self.last_name}"
     
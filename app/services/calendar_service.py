@@ -0,0 +1,171 @@
+import hashlib
+import secrets
+from datetime import datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import inspect, or_
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.meeting import Meeting, meeting_attendees
+from app.utils.cache import TTLCache
+
+# Feeds only show the meeting fields below, so these are the changes that bump a user's calendar_version
+FEED_FIELDS = ('title', 'agenda', 'meeting_date', 'duration_minutes', 'location', 'meeting_link',
+               'status', 'project_id')
+
+UID_DOMAIN = 'pi-management'
+
+@db.event.listens_for(db.session, 'after_flush')
+def _bump_calendar_versions(session, flush_context):
+    """Bump calendar_version for the attendees (current and removed) and the
+    PI of every meeting whose feed entry a flush changed, in one UPDATE"""
+    user_ids, meeting_ids, project_ids = set(), set(), set()
+    for obj in session.new | session.dirty | session.deleted:
+        if not isinstance(obj, Meeting):
+            continue
+        state = inspect(obj)
+        attendees = state.attrs.attendees.history
+        if obj in session.dirty and not attendees.has_changes() and \
+                not any(state.attrs[field].history.has_changes() for field in FEED_FIELDS):
+            continue
+        # Loaded attendees cover removals and deleted meetings; the rows of
+        # surviving meetings are read back in the UPDATE below
+        user_ids.update(user.id for user in attendees.sum())
+        if obj not in session.deleted:
+            meeting_ids.add(obj.id)
+        project_ids.update(project_id for project_id in state.attrs.project_id.history.sum() if project_id)
+    if not user_ids and not project_ids:
+        return
+    attendee_ids = db.select(meeting_attendees.c.user_id).where(meeting_attendees.c.meeting_id.in_(meeting_ids))
+    pi_ids = db.select(Project.pi_id).where(Project.id.in_(project_ids))
+    session.execute(
+        db.update(User).where(or_(User.id.in_(user_ids), User.id.in_(attendee_ids), User.id.in_(pi_ids)))
+                       .values(calendar_version=User.calendar_version + 1, calendar_updated_at=datetime.utcnow())
+                       .execution_options(synchronize_session=False)
+    )
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')\
+               .replace('\r\n', '\\n').replace('\n', '\\n')
+
+def _fold(line):
+    """Split a content line into 75-octet pieces joined by CRLF + space (RFC 5545 3.1)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+def _timestamp(value):
+    return value.strftime('%Y%m%dT%H%M%S')
+
+class CalendarService:
+    """Per-user iCalendar feeds.
+
+    Every meeting change bumps User.calendar_version for the people whose
+    feed it appears in, so the version alone identifies a feed body: it is
+    the ETag, the key of the body cache, and lets clients polling with
+    If-None-Match get a 304 after a single user lookup.
+    """
+
+    @staticmethod
+    def get_cache(app=None):
+        app = app or current_app._get_current_object()
+        cache = app.extensions.get('calendar_cache')
+        if cache is None:
+            cache = app.extensions.setdefault('calendar_cache', TTLCache(
+                maxsize=app.config['CALENDAR_CACHE_SIZE'],
+                ttl=app.config['CALENDAR_CACHE_TTL']
+            ))
+        return cache
+
+    @staticmethod
+    def get_user_by_token(token):
+        return db.session.scalar(db.select(User).where(User.calendar_token == token))
+
+    @staticmethod
+    def regenerate_token(user):
+        """Issue a new feed token, which revokes the old feed URL"""
+        user.calendar_token = secrets.token_urlsafe(32)
+        db.session.commit()
+        return user.calendar_token
+
+    @staticmethod
+    def feed_window(past_days=None, future_days=None, today=None):
+        """(start, end) dates of the feed, with the requested days clamped to the configured maximum"""
+        config = current_app.config
+        past_days = min(max(past_days if past_days is not None else config['CALENDAR_FEED_PAST_DAYS'], 0),
+                        config['CALENDAR_FEED_PAST_DAYS'])
+        future_days = min(max(future_days if future_days is not None else config['CALENDAR_FEED_FUTURE_DAYS'], 0),
+                          config['CALENDAR_FEED_FUTURE_DAYS'])
+        today = today or datetime.now().date()
+        return today - timedelta(days=past_days), today + timedelta(days=future_days)
+
+    @staticmethod
+    def etag(user, window):
+        start, end = window
+        key = f'{user.id}:{user.calendar_version}:{start.isoformat()}:{end.isoformat()}'
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    @staticmethod
+    def last_modified(user):
+        return (user.calendar_updated_at or user.created_at).replace(microsecond=0)
+
+    @staticmethod
+    def _meetings(user, window):
+        """Column rows of the user's meetings in the window: every meeting of
+        their projects for a PI, the meetings they attend otherwise"""
+        start, end = window
+        statement = db.select(
+            Meeting.id, Meeting.title, Meeting.agenda, Meeting.meeting_date, Meeting.duration_minutes,
+            Meeting.location, Meeting.meeting_link, Meeting.status
+        ).where(Meeting.meeting_date >= datetime.combine(start, time.min),
+                Meeting.meeting_date < datetime.combine(end + timedelta(days=1), time.min))\
+         .order_by(Meeting.meeting_date, Meeting.id)
+        if user.is_pi():
+            statement = statement.join(Meeting.project).where(Project.pi_id == user.id)
+        else:
+            statement = statement.join(meeting_attendees)\
+                                 .where(meeting_attendees.c.user_id == user.id)
+        return db.session.execute(statement)
+
+    @staticmethod
+    def _render(user, window):
+        # DTSTAMP comes from the version's timestamp, not the clock, so one version always renders the same bytes
+        stamp = _timestamp(CalendarService.last_modified(user)) + 'Z'
+        lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//PI Management System//Meetings//EN',
+                 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', 'X-WR-CALNAME:PI Management meetings']
+        for meeting in CalendarService._meetings(user, window):
+            lines += ['BEGIN:VEVENT',
+                      f'UID:meeting-{meeting.id}@{UID_DOMAIN}',
+                      f'DTSTAMP:{stamp}',
+                      f'DTSTART:{_timestamp(meeting.meeting_date)}',
+                      f'DURATION:PT{meeting.duration_minutes or 60}M',
+                      f'SUMMARY:{_escape(meeting.title)}',
+                      'STATUS:CANCELLED' if meeting.status == 'cancelled' else 'STATUS:CONFIRMED']
+            if meeting.agenda:
+                lines.append(f'DESCRIPTION:{_escape(meeting.agenda)}')
+            if meeting.location:
+                lines.append(f'LOCATION:{_escape(meeting.location)}')
+            if meeting.meeting_link:
+                lines.append(f'URL:{meeting.meeting_link}')
+            lines.append('END:VEVENT')
+        lines.append('END:VCALENDAR')
+        return ('\r\n'.join(_fold(line) for line in lines) + '\r\n').encode('utf-8')
+
+    @staticmethod
+    def get_feed(user, window):
+        """Feed body for the user's current calendar_version, rendered once per version and window"""
+        cache = CalendarService.get_cache()
+        key = (user.id, user.calendar_version, window)
+        body = cache.get(key)
+        if body is None:
+            body = CalendarService._render(user, window)
+            cache.set(key, body)
+        return body
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models.project import Project, project_members
+from app.models.task import Task
+from app.models.meeting import Meeting
+from app.models.notification import Notification
+from app.utils.helpers import user_projects_query
+
+PENDING_STATUSES = ['todo', 'in_progress']
+
+# SQL aggregates behind calculate_project_stats, in the order of its keys
+PROJECT_STATS = (
+    ('total_projects', func.count(Project.id)),
+    ('active_projects', func.sum(case((Project.status == 'active', 1), else_=0))),
+    ('completed_projects', func.sum(case((Project.status == 'completed', 1), else_=0))),
+    ('total_funding', func.sum(Project.funding_amount)),
+)
+
+class DashboardService:
+    """Dashboard figures computed with a fixed number of grouped queries"""
+
+    @staticmethod
+    def get_project_stats(user):
+        """Project counts and funding totals for the user's projects"""
+        values = user_projects_query(user).with_entities(
+            *[aggregate for _, aggregate in PROJECT_STATS]
+        ).one()
+        return {key: value or 0 for (key, _), value in zip(PROJECT_STATS, values)}
+
+    @staticmethod
+    def count_team_members(user):
+        """Number of distinct team members across the user's projects"""
+        project_ids = user_projects_query(user).with_entities(Project.id)
+        return db.session.query(func.count(func.distinct(project_members.c.user_id)))\
+                         .filter(project_members.c.project_id.in_(project_ids.scalar_subquery()))\
+                         .scalar() or 0
+
+    @staticmethod
+    def _pending_tasks_query(user):
+        if user.is_pi():
+            return Task.query.join(Task.project)\
+                             .filter(Task.status.in_(PENDING_STATUSES),
+                                     Project.pi_id == user.id)
+        return Task.query.filter(Task.assigned_to_id == user.id,
+                                 Task.status.in_(PENDING_STATUSES))
+
+    @staticmethod
+    def count_tasks_due_soon(user, days=7):
+        """Number of open tasks due within `days` days, overdue ones included"""
+        due_by = datetime.now().date() + timedelta(days=days)
+        return DashboardService._pending_tasks_query(user)\
+                               .filter(Task.due_date <= due_by)\
+                               .with_entities(func.count(Task.id)).scalar() or 0
+
+    @staticmethod
+    def get_pending_tasks(user, limit=10):
+        """Open tasks ordered by due date, with their project preloaded"""
+        return DashboardService._pending_tasks_query(user)\
+                               .options(joinedload(Task.project))\
+                               .order_by(Task.due_date).limit(limit).all()
+
+    @staticmethod
+    def get_upcoming_meetings(user, days=7, limit=5):
+        """Scheduled meetings in the next few days, with their project preloaded"""
+        now = datetime.now()
+        query = Meeting.query.options(joinedload(Meeting.project))\
+                             .filter(Meeting.meeting_date >= now,
+                                     Meeting.meeting_date <= now + timedelta(days=days),
+                                     Meeting.status == 'scheduled')
+        if user.is_pi():
+            query = query.join(Meeting.project).filter(Project.pi_id == user.id)
+        else:
+            query = query.filter(Meeting.attendees.any(id=user.id))
+        return query.order_by(Meeting.meeting_date).limit(limit).all()
+
+    @staticmethod
+    def get_recent_notifications(user, limit=5):
+        return Notification.query.filter_by(user_id=user.id, is_read=False)\
+                                 .order_by(Notification.created_at.desc()).limit(limit).all()
+
+    @staticmethod
+    def get_project_summaries(user, limit=5):
+        """Recent projects with their progress and team size precomputed.
+
+        Returns a list of dicts with ``project``, ``progress`` and
+        ``member_count`` keys so the template never walks relationships.
+        """
+        projects = user_projects_query(user).order_by(Project.id).limit(limit).all()
+        if not projects:
+            return []
+        project_ids = [project.id for project in projects]
+
+        member_counts = dict(
+            db.session.query(project_members.c.project_id, func.count(project_members.c.user_id))
+                      .filter(project_members.c.project_id.in_(project_ids))
+                      .group_by(project_members.c.project_id)
+                      .all()
+        )
+
+        summaries = []
+        for project in projects:
+            summaries.append({
+                'project': project,
+                'progress': project.get_progress_percentage(),
+                'member_count': member_counts.get(project.id, 0)
+            })
+        return summaries
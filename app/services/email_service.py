@@ -1,30 +1,29 @@
 from flask import current_app, render_template
-from flask_mail import Message
-from app import mail
-from datetime import datetime
+from app import db
+from app.models.outbound_email import OutboundEmail
 
 class EmailService:
     @staticmethod
-    def send_email(subject, recipients, html_body, text_body=None):
-        """Send email with HTML and optional text body"""
+    def send_email(subject, recipients, html_body, text_body=None, commit=True):
+        """Queue email with HTML and optional text body for the mail worker"""
         if not current_app.config.get('MAIL_USERNAME'):
             current_app.logger.warning("Email not configured - MAIL_USERNAME not set. Please configure email settings in .env file.")
             return False
-            
-        try:
-            msg = Message(
-                subject=subject,
-                recipients=recipients,
-                html=html_body,
-                body=text_body
-            )
-            mail.send(msg)
-            current_app.logger.info(f"✅ Email sent successfully to {recipients} via {current_app.config.get('MAIL_SERVER')}")
-            return True
-        except Exception as e:
-            current_app.logger.error(f"❌ Email send failed to {recipients}: {str(e)}")
-            current_app.logger.error(f"📧 Email settings: Server={current_app.config.get('MAIL_SERVER')}, Port={current_app.config.get('MAIL_PORT')}, TLS={current_app.config.get('MAIL_USE_TLS')}, SSL={current_app.config.get('MAIL_USE_SSL')}")
+        
+        if not recipients:
             return False
+        
+        email = OutboundEmail(
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body
+        )
+        email.set_recipients(recipients)
+        db.session.add(email)
+        if commit:
+            db.session.commit()
+        current_app.logger.info(f"📧 Email queued for {recipients}")
+        return True
     
     @staticmethod
     def send_task_assignment_email(task, assignee):
@@ -57,7 +56,7 @@ class EmailService:
         )
     
     @staticmethod
-    def send_meeting_reminder_email(meeting, attendees):
+    def send_meeting_reminder_email(meeting, attendees, commit=True):
         """Send meeting reminder email (24 hours before)"""
         subject = f"Meeting Reminder: {meeting.title}"
         
@@ -69,7 +68,8 @@ class EmailService:
         return EmailService.send_email(
             subject=subject,
             recipients=recipient_emails,
-            html_body=html_body
+            html_body=html_body,
+            commit=commit
         )
     
     @staticmethod
@@ -0,0 +1,73 @@
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.meeting import Meeting, meeting_attendees
+from app.services.dashboard_service import DashboardService, PROJECT_STATS
+
+class ExportService:
+    """Report rows for the PI's projects, read with column-only selects and
+    yield_per so exports never hold more than one batch of rows in memory.
+
+    Each export returns (header, rows) where rows is a lazy iterator; it is
+    consumed while the response streams, inside the request's session.
+    """
+
+    @staticmethod
+    def _stream(statement):
+        batch_size = current_app.config['EXPORT_BATCH_SIZE']
+        # Core execution skips ORM row processing; yield_per fetches in batches
+        # and turns on server-side cursors where the driver has them
+        return db.session.connection().execute(statement.execution_options(yield_per=batch_size))
+
+    @staticmethod
+    def _projects(statement, user, project_id=None):
+        statement = statement.where(Project.pi_id == user.id)
+        if project_id is not None:
+            statement = statement.where(Project.id == project_id)
+        return statement
+
+    @staticmethod
+    def tasks(user, project_id=None):
+        assignee = aliased(User)
+        statement = db.select(
+            Project.project_id, Project.title, Task.id, Task.title, Task.status, Task.priority,
+            Task.due_date, assignee.first_name + ' ' + assignee.last_name, assignee.email,
+            Task.created_at, Task.completed_at
+        ).select_from(Task).join(Task.project).outerjoin(assignee, assignee.id == Task.assigned_to_id)\
+         .order_by(Project.id, Task.id)
+        header = ['Project ID', 'Project', 'Task ID', 'Task', 'Status', 'Priority',
+                  'Due date', 'Assignee', 'Assignee email', 'Created', 'Completed']
+        return header, ExportService._stream(ExportService._projects(statement, user, project_id))
+
+    @staticmethod
+    def meetings(user, project_id=None):
+        attendee_count = db.select(func.count(meeting_attendees.c.user_id))\
+                           .where(meeting_attendees.c.meeting_id == Meeting.id)\
+                           .scalar_subquery()
+        status = Meeting.effective_status_clause()
+        statement = db.select(
+            Project.project_id, Project.title, Meeting.id, Meeting.title, Meeting.meeting_date,
+            Meeting.duration_minutes, Meeting.location, status, attendee_count
+        ).select_from(Meeting).join(Meeting.project).order_by(Project.id, Meeting.meeting_date, Meeting.id)
+        header = ['Project ID', 'Project', 'Meeting ID', 'Meeting', 'Date', 'Duration (min)',
+                  'Location', 'Status', 'Attendees']
+        return header, ExportService._stream(ExportService._projects(statement, user, project_id))
+
+    @staticmethod
+    def funding(user, project_id=None):
+        """calculate_project_stats rolled up per funding source, then a total row"""
+        source = func.coalesce(Project.funding_source, 'Unspecified')
+        statement = db.select(source, *[aggregate for _, aggregate in PROJECT_STATS])\
+                      .group_by(source).order_by(source)
+        header = ['Funding source'] + [key.replace('_', ' ').capitalize() for key, _ in PROJECT_STATS]
+
+        def rows():
+            for row in ExportService._stream(ExportService._projects(statement, user, project_id)):
+                yield [row[0]] + [value or 0 for value in row[1:]]
+            if project_id is None:
+                yield ['Total'] + list(DashboardService.get_project_stats(user).values())
+        return header, rows()
@@ -0,0 +1,110 @@
+from flask import current_app
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.utils.cache import TTLCache
+
+def _queue_invalidation(session, user_ids):
+    session.info.setdefault('identity_invalidations', set()).update(user_ids)
+
+def _bump_identity_versions(connection, user_ids):
+    """Mark the users' cache entries stale in every process, as part of the
+    writing transaction; load_user compares the version on each hit"""
+    connection.execute(db.update(User.__table__)
+                         .where(User.__table__.c.id.in_(user_ids))
+                         .values(identity_version=User.__table__.c.identity_version + 1))
+
+@db.event.listens_for(db.session, 'after_flush')
+def _collect_identity_changes(session, flush_context):
+    """Note users whose cached identity a flush made stale.
+
+    Runs after the flush so the membership collections the unit of work
+    loaded for deleted projects are available through attribute history.
+    """
+    user_ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            user_ids.add(obj.id)
+        elif isinstance(obj, Project):
+            history = inspect(obj).attrs.team_members.history
+            members = history.sum() if obj in session.deleted else (history.added or []) + (history.deleted or [])
+            user_ids.update(member.id for member in members)
+    if user_ids:
+        _bump_identity_versions(session.connection(), user_ids)
+        _queue_invalidation(session, user_ids)
+
+@db.event.listens_for(db.session, 'after_commit')
+def _invalidate_committed_identities(session):
+    user_ids = session.info.pop('identity_invalidations', None)
+    if user_ids:
+        IdentityService.invalidate(user_ids)
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_identity_invalidations(session):
+    session.info.pop('identity_invalidations', None)
+
+class IdentityService:
+    """Loads the logged-in user once and caches it across requests.
+
+    Cache entries hold a detached copy of the user's columns plus the ids
+    of the projects they are a member of; each request merges the copy into
+    its own session. The cache is per process, so a hit is trusted only
+    after a primary-key read confirms the user's identity_version, which
+    every invalidation bumps in the database.
+    """
+
+    @staticmethod
+    def get_cache(app=None):
+        app = app or current_app._get_current_object()
+        cache = app.extensions.get('identity_cache')
+        if cache is None:
+            cache = app.extensions.setdefault('identity_cache', TTLCache(
+                maxsize=app.config['IDENTITY_CACHE_SIZE'],
+                ttl=app.config['IDENTITY_CACHE_TTL']
+            ))
+        return cache
+
+    @staticmethod
+    def _snapshot(user):
+        """Detached copy of user's column values, safe to share between sessions"""
+        columns = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        copy = User(**columns)
+        make_transient_to_detached(copy)
+        return copy
+
+    @staticmethod
+    def load_user(user_id):
+        """User for Flask-Login's user_loader, served from the cache when possible"""
+        cache = IdentityService.get_cache()
+        entry = cache.get(user_id)
+        if entry is not None:
+            version = db.session.scalar(db.select(User.identity_version).where(User.id == user_id))
+            if version != entry[0].identity_version:
+                entry = None
+        if entry is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                cache.delete(user_id)
+                return None
+            entry = (IdentityService._snapshot(user), user.get_member_project_ids())
+            cache.set(user_id, entry)
+
+        snapshot, member_project_ids = entry
+        user = db.session.merge(snapshot, load=False)
+        user._member_project_ids = member_project_ids
+        return user
+
+    @staticmethod
+    def invalidate(user_ids):
+        IdentityService.get_cache().delete_many(user_ids)
+
+    @staticmethod
+    def invalidate_on_commit(user_ids):
+        """Drop the users' cache entries once the session commits; for writes
+        made with Core statements, which the flush hooks do not see"""
+        user_ids = set(user_ids)
+        if user_ids:
+            _bump_identity_versions(db.session.connection(), user_ids)
+            _queue_invalidation(db.session, user_ids)
@@ -0,0 +1,426 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import partial
+from email_validator import validate_email, EmailNotValidError
+from flask import current_app, render_template
+from wtforms.validators import DataRequired, Length, NumberRange
+from app import db
+from app.models.user import User
+from app.models.project import Project, project_members
+from app.models.task import Task
+from app.forms.auth_forms import RegistrationForm
+from app.forms.project_forms import ProjectForm
+from app.forms.task_forms import TaskForm
+from app.services.email_service import EmailService
+from app.services.identity_service import IdentityService
+from app.services.notification_service import NotificationService
+from app.services.password_service import PasswordService
+from app.services.search_service import SearchService
+
+IMPORT_KINDS = ('users', 'projects', 'tasks')
+
+# Import columns mapped to the form field whose validators they must pass
+# and a parser for the raw text
+FIELDS = {
+    'users': {
+        'username': (RegistrationForm, 'username', str),
+        'email': (RegistrationForm, 'email', str),
+        'title': (RegistrationForm, 'title', str),
+        'first_name': (RegistrationForm, 'first_name', str),
+        'last_name': (RegistrationForm, 'last_name', str),
+        'role': (RegistrationForm, 'role', str),
+        'password': (RegistrationForm, 'password', str),
+    },
+    'projects': {
+        'title': (ProjectForm, 'title', str),
+        'project_id': (ProjectForm, 'project_id', str),
+        'description': (ProjectForm, 'description', str),
+        'start_date': (ProjectForm, 'start_date', date.fromisoformat),
+        'end_date': (ProjectForm, 'end_date', date.fromisoformat),
+        'status': (ProjectForm, 'status', str),
+        'funding_source': (ProjectForm, 'funding_source', str),
+        'funding_amount': (ProjectForm, 'funding_amount', float),
+    },
+    'tasks': {
+        'project_id': (ProjectForm, 'project_id', str),
+        'title': (TaskForm, 'title', str),
+        'description': (TaskForm, 'description', str),
+        'assigned_to': (TaskForm, 'assigned_to', str),
+        'priority': (TaskForm, 'priority', str),
+        'due_date': (TaskForm, 'due_date', date.fromisoformat),
+    },
+}
+
+# Values used when a select column is left empty, as the models would
+DEFAULTS = {
+    'users': {'title': User.__table__.c.title.default.arg, 'role': User.__table__.c.role.default.arg},
+    'projects': {'status': Project.__table__.c.status.default.arg},
+    'tasks': {'priority': Task.__table__.c.priority.default.arg},
+}
+
+def _field_rules(form_class, name):
+    """Required flag, length bounds, minimum value and choices declared on a form field"""
+    field = getattr(form_class, name)
+    rules = {'required': False, 'min': -1, 'max': -1, 'min_value': None, 'choices': None}
+    for validator in field.kwargs.get('validators', ()):
+        if isinstance(validator, DataRequired):
+            rules['required'] = True
+        elif isinstance(validator, Length):
+            rules['min'], rules['max'] = validator.min, validator.max
+        elif isinstance(validator, NumberRange):
+            rules['min_value'] = validator.min
+    if field.kwargs.get('choices'):
+        rules['choices'] = {value for value, _ in field.kwargs['choices']}
+    return rules
+
+RULES = {kind: {column: _field_rules(form_class, name) for column, (form_class, name, _) in fields.items()}
+         for kind, fields in FIELDS.items()}
+
+def _batches(rows, size):
+    batch = []
+    for number, row in enumerate(rows, 1):
+        batch.append((number, row))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _split(value):
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item for item in str(value or '').replace(';', ' ').replace(',', ' ').split() if item]
+
+class ImportReport:
+    """Outcome of an import: row counts per kind and validation errors"""
+
+    def __init__(self):
+        self.counts = {kind: 0 for kind in IMPORT_KINDS}
+        self.errors = []
+
+    def error(self, kind, number, message):
+        self.errors.append(f'{kind} row {number}: {message}')
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {'imported': self.counts, 'errors': self.errors}
+
+class ImportService:
+    """Bulk creation of users, projects (with team members) and tasks.
+
+    Every row is validated against the same rules as the registration,
+    project and task forms before anything is written; lookups run once per
+    batch rather than once per row. Rows are then inserted with executemany
+    INSERTs in batched transactions, and notifications and emails for the
+    whole import go out in a single fan-out at the end.
+    """
+
+    @staticmethod
+    def parse(text, filename, kind=None):
+        """Rows per kind from a JSON document ({"users": [...], ...} or a list
+        of rows for `kind`) or a CSV file holding rows of one kind"""
+        kind = kind or filename.rsplit('/', 1)[-1].split('.', 1)[0]
+        if filename.lower().endswith('.json'):
+            data = json.loads(text)
+            if isinstance(data, list):
+                data = {kind: data}
+            if not isinstance(data, dict):
+                raise ValueError('Expected a JSON object keyed by users, projects and tasks')
+            return {name: data.get(name) or [] for name in IMPORT_KINDS}
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f'Unknown import kind {kind!r}; expected one of {", ".join(IMPORT_KINDS)}')
+        rows = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+        return {name: rows if name == kind else [] for name in IMPORT_KINDS}
+
+    @staticmethod
+    def _clean(kind, number, row, report):
+        """Parsed values for one row, or None after reporting its errors"""
+        if not isinstance(row, dict):
+            # JSON arrays can hold anything; CSV rows are always dicts
+            report.error(kind, number, f'expected an object of column values, got {type(row).__name__}')
+            return None
+        values = {}
+        valid = True
+        for column, (_, _, parse) in FIELDS[kind].items():
+            rules = RULES[kind][column]
+            raw = row.get(column)
+            raw = raw.strip() if isinstance(raw, str) else raw
+            if raw in (None, ''):
+                raw = DEFAULTS[kind].get(column)
+            if raw in (None, ''):
+                if rules['required']:
+                    report.error(kind, number, f'{column} is required')
+                    valid = False
+                values[column] = None
+                continue
+            try:
+                value = parse(raw)
+            except (TypeError, ValueError):
+                report.error(kind, number, f'{column} {raw!r} is not valid')
+                valid = False
+                continue
+            if isinstance(value, str) and (len(value) < rules['min'] or -1 < rules['max'] < len(value)):
+                report.error(kind, number, f'{column} must be between {max(rules["min"], 0)} and {rules["max"]} characters')
+                valid = False
+            elif rules['choices'] and value not in rules['choices']:
+                report.error(kind, number, f'{column} must be one of {", ".join(sorted(rules["choices"]))}')
+                valid = False
+            elif rules['min_value'] is not None and value < rules['min_value']:
+                report.error(kind, number, f'{column} cannot be below {rules["min_value"]}')
+                valid = False
+            values[column] = value
+        return values if valid else None
+
+    @staticmethod
+    def _validate_users(rows, report, batch_size):
+        users, usernames, emails = [], set(), set()
+        for batch in _batches(rows, batch_size):
+            cleaned = [(number, ImportService._clean('users', number, row, report)) for number, row in batch]
+            cleaned = [(number, values) for number, values in cleaned if values]
+            batch_names = {values['username'] for _, values in cleaned}
+            batch_emails = {values['email'] for _, values in cleaned}
+            taken_names = set(db.session.scalars(db.select(User.username).where(User.username.in_(batch_names))))
+            taken_emails = set(db.session.scalars(db.select(User.email).where(User.email.in_(batch_emails))))
+            for number, values in cleaned:
+                try:
+                    validate_email(values['email'], check_deliverability=False)
+                except EmailNotValidError:
+                    report.error('users', number, f'email {values["email"]!r} is not a valid address')
+                    continue
+                if values['username'] in taken_names or values['username'] in usernames:
+                    report.error('users', number, f'username {values["username"]!r} already exists')
+                elif values['email'] in taken_emails or values['email'] in emails:
+                    report.error('users', number, f'email {values["email"]!r} is already registered')
+                else:
+                    usernames.add(values['username'])
+                    emails.add(values['email'])
+                    users.append(values)
+        return users
+
+    @staticmethod
+    def _validate_projects(rows, new_users, report, batch_size):
+        """Valid project rows, each with a `members` list of usernames"""
+        projects, codes = [], set()
+        new_members = {user['username'] for user in new_users if user['role'] == 'team_member'}
+        for batch in _batches(rows, batch_size):
+            cleaned = [(number, row, ImportService._clean('projects', number, row, report)) for number, row in batch]
+            cleaned = [(number, row, values) for number, row, values in cleaned if values]
+            batch_codes = {values['project_id'] for _, _, values in cleaned}
+            taken = set(db.session.scalars(db.select(Project.project_id).where(Project.project_id.in_(batch_codes))))
+            members = {name for _, row, _ in cleaned for name in _split(row.get('team_members'))}
+            known_members = set(db.session.scalars(
+                db.select(User.username).where(User.username.in_(members), User.role == 'team_member')))
+            for number, row, values in cleaned:
+                values['members'] = _split(row.get('team_members'))
+                unknown = [name for name in values['members'] if name not in known_members | new_members]
+                if values['project_id'] in taken or values['project_id'] in codes:
+                    report.error('projects', number, f'project_id {values["project_id"]!r} already exists')
+                elif values['end_date'] < values['start_date']:
+                    report.error('projects', number, 'end_date cannot be before start_date')
+                elif unknown:
+                    report.error('projects', number, f'unknown team members: {", ".join(unknown)}')
+                else:
+                    codes.add(values['project_id'])
+                    projects.append(values)
+        return projects
+
+    @staticmethod
+    def _validate_tasks(rows, new_projects, pi, report, batch_size):
+        """Valid task rows; their project must be the PI's (or new) and the
+        assignee one of its team members, as TaskForm's choices require"""
+        tasks = []
+        teams = {project['project_id']: set(project['members']) for project in new_projects}
+        for batch in _batches(rows, batch_size):
+            cleaned = [(number, ImportService._clean('tasks', number, row, report)) for number, row in batch]
+            cleaned = [(number, values) for number, values in cleaned if values]
+            missing = {values['project_id'] for _, values in cleaned} - teams.keys()
+            if missing:
+                existing = db.session.execute(
+                    db.select(Project.project_id, User.username)
+                      .select_from(Project)
+                      .outerjoin(project_members, project_members.c.project_id == Project.id)
+                      .outerjoin(User, User.id == project_members.c.user_id)
+                      .where(Project.project_id.in_(missing), Project.pi_id == pi.id)
+                )
+                for code, username in existing:
+                    team = teams.setdefault(code, set())
+                    if username:
+                        team.add(username)
+            for number, values in cleaned:
+                team = teams.get(values['project_id'])
+                if team is None:
+                    report.error('tasks', number, f'project {values["project_id"]!r} not found among your projects')
+                elif values['assigned_to'] not in team:
+                    report.error('tasks', number, f'{values["assigned_to"]!r} is not a team member of {values["project_id"]!r}')
+                else:
+                    tasks.append(values)
+        return tasks
+
+    @staticmethod
+    def run(data, pi, dry_run=False, notify=True):
+        """Validate and import rows parsed by parse() on behalf of PI `pi`.
+
+        Nothing is written when any row is invalid (or with dry_run); the
+        report then lists every error."""
+        report = ImportReport()
+        batch_size = current_app.config['IMPORT_BATCH_SIZE']
+        users = ImportService._validate_users(data['users'], report, batch_size)
+        projects = ImportService._validate_projects(data['projects'], users, report, batch_size)
+        tasks = ImportService._validate_tasks(data['tasks'], projects, pi, report, batch_size)
+        if not report.ok or dry_run:
+            report.counts.update(users=len(users), projects=len(projects), tasks=len(tasks))
+            return report
+
+        now = datetime.utcnow()
+        user_ids = ImportService._insert_users(users, now)
+        project_ids = ImportService._insert_projects(projects, pi, user_ids, now)
+        assignments = ImportService._insert_tasks(tasks, pi, project_ids, user_ids, now, batch_size)
+        report.counts.update(users=len(users), projects=len(projects), tasks=len(tasks))
+
+        if notify:
+            ImportService._notify(projects, pi, project_ids, user_ids, assignments)
+        db.session.commit()
+        return report
+
+    @staticmethod
+    def _insert_users(users, now):
+        """Insert users; returns ids by username for every username the import refers to"""
+        if users:
+            # Hashing dominates here; the hash functions release the GIL
+            hash_password = partial(PasswordService.hash_password,
+                                    method=current_app.config['PASSWORD_HASH_METHOD'],
+                                    salt_length=current_app.config['PASSWORD_SALT_LENGTH'])
+            with ThreadPoolExecutor() as pool:
+                hashes = list(pool.map(hash_password, [user['password'] for user in users]))
+            db.session.execute(db.insert(User), [
+                dict({key: value for key, value in user.items() if key != 'password'},
+                     password_hash=password_hash, created_at=now)
+                for user, password_hash in zip(users, hashes)
+            ])
+            db.session.commit()
+        return _IdLookup(User, User.username)
+
+    @staticmethod
+    def _insert_projects(projects, pi, user_ids, now):
+        if not projects:
+            return _IdLookup(Project, Project.project_id)
+        db.session.execute(db.insert(Project), [
+            dict({key: value for key, value in project.items() if key != 'members'},
+                 pi_id=pi.id, created_at=now, updated_at=now)
+            for project in projects
+        ])
+        project_ids = _IdLookup(Project, Project.project_id)
+        project_ids.load(project['project_id'] for project in projects)
+        user_ids.load(name for project in projects for name in project['members'])
+        memberships = [{'project_id': project_ids[project['project_id']], 'user_id': user_ids[name]}
+                       for project in projects for name in project['members']]
+        if memberships:
+            db.session.execute(project_members.insert(), memberships)
+            # Core inserts bypass the session events that normally drop cached memberships
+            IdentityService.invalidate_on_commit({row['user_id'] for row in memberships})
+        SearchService.reindex(db.session.connection(), 'project', 'object_id >= :first',
+                              {'first': min(project_ids[project['project_id']] for project in projects)})
+        db.session.commit()
+        return project_ids
+
+    @staticmethod
+    def _insert_tasks(tasks, pi, project_ids, user_ids, now, batch_size):
+        """Insert tasks in one transaction per batch; returns {(user_id, project_id): count}"""
+        assignments = defaultdict(int)
+        project_ids.load(task['project_id'] for task in tasks)
+        user_ids.load(task['assigned_to'] for task in tasks)
+        first_id = None
+        for batch in _chunks(tasks, batch_size):
+            rows = []
+            for task in batch:
+                project_id = project_ids[task['project_id']]
+                assigned_to_id = user_ids[task['assigned_to']]
+                assignments[(assigned_to_id, project_id)] += 1
+                rows.append({'title': task['title'], 'description': task['description'],
+                             'priority': task['priority'], 'due_date': task['due_date'],
+                             'status': 'todo', 'project_id': project_id, 'assigned_to_id': assigned_to_id,
+                             'created_by_id': pi.id, 'created_at': now, 'updated_at': now})
+            if first_id is None:
+                first_id = (db.session.scalar(db.select(db.func.max(Task.id))) or 0) + 1
+            db.session.execute(db.insert(Task), rows)
+            db.session.commit()
+
+        if tasks:
+            # Bulk inserts skip the mapper events behind counters and search
+            Project.refresh_task_counters({project_id for _, project_id in assignments})
+            SearchService.reindex(db.session.connection(), 'task', 'object_id >= :first', {'first': first_id})
+            db.session.commit()
+        return assignments
+
+    @staticmethod
+    def _notify(projects, pi, project_ids, user_ids, assignments):
+        """One notification per new membership and per assignee and project,
+        and one summary email per person, all in a single transaction"""
+        titles = dict(db.session.execute(
+            db.select(Project.id, Project.title).where(Project.id.in_({project_id for _, project_id in assignments}))
+        ).all()) if assignments else {}
+        rows = []
+        memberships = defaultdict(list)
+        for project in projects:
+            project_id = project_ids[project['project_id']]
+            titles[project_id] = project['title']
+            for name in project['members']:
+                memberships[user_ids[name]].append(project_id)
+                rows.append({'user_id': user_ids[name], 'project_id': project_id,
+                             'notification_type': 'project_assigned',
+                             'title': f"Assigned to Project: {project['title']}",
+                             'message': f"You have been assigned to work on project '{project['title']}' by {pi.get_full_name()}"})
+        task_counts = defaultdict(dict)
+        for (user_id, project_id), count in assignments.items():
+            task_counts[user_id][project_id] = count
+            rows.append({'user_id': user_id, 'project_id': project_id,
+                         'notification_type': 'task_assigned',
+                         'title': f"{count} New Task{'s' if count != 1 else ''} Assigned",
+                         'message': f"You have been assigned {count} new task{'s' if count != 1 else ''} in project '{titles[project_id]}'"})
+        NotificationService.insert_notifications(rows)
+
+        recipients = memberships.keys() | task_counts.keys()
+        if not recipients:
+            return
+        people = db.session.scalars(db.select(User).where(User.id.in_(recipients)))
+        for person in people:
+            EmailService.send_email(
+                subject=f'New projects and tasks from {pi.get_full_name()}',
+                recipients=[person.email],
+                html_body=render_template('emails/import_summary.html', pi=pi, recipient=person, titles=titles,
+                                          projects=memberships.get(person.id, []),
+                                          task_counts=task_counts.get(person.id, {})),
+                commit=False
+            )
+
+class _IdLookup:
+    """Primary keys by natural key (username, project code), fetched in chunks on demand"""
+
+    def __init__(self, model, key_column):
+        self.model = model
+        self.key_column = key_column
+        self._ids = {}
+
+    def load(self, keys):
+        missing = set(keys) - self._ids.keys()
+        for chunk in _chunks(missing, 500):
+            self._ids.update(db.session.execute(
+                db.select(self.key_column, self.model.id).where(self.key_column.in_(chunk))
+            ).all())
+
+    def __getitem__(self, key):
+        if key not in self._ids:
+            self.load([key])
+        return self._ids[key]
@@ -0,0 +1,238 @@
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Connection, Message
+from app import db
+from app.models.outbound_email import OutboundEmail
+
+class PersistentConnection(Connection):
+    """Flask-Mail connection that stays open across batches"""
+
+    def __init__(self, mail, timeout):
+        super(PersistentConnection, self).__init__(mail)
+        self.timeout = timeout
+        self.host = None
+        self.num_emails = 0
+        self.last_used = time.monotonic()
+
+    def open(self):
+        self.host = None if self.mail.suppress else self.configure_host()
+        self.num_emails = 0
+        self.last_used = time.monotonic()
+        return self
+
+    def configure_host(self):
+        if self.mail.use_ssl:
+            host = smtplib.SMTP_SSL(self.mail.server, self.mail.port, timeout=self.timeout)
+        else:
+            host = smtplib.SMTP(self.mail.server, self.mail.port, timeout=self.timeout)
+
+        host.set_debuglevel(int(self.mail.debug))
+
+        if self.mail.use_tls:
+            host.starttls()
+        if self.mail.username and self.mail.password:
+            host.login(self.mail.username, self.mail.password)
+
+        return host
+
+    def is_alive(self):
+        if self.host is None:
+            return True
+        try:
+            return self.host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self):
+        if self.host is not None:
+            try:
+                self.host.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.host = None
+
+class SMTPConnectionPool:
+    """Thread-safe pool of persistent SMTP connections for one app process"""
+
+    def __init__(self, size, timeout=30, max_idle=60):
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    mail = current_app.extensions['mail']
+                    return PersistentConnection(mail, self.timeout).open()
+                # Probe connections that sat idle long enough for the server to drop them
+                if time.monotonic() - conn.last_used < self.max_idle or conn.is_alive():
+                    return conn
+                conn.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        if broken:
+            conn.close()
+        else:
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(conn)
+        self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+def get_connection_pool(app=None):
+    app = app or current_app._get_current_object()
+    pool = app.extensions.get('mail_pool')
+    if pool is None:
+        pool = app.extensions.setdefault('mail_pool', SMTPConnectionPool(
+            size=app.config['MAIL_WORKER_THREADS'] or 1,
+            timeout=app.config['MAIL_SMTP_TIMEOUT'],
+            max_idle=app.config['MAIL_POOL_MAX_IDLE']
+        ))
+    return pool
+
+class MailOutboxWorker:
+    """Delivers queued OutboundEmail rows in batches over pooled SMTP connections.
+
+    Rows are claimed with a token so several threads or processes can drain
+    the outbox concurrently without sending a message twice.
+    """
+
+    @staticmethod
+    def release_stale_claims():
+        """Return rows claimed by a worker that died mid-batch to the queue"""
+        cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['MAIL_CLAIM_TIMEOUT'])
+        released = OutboundEmail.query.filter(OutboundEmail.status == 'sending',
+                                              OutboundEmail.claimed_at < cutoff)\
+                                      .update({OutboundEmail.status: 'pending',
+                                               OutboundEmail.claim_token: None},
+                                              synchronize_session=False)
+        db.session.commit()
+        return released
+
+    @staticmethod
+    def claim_batch(batch_size):
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        due_ids = db.session.query(OutboundEmail.id)\
+                            .filter(OutboundEmail.status == 'pending',
+                                    OutboundEmail.next_attempt_at <= now)\
+                            .order_by(OutboundEmail.id).limit(batch_size)\
+                            .scalar_subquery()
+        claimed = OutboundEmail.query.filter(OutboundEmail.id.in_(due_ids),
+                                             OutboundEmail.status == 'pending')\
+                                     .update({OutboundEmail.status: 'sending',
+                                              OutboundEmail.claim_token: token,
+                                              OutboundEmail.claimed_at: now},
+                                             synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return []
+        return OutboundEmail.query.filter_by(claim_token=token).order_by(OutboundEmail.id).all()
+
+    @staticmethod
+    def _record_failure(email, error):
+        config = current_app.config
+        email.attempts += 1
+        email.last_error = str(error)
+        email.claim_token = None
+        if email.attempts >= config['MAIL_MAX_ATTEMPTS']:
+            email.status = 'dead'
+            current_app.logger.error(f"❌ Email {email.id} to {email.get_recipients()} dead-lettered "
+                                     f"after {email.attempts} attempts: {error}")
+        else:
+            delay = min(config['MAIL_RETRY_BACKOFF'] * (2 ** (email.attempts - 1)),
+                        config['MAIL_RETRY_BACKOFF_MAX'])
+            email.status = 'pending'
+            email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            current_app.logger.warning(f"Email {email.id} failed (attempt {email.attempts}), "
+                                       f"retrying in {delay}s: {error}")
+
+    @staticmethod
+    def send_batch(emails):
+        """Send claimed emails over a single pooled connection"""
+        pool = get_connection_pool()
+        conn = pool.acquire()
+        broken = False
+        sent = 0
+        try:
+            for email in emails:
+                if broken:
+                    conn = pool.acquire()
+                    broken = False
+                message = Message(subject=email.subject,
+                                  recipients=email.get_recipients(),
+                                  html=email.html_body,
+                                  body=email.text_body)
+                try:
+                    try:
+                        conn.send(message)
+                    except smtplib.SMTPServerDisconnected:
+                        # Pooled connection was dropped by the server; retry once on a fresh one
+                        pool.release(conn, broken=True)
+                        broken = True
+                        conn = pool.acquire()
+                        broken = False
+                        conn.send(message)
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    if not broken:
+                        pool.release(conn, broken=True)
+                        broken = True
+                    MailOutboxWorker._record_failure(email, e)
+                    continue
+                except Exception as e:
+                    MailOutboxWorker._record_failure(email, e)
+                    continue
+                email.status = 'sent'
+                email.sent_at = datetime.utcnow()
+                email.claim_token = None
+                sent += 1
+        finally:
+            if not broken:
+                pool.release(conn)
+            db.session.commit()
+        if sent:
+            current_app.logger.info(f"✅ {sent} emails sent via {current_app.config.get('MAIL_SERVER')}")
+        return sent
+
+    @staticmethod
+    def process_outbox(batch_size=None, max_batches=None):
+        """Drain due outbox rows; returns the number of emails sent"""
+        batch_size = batch_size or current_app.config['MAIL_BATCH_SIZE']
+        MailOutboxWorker.release_stale_claims()
+        sent = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            emails = MailOutboxWorker.claim_batch(batch_size)
+            if not emails:
+                break
+            try:
+                sent += MailOutboxWorker.send_batch(emails)
+            except (smtplib.SMTPException, OSError) as e:
+                # Could not connect at all: put the whole batch back with backoff
+                db.session.rollback()
+                for email in emails:
+                    if email.status == 'sending':
+                        MailOutboxWorker._record_failure(email, e)
+                db.session.commit()
+                break
+            batches += 1
+        return sent
@@ -0,0 +1,78 @@
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload, selectinload
+from app import db
+from app.models.meeting import Meeting
+from app.services.email_service import EmailService
+from app.utils.write_queue import run_write
+
+class MeetingService:
+    @staticmethod
+    def sweep_completed_meetings():
+        """Persist 'completed' for every past scheduled meeting in one UPDATE"""
+        updated = run_write(Meeting.complete_past_meetings)
+        if updated:
+            current_app.logger.info(f"Marked {updated} past meetings as completed")
+        return updated
+    
+    @staticmethod
+    def claim_due_reminders(batch_size, now=None):
+        """Claim up to batch_size scheduled meetings starting within
+        REMINDER_LEAD_HOURS that have not had a reminder yet.
+    
+        The claim is a conditional UPDATE tagged with a fresh token, so
+        concurrent schedulers never claim the same meeting; claims older than
+        MAIL_CLAIM_TIMEOUT belong to a dead run and can be taken over.
+        """
+        config = current_app.config
+        now = now or datetime.now()
+        token = uuid.uuid4().hex
+        claimable = (Meeting.status == 'scheduled',
+                     Meeting.meeting_date > now,
+                     Meeting.meeting_date <= now + timedelta(hours=config['REMINDER_LEAD_HOURS']),
+                     Meeting.reminder_sent_at.is_(None),
+                     or_(Meeting.reminder_claim_token.is_(None),
+                         Meeting.reminder_claimed_at < now - timedelta(seconds=config['MAIL_CLAIM_TIMEOUT'])))
+        # Range scan on ix_meeting_status_date
+        due_ids = db.session.query(Meeting.id).filter(*claimable)\
+                            .order_by(Meeting.meeting_date).limit(batch_size)\
+                            .scalar_subquery()
+        claimed = Meeting.query.filter(Meeting.id.in_(due_ids), *claimable)\
+                               .update({Meeting.reminder_claim_token: token,
+                                        Meeting.reminder_claimed_at: now},
+                                       synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return []
+        return Meeting.query.options(joinedload(Meeting.project), selectinload(Meeting.attendees))\
+                            .filter_by(reminder_claim_token=token).order_by(Meeting.meeting_date).all()
+    
+    @staticmethod
+    def send_due_reminders(batch_size=None):
+        """Queue one reminder per meeting entering the reminder window; returns the number queued.
+    
+        Each batch queues its outbox emails and marks its meetings as
+        reminded in one transaction, so a reminder is queued exactly once.
+        """
+        if not current_app.config.get('MAIL_USERNAME'):
+            return 0  # leave meetings unmarked until email is configured
+        batch_size = batch_size or current_app.config['REMINDER_BATCH_SIZE']
+        queued = 0
+        while True:
+            meetings = MeetingService.claim_due_reminders(batch_size)
+            if not meetings:
+                break
+            sent_at = datetime.utcnow()
+            for meeting in meetings:
+                if meeting.attendees:
+                    EmailService.send_meeting_reminder_email(meeting, meeting.attendees, commit=False)
+                    queued += 1
+                meeting.reminder_sent_at = sent_at
+                meeting.reminder_claim_token = None
+            db.session.commit()
+            db.session.expunge_all()  # keep memory flat over large windows
+        if queued:
+            current_app.logger.info(f"⏰ {queued} meeting reminders queued")
+        return queued
@@ -0,0 +1,49 @@
+import threading
+
+class NotificationBroker:
+    """In-process pub/sub that wakes up a user's open notification streams.
+
+    Events carry no payload: subscribers re-read new rows from the database,
+    which keeps them correct when the publisher ran in another worker process
+    (those streams pick the rows up on their next periodic check instead).
+
+    Every subscriber pins a request thread, so subscribe() takes a `limit`
+    on how many may be open in this process at once.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, limit=None):
+        """Wake-up event for user_id, or None when `limit` subscribers are already open"""
+        event = threading.Event()
+        with self._lock:
+            if limit is not None and self._count >= limit:
+                return None
+            self._subscribers.setdefault(user_id, set()).add(event)
+            self._count += 1
+        return event
+
+    def unsubscribe(self, user_id, event):
+        with self._lock:
+            events = self._subscribers.get(user_id)
+            if events is not None and event in events:
+                events.discard(event)
+                self._count -= 1
+                if not events:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_ids):
+        with self._lock:
+            events = [event for user_id in user_ids
+                      for event in self._subscribers.get(user_id, ())]
+        for event in events:
+            event.set()
+
+    def subscriber_count(self):
+        with self._lock:
+            return self._count
+
+broker = NotificationBroker()
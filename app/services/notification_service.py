@@ -1,10 +1,50 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import bindparam, func
 from app import db
+from app.models.user import User
 from app.models.notification import Notification
+from app.services.identity_service import IdentityService
+from app.services.notification_broker import broker
+
+def _queue_push(user_ids):
+    """Wake the users' notification streams once the current transaction commits"""
+    db.session.info.setdefault('notified_user_ids', set()).update(user_ids)
+
+@db.event.listens_for(db.session, 'after_commit')
+def _push_committed_notifications(session):
+    user_ids = session.info.pop('notified_user_ids', None)
+    if user_ids:
+        broker.publish(user_ids)
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_pending_pushes(session):
+    session.info.pop('notified_user_ids', None)
+
+def _adjust_unread(deltas):
+    """Add {user_id: delta} to the users' unread counters in the caller's transaction"""
+    deltas = [{'user_id': user_id, 'delta': delta} for user_id, delta in deltas.items() if delta]
+    if not deltas:
+        return
+    users = User.__table__
+    db.session.execute(
+        users.update().where(users.c.id == bindparam('user_id'))
+             .values(unread_notification_count=users.c.unread_notification_count + bindparam('delta')),
+        deltas
+    )
+    # The counter is a User column, so cached identities carrying it are stale
+    IdentityService.invalidate_on_commit([delta['user_id'] for delta in deltas])
 
 class NotificationService:
+    """Creates notifications and keeps User.unread_notification_count in step.
+
+    Every write that adds, reads or deletes unread notifications goes
+    through here so the counter moves in the same transaction as the rows.
+    """
+    
     @staticmethod
     def create_notification(user_id, title, message, notification_type, 
-                          project_id=None, task_id=None, meeting_id=None):
+                          project_id=None, task_id=None, meeting_id=None, commit=True):
         """Create a new notification"""
         notification = Notification(
             user_id=user_id,
@@ -16,59 +56,145 @@ class NotificationService:
             meeting_id=meeting_id
         )
         db.session.add(notification)
-        db.session.commit()
+        _adjust_unread({user_id: 1})
+        _queue_push([user_id])
+        if commit:
+            db.session.commit()
         return notification
     
+    @staticmethod
+    def create_bulk_notifications(user_ids, title, message, notification_type,
+                                  project_id=None, task_id=None, meeting_id=None):
+        """Fan out one notification to many users with a single executemany INSERT.
+        
+        Repeated recipients, and users who already hold the same notification
+        for the same project/task/meeting, are skipped. Runs inside the
+        caller's transaction; the caller commits. Returns the number inserted.
+        """
+        user_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+        if not user_ids:
+            return 0
+        
+        already_notified = {user_id for (user_id,) in db.session.query(Notification.user_id).filter(
+            Notification.user_id.in_(user_ids),
+            Notification.notification_type == notification_type,
+            Notification.project_id == project_id,
+            Notification.task_id == task_id,
+            Notification.meeting_id == meeting_id
+        )}
+        
+        return NotificationService.insert_notifications([{
+            'user_id': user_id,
+            'title': title,
+            'message': message,
+            'notification_type': notification_type,
+            'project_id': project_id,
+            'task_id': task_id,
+            'meeting_id': meeting_id
+        } for user_id in user_ids if user_id not in already_notified])
+    
+    @staticmethod
+    def insert_notifications(rows):
+        """Insert notifications given as dicts of column values with one
+        executemany INSERT, in the caller's transaction. Returns the count."""
+        if not rows:
+            return 0
+        created_at = datetime.utcnow()
+        defaults = {'project_id': None, 'task_id': None, 'meeting_id': None,
+                    'is_read': False, 'created_at': created_at}
+        rows = [dict(defaults, **row) for row in rows]
+        db.session.execute(db.insert(Notification), rows)
+        _adjust_unread(Counter(row['user_id'] for row in rows if not row['is_read']))
+        _queue_push([row['user_id'] for row in rows])
+        return len(rows)
+    
     @staticmethod
     def create_task_assignment_notification(task):
         """Create notification for task assignment"""
         if task.assigned_to_id:
-            return NotificationService.create_notification(
-                user_id=task.assigned_to_id,
+            return NotificationService.create_bulk_notifications(
+                [task.assigned_to_id],
                 title=f"New Task Assigned: {task.title}",
                 message=f"You have been assigned a new task in project '{task.project.title}'",
                 notification_type='task_assigned',
                 project_id=task.project_id,
                 task_id=task.id
             )
+        return 0
     
     @staticmethod
     def create_meeting_notification(meeting, attendees):
         """Create notifications for meeting attendees"""
-        notifications = []
-        for attendee in attendees:
-            notification = NotificationService.create_notification(
-                user_id=attendee.id,
-                title=f"Meeting Scheduled: {meeting.title}",
-                message=f"You have been invited to a meeting for project '{meeting.project.title}'",
-                notification_type='meeting_scheduled',
-                project_id=meeting.project_id,
-                meeting_id=meeting.id
-            )
-            notifications.append(notification)
-        return notifications
+        return NotificationService.create_bulk_notifications(
+            [attendee.id for attendee in attendees],
+            title=f"Meeting Scheduled: {meeting.title}",
+            message=f"You have been invited to a meeting for project '{meeting.project.title}'",
+            notification_type='meeting_scheduled',
+            project_id=meeting.project_id,
+            meeting_id=meeting.id
+        )
     
     @staticmethod
     def create_project_assignment_notifications(project, team_members):
         """Create notifications for project assignment"""
-        notifications = []
-        for member in team_members:
-            notification = NotificationService.create_notification(
-                user_id=member.id,
-                title=f"Assigned to Project: {project.title}",
-                message=f"You have been assigned to work on project '{project.title}' by {project.owner.get_full_name()}",
-                notification_type='project_assigned',
-                project_id=project.id
-            )
-            notifications.append(notification)
-        return notifications
+        return NotificationService.create_bulk_notifications(
+            [member.id for member in team_members],
+            title=f"Assigned to Project: {project.title}",
+            message=f"You have been assigned to work on project '{project.title}' by {project.owner.get_full_name()}",
+            notification_type='project_assigned',
+            project_id=project.id
+        )
+    
+    @staticmethod
+    def mark_read(user_id, notification_ids=None):
+        """Mark the user's unread notifications, or only those in
+        notification_ids, as read with one UPDATE in the caller's
+        transaction; returns how many changed"""
+        stmt = db.update(Notification).where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            stmt = stmt.where(Notification.id.in_(notification_ids))
+        marked = db.session.execute(stmt.values(is_read=True)
+                                      .execution_options(synchronize_session=False)).rowcount
+        _adjust_unread({user_id: -marked})
+        return marked
     
     @staticmethod
     def mark_as_read(notification_id, user_id):
         """Mark notification as read"""
-        notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
-        if notification:
-            notification.is_read = True
-            db.session.commit()
-            return True
-        return False
\ No newline at end of file
+        marked = NotificationService.mark_read(user_id, [notification_id])
+        db.session.commit()
+        return bool(marked)
+    
+    @staticmethod
+    def delete_notifications(*criteria):
+        """Delete the notifications matching criteria in the caller's
+        transaction, taking their unread ones off the owners' counters;
+        returns how many were deleted"""
+        unread = db.session.execute(
+            db.select(Notification.user_id, func.count(Notification.id))
+              .where(*criteria, Notification.is_read.is_(False))
+              .group_by(Notification.user_id)
+        ).all()
+        deleted = db.session.execute(db.delete(Notification).where(*criteria)
+                                       .execution_options(synchronize_session=False)).rowcount
+        _adjust_unread({user_id: -count for user_id, count in unread})
+        return deleted
+    
+    @staticmethod
+    def refresh_unread_counts(user_ids=None):
+        """Recompute the unread counters from the notification table in one
+        UPDATE (see `flask repair-notification-counters`)"""
+        unread = db.select(func.count(Notification.id))\
+                   .where(Notification.user_id == User.id, Notification.is_read.is_(False))\
+                   .scalar_subquery()
+        stmt = db.update(User).values(unread_notification_count=unread)\
+                 .execution_options(synchronize_session=False)
+        if user_ids is not None:
+            stmt = stmt.where(User.id.in_(user_ids))
+        updated = db.session.execute(stmt).rowcount
+        if user_ids is None:
+            user_ids = db.session.scalars(db.select(User.id)).all()
+        IdentityService.invalidate_on_commit(user_ids)
+        return updated
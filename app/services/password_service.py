@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.metrics import metrics
+
+pool_rejections = metrics.counter('password_pool_rejections_total',
+                                  'Password checks turned away because the hashing pool was full.')
+
+class PasswordPoolFull(Exception):
+    """The hashing pool already has as many checks running and waiting as it allows"""
+
+class PasswordPool:
+    """Bounded pool for password hashing.
+
+    At most `workers` hashes run at once in the process and at most
+    `queue_depth` more wait for a worker; further callers are rejected
+    immediately instead of piling up behind the CPU. The hash functions
+    release the GIL, so the workers run in parallel with request threads.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password')
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            pool_rejections.inc()
+            raise PasswordPoolFull()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+@lru_cache(maxsize=None)
+def _method_prefix(method):
+    """Method as Werkzeug records it in a hash, e.g. 'scrypt' -> 'scrypt:32768:8:1'"""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+def _check_and_upgrade(password_hash, password, method, salt_length):
+    """(valid, new hash or None); the new hash is made only for valid
+    passwords stored under another method"""
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if password_hash.split('$', 1)[0] != _method_prefix(method):
+        return True, generate_password_hash(password, method=method, salt_length=salt_length)
+    return True, None
+
+class PasswordService:
+    """Password hashing under the PASSWORD_HASH_METHOD policy"""
+
+    @staticmethod
+    def get_pool(app=None):
+        app = app or current_app._get_current_object()
+        pool = app.extensions.get('password_pool')
+        if pool is None:
+            pool = app.extensions.setdefault('password_pool', PasswordPool(
+                workers=app.config['PASSWORD_POOL_WORKERS'],
+                queue_depth=app.config['PASSWORD_POOL_QUEUE']
+            ))
+        return pool
+
+    @staticmethod
+    def hash_password(password, method=None, salt_length=None):
+        """Hash under the configured policy; pass method and salt_length when calling outside an app context"""
+        config = current_app.config if method is None or salt_length is None else {}
+        return generate_password_hash(password,
+                                      method=method or config['PASSWORD_HASH_METHOD'],
+                                      salt_length=salt_length or config['PASSWORD_SALT_LENGTH'])
+
+    @staticmethod
+    def verify(user, password):
+        """Check the user's password on the bounded pool.
+
+        Returns (valid, new_hash): new_hash is set when the stored hash was
+        made under an older policy and should replace it. Raises
+        PasswordPoolFull when the pool is saturated.
+        """
+        config = current_app.config
+        return PasswordService.get_pool().run(_check_and_upgrade, user.password_hash, password,
+                                              config['PASSWORD_HASH_METHOD'], config['PASSWORD_SALT_LENGTH'])
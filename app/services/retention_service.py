@@ -0,0 +1,179 @@
+from datetime import datetime, date, timedelta
+from flask import current_app
+from app import db
+from app.models.user import User
+from app.models.project import Project, project_members
+from app.models.task import Task, TaskComment
+from app.models.meeting import Meeting, meeting_attendees
+from app.models.notification import Notification
+from app.models.archived_project import ArchivedProject
+from app.services.identity_service import IdentityService
+from app.services.notification_service import NotificationService
+from app.services.search_service import SearchService
+from app.utils.write_queue import run_write
+
+def _rows(statement):
+    return [dict(row) for row in db.session.execute(statement).mappings()]
+
+def _delete(statement):
+    db.session.execute(statement.execution_options(synchronize_session=False))
+
+def _purge_notification_chunk(cutoff, after_id, chunk_size):
+    """Delete the next chunk of read notifications older than cutoff, in id
+    order from after_id; returns (deleted, last id looked at)"""
+    ids = db.session.scalars(
+        db.select(Notification.id)
+          .where(Notification.id > after_id, Notification.is_read.is_(True), Notification.created_at < cutoff)
+          .order_by(Notification.id).limit(chunk_size)
+    ).all()
+    if not ids:
+        return 0, None
+    # Only read notifications, so the unread counters are unaffected
+    _delete(db.delete(Notification).where(Notification.id.in_(ids)))
+    return len(ids), ids[-1]
+
+def _archive_project(project_id, end_before, idle_since):
+    """Move one project's graph into an ArchivedProject in the current
+    transaction; returns the archive's counts, or None when the project is
+    gone or no longer qualifies"""
+    project = db.session.execute(
+        db.select(Project.__table__).where(Project.id == project_id, Project.status == 'completed',
+                                           Project.end_date < end_before, Project.updated_at < idle_since)
+    ).mappings().first()
+    if project is None:
+        return None
+
+    task_ids = db.select(Task.id).where(Task.project_id == project_id)
+    meeting_ids = db.select(Meeting.id).where(Meeting.project_id == project_id)
+    member_ids = db.session.scalars(db.select(project_members.c.user_id)
+                                      .where(project_members.c.project_id == project_id)).all()
+    tasks = _rows(db.select(Task.__table__).where(Task.project_id == project_id).order_by(Task.id))
+    comments = _rows(db.select(TaskComment.__table__).where(TaskComment.task_id.in_(task_ids))
+                       .order_by(TaskComment.id))
+    meetings = _rows(db.select(Meeting.__table__).where(Meeting.project_id == project_id)
+                       .order_by(Meeting.meeting_date, Meeting.id))
+    attendees = db.session.execute(db.select(meeting_attendees)
+                                     .where(meeting_attendees.c.meeting_id.in_(meeting_ids))).all()
+
+    comments_by_task, attendees_by_meeting = {}, {}
+    for comment in comments:
+        comments_by_task.setdefault(comment['task_id'], []).append(comment)
+    for meeting_id, user_id in attendees:
+        attendees_by_meeting.setdefault(meeting_id, []).append(user_id)
+    for task in tasks:
+        task['comments'] = comments_by_task.get(task['id'], [])
+    for meeting in meetings:
+        meeting['attendees'] = attendees_by_meeting.get(meeting['id'], [])
+
+    # Names as they were, so the archive reads the same if accounts change later
+    user_ids = {project['pi_id'], *member_ids, *(user_id for _, user_id in attendees)}
+    user_ids.update(task[key] for task in tasks for key in ('assigned_to_id', 'created_by_id'))
+    user_ids.update(comment['user_id'] for comment in comments)
+    user_ids.update(meeting['created_by_id'] for meeting in meetings)
+    users = [{'id': user.id, 'name': user.get_full_name()}
+             for user in User.query.filter(User.id.in_(user_ids - {None}))]
+
+    payload, payload_size = ArchivedProject.pack({
+        'project': dict(project), 'members': member_ids, 'users': users,
+        'tasks': tasks, 'meetings': meetings,
+    })
+    db.session.add(ArchivedProject(
+        original_id=project_id, project_id=project['project_id'], title=project['title'],
+        start_date=project['start_date'], end_date=project['end_date'], pi_id=project['pi_id'],
+        task_count=len(tasks), comment_count=len(comments), meeting_count=len(meetings),
+        payload=payload, payload_size=payload_size
+    ))
+
+    connection = db.session.connection()
+    SearchService.remove_many(connection, 'project', [project_id])
+    SearchService.remove_many(connection, 'task', [task['id'] for task in tasks])
+    SearchService.remove_many(connection, 'comment', [comment['id'] for comment in comments])
+    SearchService.remove_many(connection, 'meeting', [meeting['id'] for meeting in meetings])
+
+    # Core deletes, children first; they skip the ORM events, so the caches
+    # those events maintain are updated below
+    NotificationService.delete_notifications(db.or_(Notification.project_id == project_id,
+                                                    Notification.task_id.in_(task_ids),
+                                                    Notification.meeting_id.in_(meeting_ids)))
+    _delete(db.delete(TaskComment).where(TaskComment.task_id.in_(task_ids)))
+    _delete(db.delete(meeting_attendees).where(meeting_attendees.c.meeting_id.in_(meeting_ids)))
+    _delete(db.delete(Meeting).where(Meeting.project_id == project_id))
+    _delete(db.delete(Task).where(Task.project_id == project_id))
+    _delete(db.delete(project_members).where(project_members.c.project_id == project_id))
+    _delete(db.delete(Project).where(Project.id == project_id))
+
+    if meetings:
+        calendar_users = {project['pi_id'], *(user_id for _, user_id in attendees)}
+        db.session.execute(db.update(User).where(User.id.in_(calendar_users))
+                             .values(calendar_version=User.calendar_version + 1,
+                                     calendar_updated_at=datetime.utcnow())
+                             .execution_options(synchronize_session=False))
+    IdentityService.invalidate_on_commit(member_ids)
+    return {'tasks': len(tasks), 'comments': len(comments), 'meetings': len(meetings),
+            'bytes': payload_size, 'compressed_bytes': len(payload)}
+
+class RetentionService:
+    """Retention policies for history that would otherwise grow forever.
+
+    Read notifications are deleted after NOTIFICATION_RETENTION_DAYS, and
+    completed projects that ended and have been idle for
+    PROJECT_ARCHIVE_AFTER_DAYS move into ArchivedProject. Both run in
+    bounded transactions through run_write: a chunk of notifications, or
+    one project's graph, per transaction.
+    """
+
+    @staticmethod
+    def purge_notifications(days=None, chunk_size=None, now=None):
+        """Delete read notifications older than `days`; returns how many"""
+        config = current_app.config
+        days = config['NOTIFICATION_RETENTION_DAYS'] if days is None else days
+        if not days:
+            return 0
+        chunk_size = chunk_size or config['RETENTION_CHUNK_SIZE']
+        cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+        total, after_id = 0, 0
+        while after_id is not None:
+            deleted, after_id = run_write(_purge_notification_chunk, cutoff, after_id, chunk_size)
+            total += deleted
+        return total
+
+    @staticmethod
+    def archivable_project_ids(days=None, today=None):
+        """(ids of the projects due for archiving, end date cutoff, last activity cutoff)"""
+        config = current_app.config
+        days = config['PROJECT_ARCHIVE_AFTER_DAYS'] if days is None else days
+        if not days:
+            return [], None, None
+        today = today or date.today()
+        end_before = today - timedelta(days=days)
+        idle_since = datetime.combine(end_before, datetime.min.time())
+        project_ids = db.session.scalars(
+            db.select(Project.id).where(Project.status == 'completed', Project.end_date < end_before,
+                                        Project.updated_at < idle_since).order_by(Project.id)
+        ).all()
+        return project_ids, end_before, idle_since
+
+    @staticmethod
+    def archive_projects(days=None, today=None):
+        """Archive every qualifying completed project, one per transaction;
+        returns the number archived"""
+        project_ids, end_before, idle_since = RetentionService.archivable_project_ids(days, today)
+        db.session.rollback()  # end our read transaction before the writer takes the lock
+        archived = 0
+        for project_id in project_ids:
+            counts = run_write(_archive_project, project_id, end_before, idle_since)
+            if counts:
+                archived += 1
+                current_app.logger.info(f"🗄️ Archived project {project_id}: {counts['tasks']} tasks, "
+                                        f"{counts['comments']} comments, {counts['meetings']} meetings, "
+                                        f"{counts['bytes']} bytes as {counts['compressed_bytes']}")
+        return archived
+
+    @staticmethod
+    def apply():
+        """Run every retention policy; the periodic job and `flask apply-retention` call this"""
+        purged = RetentionService.purge_notifications()
+        archived = RetentionService.archive_projects()
+        if purged or archived:
+            current_app.logger.info(f"Retention: purged {purged} notifications, archived {archived} projects")
+        return {'notifications': purged, 'projects': archived}
@@ -0,0 +1,321 @@
+import re
+from flask import current_app
+from markupsafe import escape, Markup
+from sqlalchemy import text
+from app import db
+from app.models.project import Project
+from app.models.task import Task, TaskComment
+from app.models.meeting import Meeting
+
+# Kind codes keep SQLite rowids (object_id * 8 + code) unique across kinds
+KIND_CODES = {'project': 1, 'task': 2, 'comment': 3, 'meeting': 4}
+
+# Markers around matched terms in snippets; replaced with <mark> after escaping
+HIGHLIGHT_START, HIGHLIGHT_END = '\x02', '\x03'
+
+# Words in nearly every document; bm25 walks a term's whole posting list to
+# weigh it, so these would dominate query time while barely affecting rank
+STOPWORDS = frozenset('''a an and are as at be but by for from has have in into is it its of on or
+    that the their this to was were will with'''.split())
+
+COLUMNS = 'kind, object_id, project_id, task_id, label, title, body'
+
+# On SQLite each row also carries access tokens in an indexed `scope` column,
+# so permission filtering is part of the MATCH instead of a per-hit check:
+#   k<kind>     the row's kind
+#   p<id>       the project whose team members may see the row
+#   u<id>       a task's assignee or a meeting's attendee
+#   o<id>       the PI of a meeting's project
+SQLITE_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body, scope,
+        label UNINDEXED, kind UNINDEXED, object_id UNINDEXED, project_id UNINDEXED, task_id UNINDEXED,
+        tokenize = 'porter unicode61', prefix = '3'
+    )""",
+]
+
+POSTGRES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS search_index (
+        kind VARCHAR(10) NOT NULL,
+        object_id INTEGER NOT NULL,
+        project_id INTEGER,
+        task_id INTEGER,
+        label TEXT,
+        title TEXT,
+        body TEXT,
+        document TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B')
+        ) STORED,
+        PRIMARY KEY (kind, object_id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_search_index_project_id ON search_index (project_id)",
+    "CREATE INDEX IF NOT EXISTS ix_search_index_task_id ON search_index (task_id)",
+]
+
+# Source rows, one SELECT producing COLUMNS and scope per kind; {agg} is the
+# dialect's string aggregate (both take a separator argument)
+REBUILD_SELECTS = {
+    'project': """SELECT 'project' AS kind, id AS object_id, id AS project_id, NULL AS task_id,
+                         title AS label, title, coalesce(description, '') AS body,
+                         'kproject p' || id AS scope
+                  FROM project""",
+    'task': """SELECT 'task' AS kind, id AS object_id, project_id, id AS task_id,
+                      title AS label, title, coalesce(description, '') AS body,
+                      'ktask p' || project_id || coalesce(' u' || assigned_to_id, '') AS scope
+               FROM task""",
+    'comment': """SELECT 'comment' AS kind, task_comment.id AS object_id, task.project_id, task.id AS task_id,
+                         task.title AS label, '' AS title, task_comment.content AS body,
+                         'kcomment p' || task.project_id || coalesce(' u' || task.assigned_to_id, '') AS scope
+                  FROM task_comment JOIN task ON task.id = task_comment.task_id""",
+    'meeting': """SELECT 'meeting' AS kind, meeting.id AS object_id, meeting.project_id, NULL AS task_id,
+                         meeting.title AS label, meeting.title, coalesce(meeting.agenda, '') AS body,
+                         'kmeeting o' || project.pi_id || coalesce((
+                             SELECT {agg}(' u' || user_id, '') FROM meeting_attendees
+                             WHERE meeting_id = meeting.id), '') AS scope
+                  FROM meeting JOIN project ON project.id = meeting.project_id""",
+}
+
+# Who may see a hit on PostgreSQL; mirrors the rules in app.utils.access
+ACCESS_FILTER = """(
+    (:is_pi AND kind != 'meeting')
+    OR (kind != 'meeting' AND project_id IN (SELECT project_id FROM project_members WHERE user_id = :user_id))
+    OR (kind IN ('task', 'comment') AND task_id IN (SELECT id FROM task WHERE assigned_to_id = :user_id))
+    OR (kind = 'meeting' AND (project_id IN (SELECT id FROM project WHERE pi_id = :user_id)
+                              OR object_id IN (SELECT meeting_id FROM meeting_attendees WHERE user_id = :user_id)))
+)"""
+
+# Ranking is limited to the newest :window matches (found by rowid, which
+# needs no scoring) so common terms cost the same as rare ones
+SQLITE_SEARCH = """
+    SELECT kind, object_id, project_id, task_id, label,
+           coalesce(nullif(snippet(search_index, 1, :start, :end, '…', 16), ''),
+                    snippet(search_index, 0, :start, :end, '…', 16)) AS snippet
+    FROM search_index
+    WHERE search_index MATCH :query AND rowid >= coalesce((
+        SELECT rowid FROM search_index WHERE search_index MATCH :query
+        ORDER BY rowid DESC LIMIT 1 OFFSET :window - 1
+    ), 0)
+    ORDER BY bm25(search_index, 10.0, 1.0, 0.0)
+    LIMIT :limit OFFSET :offset
+"""
+
+POSTGRES_SEARCH = f"""
+    SELECT kind, object_id, project_id, task_id, label,
+           ts_headline('english', coalesce(nullif(body, ''), title), query,
+                       'StartSel=' || :start || ', StopSel=' || :end || ', MaxWords=30, MinWords=10') AS snippet
+    FROM search_index, to_tsquery('english', :query) AS query
+    WHERE document @@ query AND {{kind_filter}} AND {ACCESS_FILTER}
+    ORDER BY ts_rank(document, query) DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+# Changes to these attributes rewrite the object's index row
+INDEXED_FIELDS = {
+    Project: ('title', 'description', 'pi_id'),
+    Task: ('title', 'description', 'project_id', 'assigned_to_id'),
+    TaskComment: ('content', 'task_id'),
+    Meeting: ('title', 'agenda', 'project_id', 'attendees'),
+}
+
+def _is_sqlite(connection):
+    return connection.dialect.name == 'sqlite'
+
+def _terms(query):
+    """Query words without stopwords (unless that leaves nothing), at most ten"""
+    terms = re.findall(r'\w+', query.lower())
+    return ([term for term in terms if term not in STOPWORDS] or terms)[:10]
+
+def _match_expression(terms, sqlite):
+    """All terms required, last one as a prefix so results appear while typing"""
+    if sqlite:
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+    return ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+
+def _scope_expression(user, kind):
+    """FTS5 filter on the scope column for the rows user may see, appended to
+    the text match. PIs see everything but other PIs' meetings, which is
+    written as a NOT so no query has to walk a posting list of every row."""
+    expression = f' AND scope : k{kind}' if kind else ''
+    if user.is_pi():
+        return f'{expression} NOT (scope : kmeeting NOT scope : (u{user.id} OR o{user.id}))'
+    tokens = [f'u{user.id}'] + [f'p{project_id}' for project_id in sorted(user.get_member_project_ids())]
+    return f"{expression} AND scope : ({' OR '.join(tokens)})"
+
+def _highlight(snippet):
+    return Markup(str(escape(snippet or '')).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+def _assignee_token(user_id):
+    return f' u{user_id}' if user_id else ''
+
+def _document(connection, target):
+    """Index row (a dict of COLUMNS and scope) for a model instance"""
+    if isinstance(target, Project):
+        return dict(kind='project', object_id=target.id, project_id=target.id, task_id=None,
+                    label=target.title, title=target.title, body=target.description or '',
+                    scope=f'kproject p{target.id}')
+    if isinstance(target, Task):
+        return dict(kind='task', object_id=target.id, project_id=target.project_id, task_id=target.id,
+                    label=target.title, title=target.title, body=target.description or '',
+                    scope=f'ktask p{target.project_id}{_assignee_token(target.assigned_to_id)}')
+    if isinstance(target, Meeting):
+        pi_id = connection.execute(text('SELECT pi_id FROM project WHERE id = :id'),
+                                   {'id': target.project_id}).scalar()
+        attendees = ''.join(f' u{user.id}' for user in target.attendees)
+        return dict(kind='meeting', object_id=target.id, project_id=target.project_id, task_id=None,
+                    label=target.title, title=target.title, body=target.agenda or '',
+                    scope=f'kmeeting o{pi_id}{attendees}')
+    project_id, task_title, assigned_to_id = connection.execute(
+        text('SELECT project_id, title, assigned_to_id FROM task WHERE id = :id'), {'id': target.task_id}).one()
+    return SearchService.comment_document(target.id, target.content, target.task_id,
+                                          project_id, task_title, assigned_to_id)
+
+def _kind_of(target):
+    return 'comment' if isinstance(target, TaskComment) else target.__tablename__
+
+class SearchService:
+    """Full-text search over projects, tasks, comments and meetings.
+
+    Uses an FTS5 table on SQLite and a tsvector column with a GIN index on
+    PostgreSQL. ORM events keep the index in step with every flush; code
+    that writes with Core statements calls rebuild(), reindex() or
+    index_documents().
+    """
+
+    @staticmethod
+    def create_index(connection):
+        schema = SQLITE_SCHEMA if _is_sqlite(connection) else POSTGRES_SCHEMA
+        for statement in schema:
+            connection.execute(text(statement))
+
+    @staticmethod
+    def rebuild(connection, kinds=None):
+        """Recreate index rows from the source tables; returns the indexed row count"""
+        SearchService.create_index(connection)
+        for kind in kinds or REBUILD_SELECTS:
+            connection.execute(text('DELETE FROM search_index WHERE kind = :kind'), {'kind': kind})
+            SearchService.reindex(connection, kind)
+        return connection.execute(text('SELECT count(*) FROM search_index')).scalar()
+
+    @staticmethod
+    def reindex(connection, kind, where='1 = 1', params=None):
+        """Rewrite the index rows of one kind whose source row matches `where`,
+        a condition on the output columns of its REBUILD_SELECTS query"""
+        params = params or {}
+        if _is_sqlite(connection):
+            source = f"SELECT * FROM ({REBUILD_SELECTS[kind].format(agg='group_concat')}) WHERE {where}"
+            rowid = f'object_id * 8 + {KIND_CODES[kind]}'
+            connection.execute(text(f'DELETE FROM search_index WHERE rowid IN (SELECT {rowid} FROM ({source}))'),
+                               params)
+            connection.execute(text(f'INSERT INTO search_index (rowid, {COLUMNS}, scope) '
+                                    f'SELECT {rowid}, {COLUMNS}, scope FROM ({source})'), params)
+        else:
+            source = f"SELECT * FROM ({REBUILD_SELECTS[kind].format(agg='string_agg')}) AS source WHERE {where}"
+            connection.execute(text(f"""
+                INSERT INTO search_index ({COLUMNS})
+                SELECT {COLUMNS} FROM ({source}) AS rows
+                ON CONFLICT (kind, object_id) DO UPDATE SET
+                    project_id = EXCLUDED.project_id, task_id = EXCLUDED.task_id,
+                    label = EXCLUDED.label, title = EXCLUDED.title, body = EXCLUDED.body
+            """), params)
+
+    @staticmethod
+    def index_documents(connection, documents):
+        """Insert or replace index rows given as dicts of COLUMNS and scope"""
+        if not documents:
+            return
+        if _is_sqlite(connection):
+            rows = [dict(document, rowid=document['object_id'] * 8 + KIND_CODES[document['kind']])
+                    for document in documents]
+            connection.execute(text('DELETE FROM search_index WHERE rowid = :rowid'), rows)
+            connection.execute(text(f'INSERT INTO search_index (rowid, {COLUMNS}, scope) '
+                                    f'VALUES (:rowid, :kind, :object_id, :project_id, :task_id, :label, :title, :body, :scope)'),
+                               rows)
+        else:
+            connection.execute(text(f"""
+                INSERT INTO search_index ({COLUMNS})
+                VALUES (:kind, :object_id, :project_id, :task_id, :label, :title, :body)
+                ON CONFLICT (kind, object_id) DO UPDATE SET
+                    project_id = EXCLUDED.project_id, task_id = EXCLUDED.task_id,
+                    label = EXCLUDED.label, title = EXCLUDED.title, body = EXCLUDED.body
+            """), documents)
+
+    @staticmethod
+    def comment_document(comment_id, content, task_id, project_id, task_title, assigned_to_id):
+        """Index row for a comment, for callers that insert comments with Core"""
+        return dict(kind='comment', object_id=comment_id, project_id=project_id, task_id=task_id,
+                    label=task_title, title='', body=content,
+                    scope=f'kcomment p{project_id}{_assignee_token(assigned_to_id)}')
+    
+    @staticmethod
+    def remove(connection, kind, object_id):
+        SearchService.remove_many(connection, kind, [object_id])
+
+    @staticmethod
+    def remove_many(connection, kind, object_ids):
+        """Delete the index rows of one kind for the given ids, in one executemany"""
+        if not object_ids:
+            return
+        if _is_sqlite(connection):
+            connection.execute(text('DELETE FROM search_index WHERE rowid = :rowid'),
+                               [{'rowid': object_id * 8 + KIND_CODES[kind]} for object_id in object_ids])
+        else:
+            connection.execute(text('DELETE FROM search_index WHERE kind = :kind AND object_id = :object_id'),
+                               [{'kind': kind, 'object_id': object_id} for object_id in object_ids])
+
+    @staticmethod
+    def search(user, query, kind=None, limit=25, offset=0):
+        """Ranked hits visible to user, as dicts with kind, id, label, snippet"""
+        terms = _terms(query)
+        if not terms:
+            return []
+        connection = db.session.connection()
+        params = {'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END, 'limit': limit, 'offset': offset}
+        if _is_sqlite(connection):
+            statement = SQLITE_SEARCH
+            params.update(query=f'{{title body}} : ({_match_expression(terms, True)}){_scope_expression(user, kind)}',
+                          window=current_app.config['SEARCH_RANK_WINDOW'])
+        else:
+            statement = POSTGRES_SEARCH.format(kind_filter='kind = :kind' if kind else '1 = 1')
+            params.update(query=_match_expression(terms, False), kind=kind, is_pi=user.is_pi(), user_id=user.id)
+        rows = connection.execute(text(statement), params).mappings().all()
+        return [{'kind': row['kind'],
+                 'id': row['object_id'],
+                 'project_id': row['project_id'],
+                 'task_id': row['task_id'],
+                 'label': row['label'],
+                 'snippet': _highlight(row['snippet'])} for row in rows]
+
+@db.event.listens_for(db.metadata, 'after_create')
+def _create_search_index(metadata, connection, **kw):
+    SearchService.create_index(connection)
+
+def _indexed_fields_changed(target):
+    state = db.inspect(target)
+    return any(state.attrs[key].history.has_changes() for key in INDEXED_FIELDS[type(target)])
+
+def _index_target(mapper, connection, target):
+    SearchService.index_documents(connection, [_document(connection, target)])
+
+def _update_target(mapper, connection, target):
+    if not _indexed_fields_changed(target):
+        return
+    _index_target(mapper, connection, target)
+    attrs = db.inspect(target).attrs
+    # Comments carry their task's project and assignee, meetings their project's PI
+    if isinstance(target, Task) and (attrs.project_id.history.has_changes()
+                                     or attrs.assigned_to_id.history.has_changes()):
+        SearchService.reindex(connection, 'comment', 'task_id = :id', {'id': target.id})
+    if isinstance(target, Project) and attrs.pi_id.history.has_changes():
+        SearchService.reindex(connection, 'meeting', 'project_id = :id', {'id': target.id})
+
+def _remove_target(mapper, connection, target):
+    SearchService.remove(connection, _kind_of(target), target.id)
+
+for model in INDEXED_FIELDS:
+    db.event.listen(model, 'after_insert', _index_target)
+    db.event.listen(model, 'after_update', _update_target)
+    db.event.listen(model, 'after_delete', _remove_target)
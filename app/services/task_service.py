@@ -0,0 +1,170 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import contains_eager
+from app import db
+from app.models.task import Task, TaskComment, STATUS_COUNTERS
+from app.models.project import project_members
+from app.services.notification_service import NotificationService
+from app.services.search_service import SearchService
+
+PRIORITIES = ('low', 'medium', 'high')
+
+class TaskBatchError(Exception):
+    """A batch that was rejected as a whole; errors lists {'index', 'id', 'error'}"""
+
+    def __init__(self, errors, status_code=400):
+        super().__init__(f'{len(errors)} invalid batch items')
+        self.errors = errors
+        self.status_code = status_code
+
+def _parse_item(item):
+    """(changes, error) for one batch item"""
+    if not isinstance(item, dict):
+        return None, 'must be an object'
+    task_id = item.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        return None, 'id must be an integer'
+    changes = {'id': task_id}
+    if 'status' in item:
+        if item['status'] not in STATUS_COUNTERS:
+            return None, f"status must be one of {', '.join(STATUS_COUNTERS)}"
+        changes['status'] = item['status']
+    if 'priority' in item:
+        if item['priority'] not in PRIORITIES:
+            return None, f"priority must be one of {', '.join(PRIORITIES)}"
+        changes['priority'] = item['priority']
+    if 'assigned_to_id' in item:
+        assignee_id = item['assigned_to_id']
+        if not isinstance(assignee_id, int) or isinstance(assignee_id, bool):
+            return None, 'assigned_to_id must be an integer'
+        changes['assigned_to_id'] = assignee_id
+    comment = item.get('comment')
+    if comment is not None:
+        if not isinstance(comment, str):
+            return None, 'comment must be a string'
+        if comment.strip():
+            changes['comment'] = comment.strip()
+    if len(changes) == 1:
+        return None, 'nothing to change'
+    return changes, None
+
+class TaskService:
+    @staticmethod
+    def set_status(task, status, now=None):
+        """Change the status, stamping completed_at on completion and clearing it on reopening"""
+        if status == task.status:
+            return False
+        task.status = status
+        task.completed_at = (now or datetime.utcnow()) if status == 'completed' else None
+        return True
+
+    @staticmethod
+    def apply_batch(user_id, items):
+        """Apply status, priority and assignee changes and comments to many tasks.
+
+        items are dicts with an id and any of status, priority,
+        assigned_to_id and comment. Status and priority may be changed by the
+        assignee or the project's PI, the assignee only by the PI and only to
+        a team member of the project. Permissions are checked for all items
+        with one query and the batch is applied all-or-nothing: any invalid
+        or forbidden item raises TaskBatchError before anything is written.
+        Comments and assignment notifications are inserted in bulk; the
+        caller commits (run_write does). Returns counts of what changed.
+        """
+        max_items = current_app.config['TASK_BATCH_MAX_ITEMS']
+        if not isinstance(items, list) or not items:
+            raise TaskBatchError([{'index': None, 'id': None, 'error': 'items must be a non-empty list'}])
+        if len(items) > max_items:
+            raise TaskBatchError([{'index': None, 'id': None, 'error': f'at most {max_items} items per batch'}])
+
+        errors, batch, seen = [], [], set()
+        for index, item in enumerate(items):
+            changes, error = _parse_item(item)
+            if changes and changes['id'] in seen:
+                error = 'task appears more than once'
+            if error:
+                errors.append({'index': index, 'id': item.get('id') if isinstance(item, dict) else None,
+                               'error': error})
+                continue
+            seen.add(changes['id'])
+            batch.append((index, changes))
+        if errors:
+            raise TaskBatchError(errors)
+
+        # One query loads every task with its project, which is all the
+        # permission checks need
+        tasks = {task.id: task for task in Task.query.join(Task.project)
+                 .options(contains_eager(Task.project))
+                 .filter(Task.id.in_(seen))}
+
+        assignees = {(tasks[changes['id']].project_id, changes['assigned_to_id'])
+                     for _, changes in batch
+                     if changes['id'] in tasks and 'assigned_to_id' in changes}
+        members = set()
+        if assignees:
+            project_ids = {project_id for project_id, _ in assignees}
+            user_ids = {assignee_id for _, assignee_id in assignees}
+            members = set(db.session.execute(
+                db.select(project_members.c.project_id, project_members.c.user_id)
+                  .where(project_members.c.project_id.in_(project_ids),
+                         project_members.c.user_id.in_(user_ids))
+            ).all())
+
+        for index, changes in batch:
+            task = tasks.get(changes['id'])
+            error = None
+            if task is None:
+                error = 'not found'
+            elif task.project.pi_id != user_id and (task.assigned_to_id != user_id
+                                                    or 'assigned_to_id' in changes):
+                error = 'forbidden'
+            elif 'assigned_to_id' in changes and (task.project_id, changes['assigned_to_id']) not in members:
+                error = 'assignee is not a team member of the project'
+            if error:
+                errors.append({'index': index, 'id': changes['id'], 'error': error})
+        if errors:
+            kinds = {error['error'] for error in errors}
+            raise TaskBatchError(errors, 403 if 'forbidden' in kinds else 404 if 'not found' in kinds else 400)
+
+        now = datetime.utcnow()
+        updated, comments, notifications = 0, [], []
+        for _, changes in batch:
+            task = tasks[changes['id']]
+            changed = False
+            if 'status' in changes:
+                changed |= TaskService.set_status(task, changes['status'], now)
+            if changes.get('priority', task.priority) != task.priority:
+                task.priority = changes['priority']
+                changed = True
+            if changes.get('assigned_to_id', task.assigned_to_id) != task.assigned_to_id:
+                task.assigned_to_id = changes['assigned_to_id']
+                changed = True
+                notifications.append({
+                    'user_id': task.assigned_to_id,
+                    'title': f"New Task Assigned: {task.title}",
+                    'message': f"You have been assigned a new task in project '{task.project.title}'",
+                    'notification_type': 'task_assigned',
+                    'project_id': task.project_id,
+                    'task_id': task.id
+                })
+            if 'comment' in changes:
+                comments.append((task, changes['comment']))
+            updated += changed
+
+        # The flush writes the task UPDATEs (ORM events keep the project
+        # counters and search rows in step); comments go in with one
+        # multi-row INSERT and are indexed with one statement per step
+        db.session.flush()
+        if comments:
+            inserted = db.session.execute(
+                db.insert(TaskComment).returning(TaskComment.id, TaskComment.task_id, TaskComment.content),
+                [{'content': content, 'task_id': task.id, 'user_id': user_id, 'created_at': now}
+                 for task, content in comments]
+            ).all()
+            SearchService.index_documents(db.session.connection(), [
+                SearchService.comment_document(comment_id, content, task_id, tasks[task_id].project_id,
+                                               tasks[task_id].title, tasks[task_id].assigned_to_id)
+                for comment_id, task_id, content in inserted
+            ])
+        NotificationService.insert_notifications(notifications)
+        return {'updated': updated, 'comments': len(comments), 'notifications': len(notifications)}
@@ -96,21 +96,19 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Auto-refresh notifications (every 30 seconds)
-    function refreshNotifications() {
-        // This would typically make an AJAX call to get new notifications
-        // For now, we'll just add a visual indicator
-        var notificationBadge = document.querySelector('.notification-badge');
-        if (notificationBadge) {
-            notificationBadge.classList.add('pulse');
-            setTimeout(function() {
-                notificationBadge.classList.remove('pulse');
-            }, 1000);
-        }
-    }
+    // "Load more" buttons for cursor-paginated listings
+    document.querySelectorAll('[data-load-more]').forEach(function(button) {
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadMore(button);
+        });
+    });
 
-    // Refresh notifications every 30 seconds
-    setInterval(refreshNotifications, 30000);
+    // Live notifications: Server-Sent Events, falling back to long-polling
+    var notificationBell = document.getElementById('notificationBell');
+    if (notificationBell) {
+        initNotifications(notificationBell);
+    }
 });
 
 // Utility functions
@@ -153,6 +151,114 @@ function formatDateTime(dateTimeString) {
     });
 }
 
+function loadMore(button) {
+    var target = document.querySelector(button.dataset.loadMore);
+    var url = new URL(button.href, window.location.href);
+    url.searchParams.set('partial', '1');
+    button.classList.add('disabled');
+
+    fetch(url, { credentials: 'same-origin' })
+        .then(function(response) {
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            var nextCursor = response.headers.get('X-Next-Cursor');
+            return response.text().then(function(html) {
+                target.insertAdjacentHTML('beforeend', html);
+                if (nextCursor) {
+                    var nextUrl = new URL(button.href, window.location.href);
+                    nextUrl.searchParams.set('cursor', nextCursor);
+                    button.href = nextUrl.toString();
+                    button.classList.remove('disabled');
+                } else {
+                    button.remove();
+                }
+            });
+        })
+        .catch(function() {
+            // Fall back to a normal navigation to the next page
+            window.location.href = button.href;
+        });
+}
+
+function updateNotificationBadge(count) {
+    var notificationBadge = document.querySelector('.notification-badge');
+    if (!notificationBadge) {
+        return;
+    }
+    notificationBadge.textContent = count > 99 ? '99+' : count;
+    notificationBadge.classList.toggle('d-none', !count);
+    notificationBadge.classList.add('pulse');
+    setTimeout(function() {
+        notificationBadge.classList.remove('pulse');
+    }, 1000);
+}
+
+function showNotifications(notifications) {
+    notifications.forEach(function(notification) {
+        showAlert('<strong>' + escapeHtml(notification.title) + '</strong><br>' + escapeHtml(notification.message), 'info');
+    });
+}
+
+function escapeHtml(text) {
+    var div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function initNotifications(bell) {
+    var streamUrl = bell.dataset.streamUrl;
+    var pollUrl = bell.dataset.pollUrl;
+
+    // The page renders the initial badge; the stream or poll keeps it current
+    if (streamUrl && window.EventSource) {
+        var failures = 0;
+        var source = new EventSource(streamUrl);
+        source.addEventListener('unread', function(e) {
+            failures = 0;
+            updateNotificationBadge(JSON.parse(e.data).count);
+        });
+        source.addEventListener('notifications', function(e) {
+            var data = JSON.parse(e.data);
+            updateNotificationBadge(data.count);
+            showNotifications(data.notifications);
+        });
+        source.onerror = function() {
+            // Streams end periodically and reconnect; give up after repeated failures, or at
+            // once when the server refused the stream (503 over its per-process cap)
+            failures += 1;
+            if (failures >= 3 || source.readyState === EventSource.CLOSED) {
+                source.close();
+                longPollNotifications(pollUrl, null);
+            }
+        };
+    } else {
+        longPollNotifications(pollUrl, null);
+    }
+}
+
+function longPollNotifications(pollUrl, after) {
+    var url = after === null ? pollUrl : pollUrl + '?after=' + after;
+    fetch(url, { credentials: 'same-origin' })
+        .then(function(response) {
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            return response.json();
+        })
+        .then(function(data) {
+            updateNotificationBadge(data.count);
+            if (after !== null) {
+                showNotifications(data.notifications);
+            }
+            // A non-zero wait means the server had no thread to spare for a long-poll
+            setTimeout(function() { longPollNotifications(pollUrl, data.after); }, (data.wait || 0) * 1000);
+        })
+        .catch(function() {
+            setTimeout(function() { longPollNotifications(pollUrl, after); }, 30000);
+        });
+}
+
 // Export functions if needed
 window.PIManagement = {
     showAlert: showAlert,
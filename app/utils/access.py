@@ -0,0 +1,57 @@
+from functools import wraps
+from flask import abort
+from flask_login import current_user
+from sqlalchemy import exists, or_
+from app import db
+from app.models.project import Project, project_members
+from app.models.task import Task
+from app.models.meeting import Meeting, meeting_attendees
+
+# Each policy returns None when the object does not exist, otherwise whether
+# the user may see it. Checks run as one primary-key lookup with indexed
+# EXISTS subqueries, so their cost does not grow with team size.
+
+def _is_member(user, project_id_column):
+    return exists().where(project_members.c.project_id == project_id_column,
+                          project_members.c.user_id == user.id)
+
+def can_view_project(user, project_id):
+    """PIs and the project's team members"""
+    if user.is_pi() or project_id in user.get_member_project_ids():
+        return True
+    found = db.session.scalar(db.select(Project.id).where(Project.id == project_id))
+    return False if found else None
+
+def can_view_task(user, task_id):
+    """PIs, team members of the task's project and the assignee"""
+    if user.is_pi():
+        return True
+    return db.session.scalar(
+        db.select(or_(Task.assigned_to_id == user.id, _is_member(user, Task.project_id)))
+          .where(Task.id == task_id)
+    )
+
+def can_view_meeting(user, meeting_id):
+    """The PI of the meeting's project and the attendees"""
+    return db.session.scalar(
+        db.select(or_(
+            exists().where(Project.id == Meeting.project_id, Project.pi_id == user.id),
+            exists().where(meeting_attendees.c.meeting_id == Meeting.id,
+                           meeting_attendees.c.user_id == user.id)
+        )).where(Meeting.id == meeting_id)
+    )
+
+def access_required(policy, arg='id'):
+    """Abort with 404/403 unless policy allows current_user to see the object
+    whose id is the view argument `arg`. Apply below @login_required."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            allowed = policy(current_user, kwargs[arg])
+            if allowed is None:
+                abort(404)
+            if not allowed:
+                abort(403)
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
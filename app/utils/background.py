@@ -0,0 +1,34 @@
+import threading
+
+class PeriodicJob(threading.Thread):
+    """Daemon thread that runs a function inside an app context every `interval` seconds"""
+
+    def __init__(self, app, name, func, interval):
+        super(PeriodicJob, self).__init__(name=name, daemon=True)
+        self.app = app
+        self.func = func
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        with self.app.app_context():
+            try:
+                return self.func()
+            except Exception:
+                self.app.logger.exception(f"❌ Background job '{self.name}' failed")
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
+
+    def stop(self):
+        self._stop_event.set()
+
+def start_periodic_job(app, name, func, interval):
+    """Start `func` on a background timer; a non-positive interval disables it"""
+    if not interval or interval <= 0:
+        return None
+    job = PeriodicJob(app, name, func, interval)
+    job.start()
+    app.extensions.setdefault('background_jobs', {})[name] = job
+    return job
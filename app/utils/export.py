@@ -0,0 +1,66 @@
+import csv
+import io
+import tempfile
+from flask import Response, stream_with_context
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'xlsx' or Workbook is not None]
+
+def _safe_row(row):
+    """Row values with text that would read as a formula prefixed by a quote"""
+    return ["'" + value if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in row]
+
+def stream_csv(header, rows, chunk_rows=500):
+    """Yield CSV text in chunks of chunk_rows rows, so memory use does not grow with the export"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # lets Excel detect UTF-8
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(_safe_row(row))
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_xlsx(header, rows, sheet_title, chunk_size=64 * 1024):
+    """Yield an XLSX workbook built with openpyxl's write-only mode, which
+    spools rows to a temporary file instead of keeping them in memory"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(_safe_row(row))
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        chunk = output.read(chunk_size)
+        while chunk:
+            yield chunk
+            chunk = output.read(chunk_size)
+
+def export_response(filename, header, rows, fmt):
+    """Chunked download response streaming rows as CSV or XLSX"""
+    if fmt == 'xlsx':
+        body = stream_xlsx(header, rows, filename[:31])
+    else:
+        body = stream_csv(header, rows)
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    response.headers['X-Accel-Buffering'] = 'no'  # keep reverse proxies from buffering the stream
+    return response
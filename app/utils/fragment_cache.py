@@ -0,0 +1,137 @@
+import hashlib
+import os
+import tempfile
+import time
+from flask import current_app
+from markupsafe import Markup
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+try:
+    import redis
+except ImportError:  # the Redis backend is optional
+    redis = None
+
+fragment_lookups = metrics.counter('fragment_cache_lookups_total', 'Template fragment cache lookups by fragment and result.')
+
+class MemoryBackend:
+    """Per-process LRU"""
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+class FileSystemBackend:
+    """One file per fragment, shared by every process on the host.
+
+    A file's mtime is its write time; expired files are skipped on read and
+    removed every `prune_every` writes.
+    """
+
+    def __init__(self, directory, ttl, prune_every=500):
+        self.directory = directory
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.html')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key, value):
+        # Write then rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(value)
+        os.replace(temp_path, self._path(key))
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self):
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass  # removed by another process
+
+class RedisBackend:
+    """Shared cache in Redis; entries expire server-side and errors read as misses"""
+
+    def __init__(self, url, ttl, prefix='fragment:'):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+
+    def get(self, key):
+        try:
+            value = self._client.get(self.prefix + key)
+        except redis.RedisError:
+            return None
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value):
+        try:
+            self._client.setex(self.prefix + key, self.ttl, value.encode('utf-8'))
+        except redis.RedisError:
+            pass
+
+def create_backend(app):
+    """Backend named by FRAGMENT_CACHE_BACKEND ('memory', 'filesystem', 'redis' or 'none')"""
+    config = app.config
+    name = config['FRAGMENT_CACHE_BACKEND']
+    if name == 'redis' and redis is None:
+        app.logger.warning("⚠️  redis is not installed; using the in-process fragment cache")
+        name = 'memory'
+    if name == 'memory':
+        return MemoryBackend(config['FRAGMENT_CACHE_SIZE'], config['FRAGMENT_CACHE_TTL'])
+    if name == 'filesystem':
+        return FileSystemBackend(config['FRAGMENT_CACHE_DIR'], config['FRAGMENT_CACHE_TTL'])
+    if name == 'redis':
+        return RedisBackend(config['FRAGMENT_CACHE_REDIS_URL'], config['FRAGMENT_CACHE_TTL'])
+    return None
+
+def cache_fragment(name, *key_parts, caller):
+    """Jinja call block that renders its body once per distinct key.
+
+        {% call cache_fragment('project-card', project.id, project.get_cache_version()) %}
+            ...
+        {% endcall %}
+
+    The key parts must include the version of every row the body reads, and
+    anything viewer-specific it shows; a changed row then simply produces a
+    new key, and the superseded entry ages out of the backend.
+    """
+    backend = current_app.extensions.get('fragment_cache')
+    if backend is None:
+        return caller()
+    key = f"{name}-{hashlib.sha1(repr(key_parts).encode('utf-8')).hexdigest()}"
+    html = backend.get(key)
+    if html is not None:
+        fragment_lookups.inc(fragment=name, result='hit')
+        return Markup(html)
+    fragment_lookups.inc(fragment=name, result='miss')
+    html = caller()
+    backend.set(key, str(html))
+    return html
+
+def init_fragment_cache(app):
+    app.extensions['fragment_cache'] = create_backend(app)
+    app.jinja_env.globals['cache_fragment'] = cache_fragment
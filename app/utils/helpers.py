@@ -26,6 +26,15 @@ def get_user_projects(user):
     else:
         return user.assigned_projects
 
+def user_projects_query(user):
+    """Query for the projects accessible to user, for use in SQL aggregates"""
+    from app.models.project import Project, project_members
+    if user.is_pi():
+        return Project.query.filter(Project.pi_id == user.id)
+    else:
+        return Project.query.join(project_members, project_members.c.project_id == Project.id)\
+                            .filter(project_members.c.user_id == user.id)
+
 def calculate_project_stats(projects):
     """Calculate statistics for projects"""
     total_projects = len(projects)
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import Counter as StatementCounter
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter, one series per label set"""
+    type = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_format_labels(labels)} {_format_value(value)}'
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label set"""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts followed by the +Inf count and the sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                yield f'{self.name}_bucket{_format_labels(labels, ("le", bound))} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(labels)} {_format_value(values[-1])}'
+            yield f'{self.name}_count{_format_labels(labels)} {cumulative}'
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format.
+
+    Each worker process keeps its own registry, so scrape every process (or
+    run a single worker with threads) to see the full picture.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            return metric
+
+    def counter(self, name, documentation):
+        return self._get_or_create(Counter, name, documentation)
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+request_latency = metrics.histogram('http_request_duration_seconds',
+                                    'Request latency by endpoint, method and status.')
+request_queries = metrics.histogram('http_request_sql_queries',
+                                    'SQL statements issued per request by endpoint.',
+                                    QUERY_COUNT_BUCKETS)
+request_sql_time = metrics.histogram('http_request_sql_duration_seconds',
+                                     'Total SQL time per request by endpoint.')
+sql_statements = metrics.counter('sql_statements_total', 'SQL statements executed.')
+sql_duration = metrics.counter('sql_duration_seconds_total', 'Time spent executing SQL statements.')
+slow_queries = metrics.counter('sql_slow_queries_total', 'SQL statements slower than SLOW_QUERY_THRESHOLD_MS.')
+n_plus_one = metrics.counter('sql_n_plus_one_total', 'Requests that repeated one statement N_PLUS_ONE_THRESHOLD or more times.')
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    sql_statements.inc()
+    sql_duration.inc(elapsed)
+
+    threshold = current_app.config['SLOW_QUERY_THRESHOLD_MS'] if has_app_context() else 0
+    if threshold and elapsed * 1000 >= threshold:
+        slow_queries.inc()
+        where = f' on {_endpoint()}' if has_request_context() else ''
+        current_app.logger.warning(f"🐢 Slow query ({elapsed * 1000:.0f} ms){where}: {' '.join(statement.split())[:500]}")
+
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_time += elapsed
+        g.sql_statements[statement] += 1
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start'):
+        conn.info['query_start'].pop()
+
+def _start_request():
+    g.request_start = time.perf_counter()
+    g.sql_time = 0.0
+    g.sql_statements = StatementCounter()
+
+def _record_request(status):
+    if g.get('request_recorded') or 'request_start' not in g:
+        return
+    g.request_recorded = True
+    endpoint = _endpoint()
+    request_latency.observe(time.perf_counter() - g.request_start,
+                            endpoint=endpoint, method=request.method, status=status)
+    request_queries.observe(sum(g.sql_statements.values()), endpoint=endpoint)
+    request_sql_time.observe(g.sql_time, endpoint=endpoint)
+
+    threshold = current_app.config['N_PLUS_ONE_THRESHOLD']
+    if threshold and g.sql_statements:
+        statement, count = g.sql_statements.most_common(1)[0]
+        if count >= threshold:
+            n_plus_one.inc(endpoint=endpoint)
+            current_app.logger.warning(f"🔁 Possible N+1 on {endpoint}: {count} x {' '.join(statement.split())[:300]}")
+
+def init_metrics(app, db):
+    """Instrument requests and SQL for app and register the /metrics endpoint"""
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+    app.before_request(_start_request)
+
+    @app.after_request
+    def record_request(response):
+        _record_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_failed_request(exc):
+        if exc is not None:
+            _record_request(500)
+
+    from app.controllers.metrics import metrics_bp
+    app.register_blueprint(metrics_bp)
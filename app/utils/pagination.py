@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app, request, abort, jsonify, make_response, render_template
+from sqlalchemy import and_, or_, false, literal
+
+class KeysetPage:
+    """One page of a keyset-paginated listing"""
+
+    def __init__(self, items, next_cursor, limit):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.limit = limit
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        raise ValueError('Unknown cursor value')
+    return value
+
+def encode_cursor(values):
+    payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(values, list):
+        raise ValueError('Malformed cursor')
+    return [_decode_value(value) for value in values]
+
+def get_page_size():
+    """Requested page size from ?limit=, clamped to MAX_PAGE_SIZE"""
+    limit = request.args.get('limit', type=int) or current_app.config['PAGE_SIZE']
+    return max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+
+def wants_json():
+    return request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
+
+def _after(expressions, values, descending=False):
+    """WHERE clause selecting rows strictly after `values` in (e1, e2, ...) order.
+
+    A NULL key value can only be passed by the later keys, so orderings over
+    nullable columns should put the NULLs in a group of their own first
+    (e.g. `column.is_(None), column`).
+    """
+    first, rest = expressions[0], expressions[1:]
+    value = values[0]
+    if value is None:
+        beyond, same = false(), first.is_(None)
+    else:
+        value = literal(value) if isinstance(value, bool) else value
+        beyond = first < value if descending else first > value
+        same = first == value
+    if not rest:
+        return beyond
+    return or_(beyond, and_(same, _after(rest, values[1:], descending)))
+
+def paginate_keyset(query, order_by, cursor=None, limit=None, descending=False):
+    """Keyset-paginate `query` in ascending order, or descending with `descending`.
+
+    `order_by` is a list of (SQL expression, getter) pairs; the getter reads
+    the same value from a result row for the next cursor. The last pair must
+    be unique (normally the primary key) so the ordering is stable.
+    """
+    limit = limit or get_page_size()
+    cursor = cursor if cursor is not None else request.args.get('cursor')
+    expressions = [expression for expression, _ in order_by]
+
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+        except (ValueError, TypeError):
+            abort(400)
+        if len(values) != len(expressions):
+            abort(400)
+        query = query.filter(_after(expressions, values, descending))
+
+    ordering = [expression.desc() for expression in expressions] if descending else expressions
+    items = query.order_by(*ordering).limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getter(items[-1]) for _, getter in order_by])
+    return KeysetPage(items, next_cursor, limit)
+
+def render_keyset_page(page, template, partial_template, items_name, **context):
+    """Render a page as JSON, as a "load more" fragment (?partial=1) or as the full page"""
+    if wants_json():
+        return jsonify({items_name: [item.to_dict() for item in page.items],
+                        'next_cursor': page.next_cursor})
+
+    context[items_name] = page.items
+    if request.args.get('partial'):
+        response = make_response(render_template(partial_template, **context))
+        if page.next_cursor:
+            response.headers['X-Next-Cursor'] = page.next_cursor
+        return response
+    return render_template(template, page=page, **context)
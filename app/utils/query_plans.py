@@ -0,0 +1,110 @@
+import json
+import re
+from flask import url_for
+from sqlalchemy import event
+from app import db
+
+# SQLite reports an unindexed table read as "SCAN <table>" (optionally "AS <alias>");
+# index-driven reads are "SEARCH ..." or "SCAN ... USING [COVERING] INDEX ..."
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+class CapturedQuery:
+    """A SELECT issued while rendering a page, with its bound parameters"""
+
+    def __init__(self, url, statement, parameters):
+        self.url = url
+        self.statement = statement
+        self.parameters = parameters
+        self.plan = []
+        self.full_scans = []
+
+def sample_urls():
+    """Pages to check, per sample user: a PI and a team member with data"""
+    from app.models.user import User
+    from app.models.project import project_members
+    from app.models.task import Task
+    from app.models.meeting import Meeting
+    from app.utils.helpers import user_projects_query
+
+    users = [User.query.filter_by(role='pi').order_by(User.id).first(),
+             User.query.join(project_members, project_members.c.user_id == User.id)
+                       .order_by(User.id).first()]
+    samples = []
+    for user in filter(None, users):
+        urls = [url_for('main.dashboard'),
+                url_for('projects.list_projects'),
+                url_for('tasks.my_tasks'),
+                url_for('meetings.calendar'),
+                url_for('notifications.unread_count')]
+        project = user_projects_query(user).order_by(db.text('project.id')).first()
+        if project:
+            urls.append(url_for('projects.view_project', id=project.id))
+            task = Task.query.filter_by(project_id=project.id).order_by(Task.id).first()
+            if task:
+                urls.append(url_for('tasks.view_task', id=task.id))
+            meeting = Meeting.query.filter_by(project_id=project.id).order_by(Meeting.id).first()
+            if meeting:
+                urls.append(url_for('meetings.view_meeting', id=meeting.id))
+        samples.append((user.id, urls))
+    return samples
+
+def capture_queries(app, samples):
+    """Request each sample page as its user and record the distinct SELECTs issued"""
+    captured = {}
+    current = {}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and statement not in captured:
+            captured[statement] = CapturedQuery(current.get('url'), statement, parameters)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for user_id, urls in samples:
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+            for url in urls:
+                current['url'] = url
+                # A fresh app context per request, so `g` (and the logged-in
+                # user cached on it) and the session are not shared
+                with app.app_context():
+                    client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return list(captured.values())
+
+def _walk_postgres_plan(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk_postgres_plan(child)
+
+def explain(query):
+    """Attach the database's plan and any full table scans to a captured query"""
+    tables = set(db.metadata.tables)
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + query.statement, query.parameters).all()
+            query.plan = [row[-1] for row in rows]
+            query.full_scans = [match.group(1) for match in map(SQLITE_FULL_SCAN.match, query.plan)
+                                if match and match.group(1) in tables]
+        else:
+            # Small tables make any planner prefer sequential scans; disabling
+            # them leaves a Seq Scan only where no usable index exists
+            conn.exec_driver_sql('SET enable_seqscan = off')
+            result = conn.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + query.statement, query.parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            nodes = list(_walk_postgres_plan(plan[0]['Plan']))
+            query.plan = [f"{node['Node Type']} {node.get('Relation Name', '')}".strip() for node in nodes]
+            query.full_scans = [node['Relation Name'] for node in nodes
+                                if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in tables]
+            conn.rollback()
+    return query
+
+def check_query_plans(app):
+    """EXPLAIN every SELECT the main pages issue; returns the captured queries"""
+    with app.test_request_context():
+        samples = sample_urls()
+    return [explain(query) for query in capture_queries(app, samples)]
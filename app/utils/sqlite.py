@@ -0,0 +1,31 @@
+from sqlalchemy import event
+
+def init_sqlite(app, db):
+    """Apply the SQLITE_* pragmas to every new connection of a file-backed
+    SQLite engine and start its writer queue; returns False for other databases"""
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return False
+
+    config = app.config
+    pragmas = [
+        f"busy_timeout = {config['SQLITE_BUSY_TIMEOUT']}",  # first, so switching journal mode waits too
+        f"journal_mode = {config['SQLITE_JOURNAL_MODE']}",
+        f"synchronous = {config['SQLITE_SYNCHRONOUS']}",
+        f"cache_size = -{config['SQLITE_CACHE_SIZE']}",  # negative means KiB
+        f"mmap_size = {config['SQLITE_MMAP_SIZE']}",
+        'temp_store = MEMORY',
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f'PRAGMA {pragma}')
+        cursor.close()
+
+    if config['WRITE_QUEUE_ENABLED']:
+        from app.utils.write_queue import init_write_queue
+        init_write_queue(app)
+    return True
@@ -0,0 +1,97 @@
+import queue
+import threading
+from concurrent.futures import Future
+from flask import current_app
+from app import db
+
+class WriteQueue:
+    """Single writer thread for one app process, with group commit.
+
+    Callers submit functions that write through db.session; the writer runs
+    whatever has queued up while the previous commit was in progress as one
+    transaction, each function in its own SAVEPOINT so a failing write only
+    fails its own caller. Functions run on the writer's session, so they
+    must take ids rather than ORM objects from the caller's session, and
+    should return plain values.
+    """
+
+    def __init__(self, app, max_batch=100):
+        self.app = app
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+        return future
+
+    def in_writer(self):
+        return threading.current_thread() is self._thread
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write(batch)
+
+    def _write(self, batch):
+        done = []
+        try:
+            connection = db.session.connection()
+            if connection.dialect.name == 'sqlite':
+                # Take the write lock before reading, so the group waits out
+                # other processes (busy_timeout) instead of failing to upgrade
+                connection.exec_driver_sql('BEGIN IMMEDIATE')
+            for future, fn, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.session.begin_nested():
+                        result = fn(*args, **kwargs)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                done.append((future, result))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.exception(f"❌ Group commit of {len(batch)} writes failed")
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, result in done:
+                future.set_result(result)
+        finally:
+            db.session.remove()
+
+def init_write_queue(app):
+    app.extensions['write_queue'] = WriteQueue(app, max_batch=app.config['WRITE_QUEUE_MAX_BATCH'])
+
+def run_write(fn, *args, **kwargs):
+    """Call fn(*args, **kwargs) in a committed transaction and return its result.
+
+    Goes through the process's WriteQueue when one is configured (SQLite),
+    otherwise runs and commits on the caller's session. The caller's session
+    must not hold uncommitted writes, or the writer would wait on its lock.
+    """
+    app = current_app._get_current_object()
+    write_queue = app.extensions.get('write_queue')
+    if write_queue is None:
+        result = fn(*args, **kwargs)
+        db.session.commit()
+        return result
+    if write_queue.in_writer():
+        return fn(*args, **kwargs)  # already inside a group; it commits
+    return write_queue.submit(fn, *args, **kwargs).result(timeout=app.config['WRITE_QUEUE_TIMEOUT'])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Access check benchmark: set-based policies vs. loading the member list.
+
+Builds a throwaway SQLite database with one project per team size and times
+each check for a user who is NOT on the team (the legacy worst case, since
+the whole collection is scanned). Usage: python benchmarks/access_policy.py
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'access_benchmark.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+os.environ['RUN_BACKGROUND_JOBS'] = 'false'
+os.environ['METRICS_ENABLED'] = 'false'
+
+from app import create_app, db
+from app.models.user import User
+from app.models.project import Project, project_members
+from app.models.task import Task
+from app.models.meeting import Meeting, meeting_attendees
+from app.utils.access import can_view_project, can_view_task, can_view_meeting
+
+TEAM_SIZES = [10, 100, 1000, 5000]
+ITERATIONS = 200
+
+def seed(team_sizes):
+    users = [{'username': f'user{i}', 'email': f'user{i}@example.org', 'password_hash': 'x',
+              'first_name': 'User', 'last_name': str(i), 'role': 'team_member'}
+             for i in range(max(team_sizes) + 2)]
+    users[0]['role'] = 'pi'
+    db.session.execute(db.insert(User), users)
+    outsider_id = len(users)
+
+    projects = {}
+    for size in team_sizes:
+        project = Project(title=f'Team of {size}', project_id=f'BENCH-{size}', start_date=date.today(),
+                          end_date=date.today() + timedelta(days=365), pi_id=1)
+        db.session.add(project)
+        db.session.flush()
+        task = Task(title='Task', project_id=project.id, created_by_id=1, assigned_to_id=2)
+        meeting = Meeting(title='Meeting', meeting_date=datetime.now() + timedelta(days=1),
+                          project_id=project.id, created_by_id=1)
+        db.session.add_all([task, meeting])
+        db.session.flush()
+        members = [{'project_id': project.id, 'user_id': user_id} for user_id in range(2, size + 2)]
+        db.session.execute(project_members.insert(), members)
+        db.session.execute(meeting_attendees.insert(),
+                           [{'meeting_id': meeting.id, 'user_id': row['user_id']} for row in members])
+        projects[size] = (project.id, task.id, meeting.id)
+    db.session.commit()
+    return outsider_id, projects
+
+def legacy_checks(user, project_id, task_id, meeting_id):
+    project = db.session.get(Project, project_id)
+    task = db.session.get(Task, task_id)
+    meeting = db.session.get(Meeting, meeting_id)
+    return (user in project.team_members,
+            user in task.project.team_members or task.assigned_to_id == user.id,
+            meeting.project.pi_id == user.id or user in meeting.attendees)
+
+def policy_checks(user, project_id, task_id, meeting_id):
+    return (can_view_project(user, project_id),
+            can_view_task(user, task_id),
+            can_view_meeting(user, meeting_id))
+
+def timed(check, user_id, ids):
+    samples = []
+    for _ in range(ITERATIONS):
+        db.session.remove()
+        user = db.session.get(User, user_id)
+        start = time.perf_counter()
+        result = check(user, *ids)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+def main():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        outsider_id, projects = seed(TEAM_SIZES)
+        print(f"{'team size':>10} {'legacy ms':>12} {'policy ms':>12}")
+        for size, ids in projects.items():
+            legacy_ms, legacy = timed(legacy_checks, outsider_id, ids)
+            policy_ms, policy = timed(policy_checks, outsider_id, ids)
+            assert [bool(allowed) for allowed in legacy] == [bool(allowed) for allowed in policy]
+            print(f'{size:>10} {legacy_ms:>12.3f} {policy_ms:>12.3f}')
+    os.remove(DB_PATH)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic lab data for benchmarks.
+
+Builds PIs, team members, projects with teams, tasks, comments, meetings
+with attendees and notifications in a fresh database. The same --scale and
+--seed always produce the same rows; dates are laid out around --anchor
+(today by default), so overdue tasks and upcoming meetings exist whatever
+day the data is generated. Rows are written with batched Core INSERTs and
+explicit ids, then the project task counters and the search index are
+rebuilt once, the way `flask repair-task-counters` and
+`flask reindex-search` would.
+
+Usage: python benchmarks/datagen.py --database /tmp/lab.db [--scale small] [--seed 1]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mean counts per scale; per-project counts are drawn around these with a
+# long tail, so every scale has a few much larger projects than average
+SCALES = {
+    'tiny':   dict(pis=2, members=20, projects_per_pi=3, team_size=5, tasks_per_project=12, comments_per_task=1,
+                   meetings_per_project=4, attendees_per_meeting=3, notifications_per_user=5),
+    'small':  dict(pis=5, members=100, projects_per_pi=4, team_size=8, tasks_per_project=40, comments_per_task=2,
+                   meetings_per_project=10, attendees_per_meeting=5, notifications_per_user=20),
+    'medium': dict(pis=20, members=1000, projects_per_pi=10, team_size=12, tasks_per_project=100,
+                   comments_per_task=3, meetings_per_project=24, attendees_per_meeting=6,
+                   notifications_per_user=50),
+    'large':  dict(pis=50, members=5000, projects_per_pi=20, team_size=15, tasks_per_project=300,
+                   comments_per_task=3, meetings_per_project=50, attendees_per_meeting=8,
+                   notifications_per_user=100),
+}
+
+BATCH_SIZE = 10000
+PASSWORD = 'benchmark'
+
+FIRST_NAMES = ['Ada', 'Ben', 'Chioma', 'Dmitri', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas', 'Kavya',
+               'Liam', 'Mei', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sven', 'Tariq', 'Uma', 'Viktor',
+               'Wen', 'Ximena', 'Yusuf', 'Zofia']
+LAST_NAMES = ['Abara', 'Berg', 'Chen', 'Dubois', 'Eze', 'Fischer', 'Garcia', 'Hansen', 'Ito', 'Jovanovic',
+              'Kowalski', 'Larsen', 'Mensah', 'Novak', 'Okafor', 'Petrov', 'Quispe', 'Rossi', 'Singh',
+              'Tanaka', 'Ueda', 'Varga', 'Wright', 'Xu', 'Yilmaz', 'Zhang']
+TOPICS = ['protein folding', 'soil microbiome', 'coral bleaching', 'battery cathodes', 'gut flora',
+          'neural imaging', 'crop resilience', 'quantum dots', 'air quality', 'glacier melt',
+          'vaccine adjuvants', 'graphene sensors', 'bird migration', 'wastewater surveillance',
+          'enzyme kinetics', 'solar perovskites', 'sleep cycles', 'ocean acidification']
+WORDS = ('sample assay protocol calibrate spectrometer centrifuge buffer reagent incubate sequence '
+         'analysis dataset figure manuscript review draft replicate control baseline pipeline cluster '
+         'imaging microscope culture plate gel western blot PCR primer antibody stain titration '
+         'statistics regression outlier notebook inventory order shipment freezer ethics approval '
+         'budget report deadline meeting slides poster conference grant renewal').split()
+FUNDERS = ['NSF', 'NIH', 'ERC', 'Wellcome Trust', 'DOE', 'Gates Foundation', 'Internal']
+TASK_VERBS = ['Prepare', 'Run', 'Analyze', 'Review', 'Order', 'Calibrate', 'Write up', 'Validate', 'Plan']
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def _count(rng, mean):
+    """Non-negative count with a long tail around mean"""
+    if mean <= 0:
+        return 0
+    return max(0, int(round(rng.lognormvariate(math.log(mean) - 0.18, 0.6))))
+
+def _skewed_sample(rng, population, k):
+    """k distinct items, favouring the start of population"""
+    chosen = set()
+    while len(chosen) < k:
+        chosen.add(population[int(len(population) * rng.random() ** 2)])
+    return sorted(chosen)
+
+def _insert(table, rows, batch_size=BATCH_SIZE):
+    """Insert rows from an iterable with one executemany per batch; returns the count"""
+    from app import db
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        total += len(batch)
+    return total
+
+def generate(scale='small', seed=1, anchor=None, log=print):
+    """Fill the current app's (empty) database; returns row counts per table"""
+    from werkzeug.security import generate_password_hash
+    from app import db
+    from app.models.user import User
+    from app.models.project import Project, project_members
+    from app.models.task import Task, TaskComment
+    from app.models.meeting import Meeting, meeting_attendees
+    from app.models.notification import Notification
+    from app.services.notification_service import NotificationService
+    from app.services.search_service import SearchService
+
+    params = SCALES[scale]
+    rng = random.Random(seed)
+    anchor = anchor or date.today()
+    now = datetime.combine(anchor, datetime.min.time()) + timedelta(hours=9)
+    counts = {}
+    started = time.perf_counter()
+
+    def done(name, count):
+        counts[name] = count
+        log(f'  {name:<18} {count:>10,}  ({time.perf_counter() - started:.1f}s)')
+
+    db.create_all()
+    password_hash = generate_password_hash(PASSWORD)
+
+    # Users: PIs first, so PI ids are 1..pis
+    total_users = params['pis'] + params['members']
+    pi_ids = list(range(1, params['pis'] + 1))
+    member_ids = list(range(params['pis'] + 1, total_users + 1))
+
+    def users():
+        for user_id in range(1, total_users + 1):
+            is_pi = user_id <= params['pis']
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            username = f"{'pi' if is_pi else 'member'}{user_id}"
+            yield {'id': user_id, 'title': 'Dr' if is_pi else rng.choice(['Mr', 'Ms', 'Dr']),
+                   'username': username, 'email': f'{username}@lab.example.org', 'password_hash': password_hash,
+                   'first_name': first, 'last_name': last, 'role': 'pi' if is_pi else 'team_member',
+                   'created_at': now - timedelta(days=rng.randint(30, 1500)),
+                   'calendar_token': f'{rng.getrandbits(192):048x}', 'calendar_version': 0}
+    done('user', _insert(User.__table__, users()))
+
+    # Projects with teams; members drawn with a skew so some sit on many teams
+    projects, memberships = [], []
+    project_id = 0
+    for pi_id in pi_ids:
+        for _ in range(max(1, _count(rng, params['projects_per_pi']))):
+            project_id += 1
+            start = anchor - timedelta(days=rng.randint(0, 1200))
+            end = start + timedelta(days=rng.randint(180, 1460))
+            if end < anchor:
+                status = rng.choice(['completed', 'completed', 'completed', 'on_hold'])
+            elif start > anchor - timedelta(days=30):
+                status = rng.choice(['proposal', 'active'])
+            else:
+                status = rng.choice(['active', 'active', 'active', 'on_hold'])
+            team_size = min(len(member_ids), max(1, _count(rng, params['team_size'])))
+            team = _skewed_sample(rng, member_ids, team_size)
+            projects.append({'id': project_id, 'pi_id': pi_id, 'status': status, 'start_date': start,
+                             'end_date': end, 'team': team})
+            memberships.extend({'project_id': project_id, 'user_id': user_id} for user_id in team)
+
+    def project_rows():
+        for project in projects:
+            topic = rng.choice(TOPICS)
+            yield {'id': project['id'], 'title': f'{topic.title()} study {project["id"]}',
+                   'project_id': f'LAB-{project["id"]:06d}', 'description': _sentence(rng, 30),
+                   'start_date': project['start_date'], 'end_date': project['end_date'],
+                   'status': project['status'], 'funding_source': rng.choice(FUNDERS),
+                   'funding_amount': float(rng.randrange(10, 2000) * 1000), 'pi_id': project['pi_id'],
+                   'created_at': datetime.combine(project['start_date'], datetime.min.time()),
+                   'updated_at': now - timedelta(days=rng.randint(0, 60))}
+    done('project', _insert(Project.__table__, project_rows()))
+    done('project_members', _insert(project_members, memberships))
+
+    # Tasks, and the comments on them
+    member_tasks = {}
+    task_ids = []
+
+    def task_rows():
+        task_id = 0
+        for project in projects:
+            for _ in range(_count(rng, params['tasks_per_project'])):
+                task_id += 1
+                if project['status'] == 'completed':
+                    status = 'completed'
+                elif project['status'] == 'proposal':
+                    status = rng.choices(['todo', 'in_progress'], [9, 1])[0]
+                else:
+                    status = rng.choices(['todo', 'in_progress', 'completed'], [4, 2, 4])[0]
+                assignee = rng.choice(project['team'])
+                created = now - timedelta(days=rng.randint(1, 400), minutes=rng.randint(0, 1439))
+                due = anchor + timedelta(days=rng.randint(-60, 120)) if rng.random() < 0.8 else None
+                task_ids.append((task_id, project['pi_id'], assignee))
+                member_tasks.setdefault(assignee, []).append((task_id, project['id']))
+                yield {'id': task_id, 'title': f'{rng.choice(TASK_VERBS)} {" ".join(rng.sample(WORDS, 3))}',
+                       'description': _sentence(rng, 20), 'status': status,
+                       'priority': rng.choices(['low', 'medium', 'high'], [3, 5, 2])[0], 'due_date': due,
+                       'created_at': created, 'updated_at': created + timedelta(days=rng.randint(0, 30)),
+                       'completed_at': created + timedelta(days=rng.randint(1, 60)) if status == 'completed' else None,
+                       'project_id': project['id'], 'assigned_to_id': assignee, 'created_by_id': project['pi_id']}
+    done('task', _insert(Task.__table__, task_rows()))
+
+    def comment_rows():
+        comment_id = 0
+        for task_id, pi_id, assignee in task_ids:
+            for _ in range(_count(rng, params['comments_per_task'])):
+                comment_id += 1
+                yield {'id': comment_id, 'content': _sentence(rng, rng.randint(5, 40)), 'task_id': task_id,
+                       'user_id': assignee if rng.random() < 0.7 else pi_id,
+                       'created_at': now - timedelta(days=rng.randint(0, 300), minutes=rng.randint(0, 1439))}
+    done('task_comment', _insert(TaskComment.__table__, comment_rows()))
+
+    # Meetings around the anchor: most past ones are completed, some were
+    # never swept and still read as scheduled
+    attendees = []
+
+    def meeting_rows():
+        meeting_id = 0
+        for project in projects:
+            for _ in range(_count(rng, params['meetings_per_project'])):
+                meeting_id += 1
+                when = now + timedelta(days=rng.randint(-180, 90), hours=rng.randint(0, 8))
+                if when < now:
+                    status = rng.choices(['completed', 'cancelled', 'scheduled'], [8, 1, 1])[0]
+                else:
+                    status = rng.choices(['scheduled', 'cancelled'], [9, 1])[0]
+                invited = rng.sample(project['team'], min(len(project['team']),
+                                                          max(1, _count(rng, params['attendees_per_meeting']))))
+                attendees.extend({'meeting_id': meeting_id, 'user_id': user_id} for user_id in invited)
+                created = when - timedelta(days=rng.randint(1, 30))
+                yield {'id': meeting_id, 'title': f'{rng.choice(["Weekly", "Planning", "Data", "Journal club"])} '
+                                                  f'sync {meeting_id}',
+                       'agenda': _sentence(rng, 25), 'meeting_date': when,
+                       'duration_minutes': rng.choice([30, 45, 60, 90]),
+                       'location': rng.choice(['Lab 2.14', 'Seminar room', 'Online']),
+                       'meeting_link': 'https://meet.example.org/' + f'{rng.getrandbits(40):010x}',
+                       'status': status, 'created_at': created, 'updated_at': created,
+                       'project_id': project['id'], 'created_by_id': project['pi_id']}
+    done('meeting', _insert(Meeting.__table__, meeting_rows()))
+    done('meeting_attendees', _insert(meeting_attendees, attendees))
+
+    # Notifications, mostly read except for the most recent ones
+    def notification_rows():
+        notification_id = 0
+        for user_id in range(1, total_users + 1):
+            tasks = member_tasks.get(user_id)
+            for _ in range(_count(rng, params['notifications_per_user'])):
+                notification_id += 1
+                age = rng.randint(0, 240)
+                row = {'id': notification_id, 'user_id': user_id, 'is_read': age > 14 or rng.random() < 0.5,
+                       'created_at': now - timedelta(days=age, minutes=rng.randint(0, 1439)),
+                       'project_id': None, 'task_id': None, 'meeting_id': None}
+                if tasks:
+                    task_id, project_id = rng.choice(tasks)
+                    row.update(title=f'New Task Assigned: task {task_id}', notification_type='task_assigned',
+                               message='You have been assigned a new task.', project_id=project_id,
+                               task_id=task_id)
+                else:
+                    row.update(title='Project update', notification_type='project_assigned',
+                               message=_sentence(rng, 12))
+                yield row
+    done('notification', _insert(Notification.__table__, notification_rows()))
+
+    Project.refresh_task_counters()
+    NotificationService.refresh_unread_counts()
+    log(f'  counters           refreshed  ({time.perf_counter() - started:.1f}s)')
+    done('search_index', SearchService.rebuild(db.session.connection()))
+    db.session.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', required=True, help='SQLite file to create')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--anchor', type=date.fromisoformat, help='date the data is laid out around (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f'{args.database} already exists')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    os.environ['RUN_BACKGROUND_JOBS'] = 'false'
+    from app import create_app
+    app = create_app()
+    app.logger.setLevel('ERROR')  # the index rebuild trips the slow-query warning at larger scales
+    print(f'Generating {args.scale} data with seed {args.seed} into {args.database}')
+    with app.app_context():
+        counts = generate(args.scale, args.seed, args.anchor)
+    print(f'✅ {sum(counts.values()):,} rows')
+
+if __name__ == '__main__':
+    main()
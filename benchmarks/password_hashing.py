@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Password verification cost per hashing policy, and the bounded pool under a login burst.
+
+For each PASSWORD_HASH_METHOD candidate, reports the single-check latency
+and logins/sec/core with one thread per core. Then replays a burst of
+simultaneous logins through PasswordPool to show how many are served, how
+many are turned away and how long the served ones waited.
+
+Usage: python benchmarks/password_hashing.py [--seconds 3] [--burst 100]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.password_service import PasswordPool, PasswordPoolFull
+
+POLICIES = ['pbkdf2:sha256:600000', 'pbkdf2:sha256:260000', 'scrypt:32768:8:1', 'scrypt:16384:8:1']
+PASSWORD = 'correct horse battery staple'
+
+def measure_policy(method, seconds, cores):
+    password_hash = generate_password_hash(PASSWORD, method=method)
+    latencies = []
+    for _ in range(5):
+        started = time.perf_counter()
+        check_password_hash(password_hash, PASSWORD)
+        latencies.append(time.perf_counter() - started)
+
+    counts = [0] * cores
+    deadline = time.perf_counter() + seconds
+
+    def run(index):
+        while time.perf_counter() < deadline:
+            check_password_hash(password_hash, PASSWORD)
+            counts[index] += 1
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(cores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statistics.median(latencies), sum(counts) / seconds / cores
+
+def burst(method, size, workers, queue_depth):
+    password_hash = generate_password_hash(PASSWORD, method=method)
+    pool = PasswordPool(workers=workers, queue_depth=queue_depth)
+    served, rejected = [], []
+    lock = threading.Lock()
+    start = threading.Event()
+
+    def login():
+        start.wait()
+        started = time.perf_counter()
+        try:
+            pool.run(check_password_hash, password_hash, PASSWORD)
+        except PasswordPoolFull:
+            with lock:
+                rejected.append(time.perf_counter() - started)
+            return
+        with lock:
+            served.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=login) for _ in range(size)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    served.sort()
+    return len(served), len(rejected), served[int(len(served) * 0.95) - 1], max(rejected, default=0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--burst', type=int, default=100, help='simultaneous logins in the burst test')
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_POOL_WORKERS for the burst test')
+    parser.add_argument('--queue', type=int, default=8, help='PASSWORD_POOL_QUEUE for the burst test')
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+
+    print(f'{cores} cores\n')
+    print(f"{'policy':<24} {'check ms':>9} {'logins/s/core':>14}")
+    for method in POLICIES:
+        latency, per_core = measure_policy(method, args.seconds, cores)
+        print(f'{method:<24} {latency * 1000:>9.1f} {per_core:>14.1f}')
+
+    print(f'\nBurst of {args.burst} logins, pool of {args.workers} workers + {args.queue} queued')
+    print(f"{'policy':<24} {'served':>7} {'rejected':>9} {'served p95 ms':>14} {'reject max ms':>14}")
+    for method in POLICIES:
+        served, rejected, p95, reject_max = burst(method, args.burst, args.workers, args.queue)
+        print(f'{method:<24} {served:>7} {rejected:>9} {p95 * 1000:>14.0f} {reject_max * 1000:>14.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Route benchmark: latency, query count and peak memory per route, as JSON.
+
+Drives the app's routes through the Flask test client against a database
+from benchmarks/datagen.py, as a PI, a team member or anonymously, and
+reports p50/p95/mean latency, SQL statements, response size and peak
+Python memory (tracemalloc, measured in a separate pass so it does not
+skew the timings) for each. Read routes run first; the few write routes
+run last on a copy of the database, so a --database file can be reused.
+Output is sorted, rounded JSON, meant to be kept per commit and diffed,
+or compared directly with --compare.
+
+Usage:
+  python benchmarks/run.py [--scale small] [--seed 1] [--iterations 20] [--output BENCH.json]
+  python benchmarks/run.py --database /tmp/lab.db --compare before.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoints deliberately not driven: open-ended streams, session changes,
+# password hashing (see password_hashing.py) and writes that reshape the data
+EXCLUDED_ENDPOINTS = {
+    'static', 'notifications.stream', 'auth.logout', 'auth.login:POST', 'auth.register:POST',
+    'projects.create_project:POST', 'projects.edit_project:POST', 'projects.delete_project:POST',
+    'projects.import_projects:POST', 'tasks.create_task:POST', 'meetings.create_meeting:POST',
+    'meetings.edit_meeting:POST', 'meetings.cancel_meeting:POST', 'meetings.regenerate_feed_token:POST',
+    'projects.view_archived',  # generated data has no archives until retention runs
+}
+
+class Route:
+    """One benchmarked request: who makes it and how to build it for iteration i"""
+
+    def __init__(self, name, endpoint, user, build, method='GET'):
+        self.name = name
+        self.endpoint = endpoint
+        self.user = user
+        self.build = build
+        self.method = method
+
+def _get(path):
+    return lambda subjects, i: (path.format(**subjects), {})
+
+def _batch_moves(subjects, i):
+    status = ['todo', 'in_progress', 'completed'][i % 3]
+    return '/tasks/batch', {'json': {'items': [{'id': task_id, 'status': status}
+                                               for task_id in subjects['batch_task_ids']]}}
+
+ROUTES = [
+    Route('dashboard[pi]', 'main.dashboard', 'pi', _get('/dashboard')),
+    Route('dashboard[member]', 'main.dashboard', 'member', _get('/dashboard')),
+    Route('profile', 'main.profile', 'member', _get('/profile')),
+    Route('projects.list[pi]', 'projects.list_projects', 'pi', _get('/projects/')),
+    Route('projects.list[member]', 'projects.list_projects', 'member', _get('/projects/')),
+    Route('projects.view', 'projects.view_project', 'pi', _get('/projects/{project_id}')),
+    Route('projects.edit', 'projects.edit_project', 'pi', _get('/projects/{project_id}/edit')),
+    Route('projects.create', 'projects.create_project', 'pi', _get('/projects/create')),
+    Route('projects.import', 'projects.import_projects', 'pi', _get('/projects/import')),
+    Route('projects.archived', 'projects.list_archived', 'pi', _get('/projects/archived')),
+    Route('tasks.my_tasks[pi]', 'tasks.my_tasks', 'pi', _get('/tasks/my-tasks')),
+    Route('tasks.my_tasks[member]', 'tasks.my_tasks', 'member', _get('/tasks/my-tasks')),
+    Route('tasks.view', 'tasks.view_task', 'member', _get('/tasks/{member_task_id}')),
+    Route('tasks.update_status', 'tasks.update_task_status', 'member', _get('/tasks/{member_task_id}/update-status')),
+    Route('tasks.create', 'tasks.create_task', 'pi', _get('/tasks/project/{project_id}/create')),
+    Route('meetings.calendar[pi]', 'meetings.calendar', 'pi', _get('/meetings/calendar')),
+    Route('meetings.calendar[member]', 'meetings.calendar', 'member', _get('/meetings/calendar')),
+    Route('meetings.view', 'meetings.view_meeting', 'pi', _get('/meetings/{meeting_id}')),
+    Route('meetings.edit', 'meetings.edit_meeting', 'pi', _get('/meetings/{meeting_id}/edit')),
+    Route('meetings.create', 'meetings.create_meeting', 'pi', _get('/meetings/project/{project_id}/create')),
+    Route('meetings.feed', 'meetings.calendar_feed', None, _get('/meetings/feed/{calendar_token}.ics')),
+    Route('search', 'search.search', 'member', _get('/search?q=protocol')),
+    Route('api.projects', 'api_v1.list_resource', 'member', _get('/api/v1/projects')),
+    Route('api.tasks', 'api_v1.list_resource', 'member', _get('/api/v1/tasks?fields=title,status,due_date')),
+    Route('api.meetings', 'api_v1.list_resource', 'member', _get('/api/v1/meetings')),
+    Route('api.notifications', 'api_v1.list_resource', 'member', _get('/api/v1/notifications')),
+    Route('api.task', 'api_v1.get_resource', 'member', _get('/api/v1/tasks/{member_task_id}')),
+    Route('exports.tasks', 'exports.export', 'pi', _get('/exports/tasks.csv')),
+    Route('exports.meetings', 'exports.export', 'pi', _get('/exports/meetings.csv')),
+    Route('exports.funding', 'exports.export', 'pi', _get('/exports/funding.csv')),
+    Route('notifications.list', 'notifications.list_notifications', 'member', _get('/notifications/')),
+    Route('notifications.unread', 'notifications.list_notifications', 'member', _get('/notifications/?unread=1')),
+    Route('notifications.unread_count', 'notifications.unread_count', 'member', _get('/notifications/unread-count')),
+    Route('notifications.poll', 'notifications.poll', 'member', _get('/notifications/poll?after=0')),
+    Route('metrics', 'metrics.export_metrics', None, _get('/metrics')),
+    Route('login', 'auth.login', None, _get('/login')),
+    Route('register', 'auth.register', None, _get('/register')),
+    # Writes, last
+    Route('tasks.comment', 'tasks.add_comment', 'member',
+          lambda subjects, i: (f"/tasks/{subjects['member_task_id']}/comment",
+                               {'data': {'content': f'Benchmark comment {i}'}}), method='POST'),
+    Route('tasks.update_status:POST', 'tasks.update_task_status', 'member',
+          lambda subjects, i: (f"/tasks/{subjects['member_task_id']}/update-status",
+                               {'data': {'status': ['todo', 'in_progress', 'completed'][i % 3]}}), method='POST'),
+    Route('tasks.batch', 'tasks.batch_update', 'pi', _batch_moves, method='POST'),
+    Route('notifications.mark_read', 'notifications.mark_read', 'member',
+          lambda subjects, i: ('/notifications/mark-read', {'json': {'all': True}}), method='POST'),
+]
+
+def create_app_for(db_path, fragment_cache):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['RUN_BACKGROUND_JOBS'] = 'false'
+    if not fragment_cache:
+        os.environ['FRAGMENT_CACHE_BACKEND'] = 'none'
+    from app import create_app
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    # Slow-query and N+1 warnings would flood the output at larger scales
+    app.logger.setLevel('ERROR')
+    return app
+
+def find_subjects(app):
+    """The busiest PI and team member, and ids on their heaviest pages"""
+    from sqlalchemy import func
+    from app import db
+    from app.models.user import User
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.models.meeting import Meeting, meeting_attendees
+    with app.app_context():
+        pi_id = db.session.scalar(db.select(Project.pi_id).group_by(Project.pi_id)
+                                    .order_by(func.count().desc(), Project.pi_id).limit(1))
+        member_id = db.session.scalar(db.select(Task.assigned_to_id).group_by(Task.assigned_to_id)
+                                        .order_by(func.count().desc(), Task.assigned_to_id).limit(1))
+        project_id = db.session.scalar(db.select(Project.id).where(Project.pi_id == pi_id)
+                                         .order_by(Project.task_count.desc(), Project.id).limit(1))
+        meeting_id = db.session.scalar(
+            db.select(Meeting.id).join(meeting_attendees).join(Project, Project.id == Meeting.project_id)
+              .where(Project.pi_id == pi_id).group_by(Meeting.id)
+              .order_by(func.count().desc(), Meeting.id).limit(1))
+        member_task_id = db.session.scalar(db.select(func.min(Task.id)).where(Task.assigned_to_id == member_id))
+        batch_task_ids = db.session.scalars(db.select(Task.id).where(Task.project_id == project_id)
+                                              .order_by(Task.id).limit(60)).all()
+        return {'pi': pi_id, 'member': member_id, 'project_id': project_id, 'meeting_id': meeting_id,
+                'member_task_id': member_task_id, 'batch_task_ids': batch_task_ids,
+                'calendar_token': db.session.get(User, pi_id).calendar_token}
+
+def table_counts(app):
+    from app import db
+    with app.app_context():
+        return {table: db.session.execute(db.text(f'SELECT count(*) FROM {table}')).scalar()
+                for table in ['user', 'project', 'project_members', 'task', 'task_comment', 'meeting',
+                              'meeting_attendees', 'notification']}
+
+def client_for(app, user_id):
+    client = app.test_client()
+    if user_id is not None:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    return client
+
+def percentile(sorted_values, fraction):
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+def measure(app, engine, route, subjects, iterations, warmup):
+    from sqlalchemy import event
+    client = client_for(app, subjects[route.user] if route.user else None)
+    statements = []
+    counter = {'n': 0}
+
+    def on_statement(*args):
+        counter['n'] += 1
+
+    def request(i):
+        path, kwargs = route.build(subjects, i)
+        response = client.open(path, method=route.method, **kwargs)
+        body = response.get_data()  # drains streamed responses
+        response.close()
+        return response.status_code, len(body)
+
+    for i in range(warmup):
+        request(i)
+
+    timings = []
+    event.listen(engine, 'before_cursor_execute', on_statement)
+    try:
+        for i in range(warmup, warmup + iterations):
+            counter['n'] = 0
+            started = time.perf_counter()
+            status, size = request(i)
+            timings.append(time.perf_counter() - started)
+            statements.append(counter['n'])
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_statement)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        request(warmup + iterations)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    path, _ = route.build(subjects, 0)
+    return {
+        'endpoint': route.endpoint,
+        'method': route.method,
+        'path': path,
+        'status': status,
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 2),
+        'queries': statistics.median_low(statements),
+        'queries_max': max(statements),
+        'bytes': size,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+def uncovered_endpoints(app):
+    """Endpoint (and method) combinations neither benchmarked nor excluded"""
+    covered = {route.endpoint if route.method == 'GET' else f'{route.endpoint}:{route.method}' for route in ROUTES}
+    missing = set()
+    for rule in app.url_map.iter_rules():
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            key = rule.endpoint if method == 'GET' else f'{rule.endpoint}:{method}'
+            if key not in covered and key not in EXCLUDED_ENDPOINTS and rule.endpoint not in EXCLUDED_ENDPOINTS:
+                missing.add(key)
+    return sorted(missing)
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline_path, report):
+    with open(baseline_path, encoding='utf-8') as source:
+        baseline = json.load(source)['routes']
+    print(f"{'route':<30} {'p50 ms':>24} {'p95 ms':>18} {'queries':>10} {'peak KiB':>20}")
+    for name, result in report['routes'].items():
+        old = baseline.get(name)
+        if old is None:
+            print(f'{name:<30} (new)')
+            continue
+        change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+        print(f"{name:<30} {old['p50_ms']:>7.1f} → {result['p50_ms']:>7.1f} {change:>+5.0f}% "
+              f"{old['p95_ms']:>7.1f} → {result['p95_ms']:>7.1f} {old['queries']:>4} → {result['queries']:<4} "
+              f"{old['peak_kib']:>8.0f} → {result['peak_kib']:>8.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', help='datagen database to copy; generated here first if missing')
+    parser.add_argument('--scale', default='small', help='datagen scale when generating')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--anchor', type=date.fromisoformat, help='datagen anchor date (YYYY-MM-DD)')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--routes', help='comma-separated route names or name prefixes to run')
+    parser.add_argument('--no-fragment-cache', action='store_true', help='render every fragment (cold pages)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='print changes against an earlier report')
+    args = parser.parse_args()
+
+    from datagen import SCALES, generate
+    if args.scale not in SCALES:
+        parser.error(f"--scale must be one of {', '.join(SCALES)}")
+
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    db_path = os.path.join(workdir, 'bench.db')
+    source = args.database
+    if source and os.path.exists(source):
+        shutil.copyfile(source, db_path)
+    app = create_app_for(db_path, not args.no_fragment_cache)
+    if not (source and os.path.exists(source)):
+        print(f'Generating {args.scale} data (seed {args.seed})', file=sys.stderr)
+        with app.app_context():
+            generate(args.scale, args.seed, args.anchor, log=lambda line: print(line, file=sys.stderr))
+        if source:
+            shutil.copyfile(db_path, source)
+
+    from app import db
+    with app.app_context():
+        engine = db.engine
+    subjects = find_subjects(app)
+    routes = ROUTES
+    if args.routes:
+        wanted = args.routes.split(',')
+        routes = [route for route in ROUTES if any(route.name.startswith(prefix) for prefix in wanted)]
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'scale': args.scale if not (source and os.path.exists(source)) else os.path.basename(source),
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'fragment_cache': not args.no_fragment_cache,
+            'rows': table_counts(app),
+            'subjects': {key: value for key, value in subjects.items() if key not in ('batch_task_ids', 'calendar_token')},
+        },
+        'routes': {},
+    }
+    for route in routes:
+        print(f'  {route.name}', file=sys.stderr)
+        report['routes'][route.name] = measure(app, engine, route, subjects, args.iterations, args.warmup)
+
+    missing = uncovered_endpoints(app)
+    if missing:
+        print(f"⚠️  Routes not benchmarked: {', '.join(missing)}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target:
+            target.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        compare(args.compare, report)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+SQLite write throughput with concurrent workers, before and after tuning.
+
+Runs the comment write path (one TaskComment insert, plus its search index
+row) from several processes with several threads each, the way gunicorn
+runs the app, against a fresh database per profile:
+
+  baseline  SQLite defaults (rollback journal, synchronous=FULL), direct commits
+  pragmas   WAL, synchronous=NORMAL, busy_timeout, cache and mmap, direct commits
+  queue     pragmas plus the per-process writer queue with group commit
+
+Usage: python benchmarks/sqlite_writes.py [--processes 4] [--threads 8] [--writes 50]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'baseline': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT': '5000',
+                 'SQLITE_CACHE_SIZE': '2000', 'SQLITE_MMAP_SIZE': '0', 'WRITE_QUEUE_ENABLED': 'false'},
+    'pragmas': {'WRITE_QUEUE_ENABLED': 'false'},
+    'queue': {'WRITE_QUEUE_ENABLED': 'true'},
+}
+
+def create_app_for(db_path, profile):
+    sys.path.insert(0, ROOT)
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['RUN_BACKGROUND_JOBS'] = 'false'
+    os.environ['METRICS_ENABLED'] = 'false'
+    os.environ.update(PROFILES[profile])
+    from app import create_app
+    return create_app()
+
+def seed(db_path, profile):
+    from datetime import date, timedelta
+    app = create_app_for(db_path, profile)
+    from app import db
+    from app.models.user import User
+    from app.models.project import Project
+    from app.models.task import Task
+    with app.app_context():
+        db.create_all()
+        user = User(username='pi', email='pi@example.org', password_hash='x',
+                    first_name='P', last_name='I', role='pi')
+        db.session.add(user)
+        db.session.flush()
+        project = Project(title='Bench', project_id='BENCH', start_date=date.today(),
+                          end_date=date.today() + timedelta(days=365), pi_id=user.id)
+        db.session.add(project)
+        db.session.flush()
+        task = Task(title='Task', project_id=project.id, created_by_id=user.id)
+        db.session.add(task)
+        db.session.commit()
+        return user.id, task.id
+
+def worker_process(db_path, profile, threads, writes, start_at, user_id, task_id, results):
+    import threading
+    app = create_app_for(db_path, profile)
+    from app.controllers.tasks import add_task_comment
+    from app.utils.write_queue import run_write
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def run_thread(index):
+        own_latencies, own_errors = [], 0
+        with app.app_context():
+            for i in range(writes):
+                started = time.perf_counter()
+                try:
+                    run_write(add_task_comment, task_id, user_id, f'comment {os.getpid()}-{index}-{i}')
+                except Exception:
+                    from app import db
+                    db.session.rollback()
+                    own_errors += 1
+                    continue
+                own_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    # Start every process at the same moment, after imports and app setup
+    time.sleep(max(0, start_at - time.time()))
+    pool = [threading.Thread(target=run_thread, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((time.time(), latencies, sum(errors)))
+
+def run_profile(profile, processes, threads, writes):
+    db_path = os.path.join(tempfile.mkdtemp(), f'{profile}.db')
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:  # seed in a separate interpreter so this one never imports the app
+        user_id, task_id = pool.apply(seed, (db_path, profile))
+    results = context.Queue()
+    start_at = time.time() + 3
+    workers = [context.Process(target=worker_process,
+                               args=(db_path, profile, threads, writes, start_at, user_id, task_id, results))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    elapsed = max(finished for finished, _, _ in outcomes) - start_at
+    latencies = sorted(latency for _, process_latencies, _ in outcomes for latency in process_latencies)
+    errors = sum(process_errors for _, _, process_errors in outcomes)
+    return {
+        'writes': len(latencies),
+        'errors': errors,
+        'seconds': elapsed,
+        'per_second': len(latencies) / elapsed if elapsed else 0,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=50, help='writes per thread')
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    args = parser.parse_args()
+
+    print(f'{args.processes} processes x {args.threads} threads x {args.writes} writes\n')
+    print(f"{'profile':<10} {'writes':>7} {'errors':>7} {'seconds':>8} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for profile in args.profiles.split(','):
+        result = run_profile(profile, args.processes, args.threads, args.writes)
+        print(f"{profile:<10} {result['writes']:>7} {result['errors']:>7} {result['seconds']:>8.2f} "
+              f"{result['per_second']:>9.0f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+
+if __name__ == '__main__':
+    main()
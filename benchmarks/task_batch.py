@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Reorganizing a board: one batch request against one form post per task.
+
+Seeds one project of --tasks tasks per path on a fresh SQLite database,
+then moves every task to a new status with a comment, either through
+POST /tasks/<id>/update-status once per task or through a single
+POST /tasks/batch, and reports wall time, SQL statements and commits.
+
+Usage: python benchmarks/task_batch.py [--tasks 60] [--rounds 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STATUSES = ['todo', 'in_progress', 'completed']
+
+def create_app_for(db_path):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['RUN_BACKGROUND_JOBS'] = 'false'
+    os.environ['METRICS_ENABLED'] = 'false'
+    from app import create_app
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    return app
+
+def seed_users(app):
+    from app import db
+    from app.models.user import User
+    with app.app_context():
+        db.create_all()
+        pi = User(username='pi', email='pi@example.org', password_hash='x', first_name='P', last_name='I', role='pi')
+        member = User(username='member', email='member@example.org', password_hash='x',
+                      first_name='M', last_name='E')
+        db.session.add_all([pi, member])
+        db.session.commit()
+        return pi.id, member.id
+
+def seed_board(app, name, pi_id, member_id, tasks):
+    from app import db
+    from app.models.user import User
+    from app.models.project import Project
+    from app.models.task import Task
+    with app.app_context():
+        pi, member = db.session.get(User, pi_id), db.session.get(User, member_id)
+        project = Project(title=name, project_id=name.upper(), start_date=date.today(),
+                          end_date=date.today() + timedelta(days=365), pi_id=pi.id)
+        project.team_members = [member]
+        db.session.add(project)
+        db.session.flush()
+        task_list = [Task(title=f'Task {i}', project_id=project.id, created_by_id=pi.id,
+                          assigned_to_id=member.id, status=STATUSES[i % 3]) for i in range(tasks)]
+        db.session.add_all(task_list)
+        db.session.commit()
+        return [(task.id, task.status) for task in task_list]
+
+def client_for(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+def moves(tasks, round_number):
+    return [{'id': task_id, 'status': STATUSES[(STATUSES.index(status) + round_number + 1) % 3],
+             'comment': f'moved in round {round_number}'} for task_id, status in tasks]
+
+def per_task(client, items):
+    for item in items:
+        response = client.post(f"/tasks/{item['id']}/update-status",
+                               data={'status': item['status'], 'comment': item['comment']})
+        assert response.status_code == 302, response.status_code
+
+def batch(client, items):
+    response = client.post('/tasks/batch', json={'items': items})
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+def run_path(app, path, pi_id, member_id, tasks, rounds):
+    from sqlalchemy import event
+    from app import db
+    task_states = seed_board(app, path.__name__, pi_id, member_id, tasks)
+    client = client_for(app, pi_id)
+    with app.app_context():
+        engine = db.engine
+    counts = {'statements': 0, 'commits': 0}
+
+    def on_statement(*args):
+        counts['statements'] += 1
+
+    def on_commit(*args):
+        counts['commits'] += 1
+
+    event.listen(engine, 'before_cursor_execute', on_statement)
+    event.listen(engine, 'commit', on_commit)
+    timings = []
+    try:
+        for round_number in range(rounds):
+            items = moves(task_states, round_number)
+            started = time.perf_counter()
+            path(client, items)
+            timings.append(time.perf_counter() - started)
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_statement)
+        event.remove(engine, 'commit', on_commit)
+    return {
+        'median_ms': statistics.median(timings) * 1000,
+        'statements': counts['statements'] / rounds,
+        'commits': counts['commits'] / rounds,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=60)
+    parser.add_argument('--rounds', type=int, default=5, help='board reorganizations per path')
+    args = parser.parse_args()
+
+    app = create_app_for(os.path.join(tempfile.mkdtemp(), 'task_batch.db'))
+    pi_id, member_id = seed_users(app)
+    print(f'{args.tasks} tasks moved with a comment, median of {args.rounds} rounds\n')
+    print(f"{'path':<10} {'ms':>9} {'statements':>11} {'commits':>8}")
+    for path in (per_task, batch):
+        result = run_path(app, path, pi_id, member_id, args.tasks, args.rounds)
+        print(f"{path.__name__:<10} {result['median_ms']:>9.1f} {result['statements']:>11.0f} "
+              f"{result['commits']:>8.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,18 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite tuning, applied to every connection when the database is a SQLite file
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'  # readers no longer block the writer
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'  # fsync at checkpoints, safe with WAL
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 15000)  # ms to wait for the write lock
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE') or 65536)  # KiB of page cache per connection
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 268435456)  # bytes of the file read via mmap
+    
+    # On SQLite, write-heavy paths commit through one writer thread per process that groups concurrent commits
+    WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    WRITE_QUEUE_MAX_BATCH = int(os.environ.get('WRITE_QUEUE_MAX_BATCH') or 100)  # writes per group commit
+    WRITE_QUEUE_TIMEOUT = int(os.environ.get('WRITE_QUEUE_TIMEOUT') or 30)  # seconds a caller waits for its write
+    
     # Mail settings
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -27,6 +39,88 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'noreply@pimanagement.com'
     
+    # Outbox delivery: emails are queued in the database and sent by the mail worker
+    MAIL_WORKER_THREADS = int(os.environ.get('MAIL_WORKER_THREADS') or 2)  # 0 disables the in-process worker
+    MAIL_WORKER_INTERVAL = int(os.environ.get('MAIL_WORKER_INTERVAL') or 5)  # seconds between outbox polls
+    MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE') or 50)
+    MAIL_MAX_ATTEMPTS = int(os.environ.get('MAIL_MAX_ATTEMPTS') or 5)
+    MAIL_RETRY_BACKOFF = int(os.environ.get('MAIL_RETRY_BACKOFF') or 30)  # seconds, doubled per attempt
+    MAIL_RETRY_BACKOFF_MAX = int(os.environ.get('MAIL_RETRY_BACKOFF_MAX') or 3600)
+    MAIL_CLAIM_TIMEOUT = int(os.environ.get('MAIL_CLAIM_TIMEOUT') or 600)
+    MAIL_SMTP_TIMEOUT = int(os.environ.get('MAIL_SMTP_TIMEOUT') or 30)
+    MAIL_POOL_MAX_IDLE = int(os.environ.get('MAIL_POOL_MAX_IDLE') or 60)  # probe idle connections after this
+    
+    # Listing pagination
+    PAGE_SIZE = int(os.environ.get('PAGE_SIZE') or 25)
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE') or 100)
+    
+    # Background jobs (meeting sweeper, reminders, retention, mail delivery) run in exactly one process:
+    # `flask run-jobs`, or the dev server started with `python run.py`. RUN_BACKGROUND_JOBS starts them
+    # inside every create_app() instead, so only enable it for a single-process deployment
+    RUN_BACKGROUND_JOBS = os.environ.get('RUN_BACKGROUND_JOBS', 'false').lower() in ['true', 'on', '1']
+    MEETING_SWEEP_INTERVAL = int(os.environ.get('MEETING_SWEEP_INTERVAL') or 300)  # seconds, 0 disables
+    REMINDER_INTERVAL = int(os.environ.get('REMINDER_INTERVAL') or 300)  # seconds between reminder runs, 0 disables
+    REMINDER_LEAD_HOURS = int(os.environ.get('REMINDER_LEAD_HOURS') or 24)  # remind this long before a meeting
+    REMINDER_BATCH_SIZE = int(os.environ.get('REMINDER_BATCH_SIZE') or 500)  # meetings claimed per transaction
+    
+    # Notification push (Server-Sent Events with long-polling fallback)
+    NOTIFICATION_STREAM_ENABLED = os.environ.get('NOTIFICATION_STREAM_ENABLED', 'true').lower() in ['true', 'on', '1']
+    # Open streams and waiting long-polls each hold a request thread for their whole lifetime, so
+    # NOTIFICATION_MAX_STREAMS caps them per process and must stay below the worker's thread count
+    # (GUNICORN_THREADS in startup.sh); clients over the cap fall back to short polling
+    NOTIFICATION_STREAM_TIMEOUT = int(os.environ.get('NOTIFICATION_STREAM_TIMEOUT') or 55)  # seconds per stream
+    NOTIFICATION_POLL_INTERVAL = int(os.environ.get('NOTIFICATION_POLL_INTERVAL') or 15)  # database re-check
+    NOTIFICATION_LONGPOLL_TIMEOUT = int(os.environ.get('NOTIFICATION_LONGPOLL_TIMEOUT') or 20)
+    NOTIFICATION_MAX_STREAMS = int(os.environ.get('NOTIFICATION_MAX_STREAMS') or 4)  # held per process
+    
+    # Password hashing policy; hashes made under an older method are replaced at the user's next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'  # e.g. scrypt:32768:8:1
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 16)
+    PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS') or 2)  # hashes computed at once per process
+    PASSWORD_POOL_QUEUE = int(os.environ.get('PASSWORD_POOL_QUEUE') or 8)  # logins that may wait; more get a 503
+    
+    # Logged-in user cache (per process); entries are dropped when the user or their memberships change
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE') or 1024)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 60)  # seconds
+    
+    # Metrics and SQL instrumentation
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token for /metrics; unset, only loopback may scrape
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS') or 200)  # 0 disables
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD') or 10)  # repeats of one statement per request
+    
+    # Full-text search: only the newest SEARCH_RANK_WINDOW matches are ranked (SQLite)
+    SEARCH_RANK_WINDOW = int(os.environ.get('SEARCH_RANK_WINDOW') or 1000)
+    
+    # Report exports stream rows from the database in batches of this size
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 1000)
+    
+    # Bulk imports validate and insert rows in batches of this size, one transaction per batch
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE') or 5000)
+    
+    # iCalendar feeds cover this many days around today by default; ?past= / ?future= can only narrow it
+    CALENDAR_FEED_PAST_DAYS = int(os.environ.get('CALENDAR_FEED_PAST_DAYS') or 90)
+    CALENDAR_FEED_FUTURE_DAYS = int(os.environ.get('CALENDAR_FEED_FUTURE_DAYS') or 365)
+    CALENDAR_CACHE_SIZE = int(os.environ.get('CALENDAR_CACHE_SIZE') or 512)  # rendered feed bodies per process
+    CALENDAR_CACHE_TTL = int(os.environ.get('CALENDAR_CACHE_TTL') or 3600)  # seconds
+    
+    # Batch task updates (kanban boards) apply at most this many items in one transaction
+    TASK_BATCH_MAX_ITEMS = int(os.environ.get('TASK_BATCH_MAX_ITEMS') or 500)
+    
+    # Retention: read notifications are deleted after NOTIFICATION_RETENTION_DAYS, and completed projects
+    # that ended and saw no changes for PROJECT_ARCHIVE_AFTER_DAYS move to the archive; 0 disables either
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS') or 90)
+    PROJECT_ARCHIVE_AFTER_DAYS = int(os.environ.get('PROJECT_ARCHIVE_AFTER_DAYS') or 365)
+    RETENTION_CHUNK_SIZE = int(os.environ.get('RETENTION_CHUNK_SIZE') or 1000)  # notifications deleted per transaction
+    RETENTION_INTERVAL = int(os.environ.get('RETENTION_INTERVAL') or 86400)  # seconds between runs, 0 disables
+    
+    # Rendered template fragments: 'memory' (per process), 'filesystem', 'redis' or 'none'
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND') or 'memory'
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE') or 2048)  # entries, memory backend
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL') or 3600)  # seconds
+    FRAGMENT_CACHE_DIR = os.environ.get('FRAGMENT_CACHE_DIR') or 'data/fragment_cache'
+    FRAGMENT_CACHE_REDIS_URL = os.environ.get('FRAGMENT_CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    
     # Production settings
     if os.environ.get('FLASK_ENV') == 'production':
         # Disable debug mode in production
@@ -1,43 +1,111 @@
 #!/usr/bin/env python3
 """
 Database Migration Script for PI Management System
-This script adds the title column to existing user table
+This script creates missing tables and adds columns introduced after the
+initial schema to existing ones, on the database the app is configured for.
+Any failure exits non-zero so startup.sh stops before serving traffic.
 """
 
-import sqlite3
-import os
+import sys
+from datetime import date
 
-def migrate_database():
-    db_path = 'pi_management.db'
-    
-    if not os.path.exists(db_path):
-        print("Database file not found. Creating new database...")
-        return
+from sqlalchemy import inspect, text
+
+from app import create_app, db
+
+# (table, column, column definition) added after the initial schema
+NEW_COLUMNS = [
+    ('user', 'title', "VARCHAR(10) DEFAULT 'Mr'"),
+    ('project', 'task_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('project', 'todo_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('project', 'in_progress_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('project', 'completed_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('project', 'overdue_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('project', 'task_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('user', 'calendar_token', 'VARCHAR(64)'),
+    ('user', 'calendar_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('user', 'calendar_updated_at', 'DATETIME'),
+    ('user', 'unread_notification_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('user', 'identity_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('meeting', 'updated_at', 'DATETIME'),
+    ('meeting', 'reminder_sent_at', 'DATETIME'),
+    ('meeting', 'reminder_claim_token', 'VARCHAR(32)'),
+    ('meeting', 'reminder_claimed_at', 'DATETIME'),
+]
+
+# (index name, table, columns) backing the dashboard, listing and notification queries
+NEW_INDEXES = [
+    ('ix_task_assigned_to_status', 'task', 'assigned_to_id, status'),
+    ('ix_task_project_status', 'task', 'project_id, status'),
+    ('ix_task_assignee_due', 'task', 'assigned_to_id, (due_date IS NULL), due_date, id'),
+    ('ix_task_comment_task_id', 'task_comment', 'task_id'),
+    ('ix_meeting_status_date', 'meeting', 'status, meeting_date'),
+    ('ix_meeting_project_date', 'meeting', 'project_id, meeting_date'),
+    ('ix_notification_user_read_created', 'notification', 'user_id, is_read, created_at'),
+    ('ix_project_pi_id', 'project', 'pi_id'),
+    ('ix_project_members_user_id', 'project_members', 'user_id'),
+    ('ix_meeting_attendees_user_id', 'meeting_attendees', 'user_id'),
+]
+
+# Populates the project task counters from the task table
+REFRESH_TASK_COUNTERS = """
+    UPDATE project SET
+        task_count = (SELECT COUNT(*) FROM task WHERE task.project_id = project.id),
+        todo_count = (SELECT COUNT(*) FROM task WHERE task.project_id = project.id AND task.status = 'todo'),
+        in_progress_count = (SELECT COUNT(*) FROM task WHERE task.project_id = project.id AND task.status = 'in_progress'),
+        completed_count = (SELECT COUNT(*) FROM task WHERE task.project_id = project.id AND task.status = 'completed'),
+        overdue_count = (SELECT COUNT(*) FROM task WHERE task.project_id = project.id AND task.status != 'completed'
+                         AND task.due_date < :today)
+"""
+
+# Populates the users' unread notification counters from the notification table
+REFRESH_UNREAD_COUNTS = """
+    UPDATE "user" SET
+        unread_notification_count = (SELECT COUNT(*) FROM notification
+                                     WHERE notification.user_id = "user".id AND notification.is_read = :read)
+"""
+
+def migrate_database(engine):
+    # New tables come with every column and index already
+    db.metadata.create_all(engine)
+    quote = engine.dialect.identifier_preparer.quote
     
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+    with engine.begin() as conn:
+        added = []
+        for table, column, definition in NEW_COLUMNS:
+            if column not in [existing['name'] for existing in inspect(conn).get_columns(table)]:
+                print(f"Adding {column} column to {table} table...")
+                conn.execute(text(f"ALTER TABLE {quote(table)} ADD COLUMN {column} {definition}"))
+                added.append(column)
         
-        # Check if title column exists
-        cursor.execute("PRAGMA table_info(user)")
-        columns = [column[1] for column in cursor.fetchall()]
+        if 'task_count' in added:
+            print("Populating project task counters...")
+            conn.execute(text(REFRESH_TASK_COUNTERS), {'today': date.today()})
         
-        if 'title' not in columns:
-            print("Adding title column to user table...")
-            cursor.execute("ALTER TABLE user ADD COLUMN title VARCHAR(10) DEFAULT 'Mr'")
-            
-            # Update existing users with default title
-            cursor.execute("UPDATE user SET title = 'Mr' WHERE title IS NULL")
-            
-            conn.commit()
-            print("✅ Title column added successfully!")
-        else:
-            print("✅ Title column already exists!")
+        if 'unread_notification_count' in added:
+            print("Populating unread notification counters...")
+            conn.execute(text(REFRESH_UNREAD_COUNTS), {'read': False})
         
-        conn.close()
-        
-    except Exception as e:
-        print(f"❌ Error during migration: {e}")
+        if 'updated_at' in added:
+            conn.execute(text("UPDATE meeting SET updated_at = created_at"))
+    print(f"✅ {len(added)} new columns added!" if added else "✅ All columns already exist!")
+    
+    with engine.begin() as conn:
+        for name, table, columns in NEW_INDEXES:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {quote(table)} ({columns})"))
+        conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS ix_user_calendar_token ON "user" (calendar_token)'))
+        conn.execute(text("ANALYZE"))
+    print(f"✅ {len(NEW_INDEXES)} indexes ensured!")
+    
+    if 'search_index' not in inspect(engine).get_table_names():
+        print("ℹ️  Run `flask reindex-search` to build the full-text search index")
 
 if __name__ == '__main__':
-    migrate_database()
\ No newline at end of file
+    app = create_app()
+    with app.app_context():
+        print(f"🔧 Migrating {db.engine.url.render_as_string(hide_password=True)}")
+        try:
+            migrate_database(db.engine)
+        except Exception as e:
+            print(f"❌ Error during migration: {e}", file=sys.stderr)
+            sys.exit(1)
@@ -4,6 +4,8 @@ from app.models.project import Project
 from app.models.task import Task
 from app.models.meeting import Meeting
 from app.models.notification import Notification
+from app.models.outbound_email import OutboundEmail
+from app.models.archived_project import ArchivedProject
 from sqlalchemy.exc import SQLAlchemyError
 
 app = create_app()
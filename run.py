@@ -1,9 +1,11 @@
-from app import create_app, db
+from app import create_app, db, start_background_jobs
 from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
 from app.models.meeting import Meeting
 from app.models.notification import Notification
+from app.models.outbound_email import OutboundEmail
+from app.models.archived_project import ArchivedProject
 from sqlalchemy import text
 import os
 
@@ -17,7 +19,9 @@ def make_shell_context():
         'Project': Project, 
         'Task': Task, 
         'Meeting': Meeting,
-        'Notification': Notification
+        'Notification': Notification,
+        'OutboundEmail': OutboundEmail,
+        'ArchivedProject': ArchivedProject
     }
 
 def initialize_database():
@@ -43,4 +47,9 @@ if __name__ == '__main__':
     debug_mode = os.environ.get('FLASK_ENV') != 'production'
     port = int(os.environ.get('PORT', 5000))
     
+    # The dev server is the one process that runs the background jobs; with the
+    # reloader that is the child serving requests, not the watcher
+    if not app.config['RUN_BACKGROUND_JOBS'] and (not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        start_background_jobs(app)
+    
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
\ No newline at end of file
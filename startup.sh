@@ -15,33 +15,32 @@ if [ ! -z "$DB_HOST" ] && [ ! -z "$DB_PORT" ]; then
     echo "✅ Database is ready!"
 fi
 
-# Force initialize database tables (critical for AWS deployment)
+# Create missing tables and migrate existing ones (critical for AWS deployment);
+# never start serving on a half-migrated schema
 echo "🔧 Initializing database..."
-python3 -c "
-import os
-from app import create_app, db
-from app.models.user import User
-from app.models.project import Project
-from app.models.task import Task
-from app.models.meeting import Meeting
-from app.models.notification import Notification
-
-app = create_app()
-with app.app_context():
-    try:
-        db.create_all()
-        print('✅ Database tables created successfully!')
-    except Exception as e:
-        print(f'❌ Database initialization error: {e}')
-"
+if ! python3 database_migration.py; then
+    echo "❌ Database migration failed"
+    exit 1
+fi
 
 echo "✅ Database initialization complete!"
 
-# Start the application
-if [ \"\$FLASK_ENV\" = \"production\" ]; then
-    echo \"🚀 Starting production server with Gunicorn...\"
-    exec gunicorn --bind 0.0.0.0:5000 --workers 4 --timeout 120 --access-logfile - --error-logfile - run:app
+# Start the application; the web processes never run background jobs, so
+# production starts one dedicated jobs process next to Gunicorn
+if [ "$FLASK_ENV" = "production" ]; then
+    # Gunicorn's gthread workers spend one thread per open notification stream or
+    # waiting long-poll; NOTIFICATION_MAX_STREAMS of them per worker, so it must
+    # stay below GUNICORN_THREADS or streams starve every other request
+    GUNICORN_THREADS=${GUNICORN_THREADS:-8}
+    if [ "${NOTIFICATION_MAX_STREAMS:-4}" -ge "$GUNICORN_THREADS" ]; then
+        echo "❌ NOTIFICATION_MAX_STREAMS (${NOTIFICATION_MAX_STREAMS:-4}) must be lower than GUNICORN_THREADS ($GUNICORN_THREADS)"
+        exit 1
+    fi
+    echo "⏱️ Starting background jobs..."
+    flask run-jobs &
+    echo "🚀 Starting production server with Gunicorn..."
+    exec gunicorn --bind 0.0.0.0:5000 --workers 4 --threads $GUNICORN_THREADS --timeout 120 --access-logfile - --error-logfile - run:app
 else
-    echo \"🚀 Starting development server...\"
+    echo "🚀 Starting development server..."
     exec python3 run.py
 fi
\ No newline at end of file
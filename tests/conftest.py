@@ -0,0 +1,76 @@
+"""Shared fixtures: every test gets its own app on a fresh SQLite database."""
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['RUN_BACKGROUND_JOBS'] = 'false'
+
+from config import Config
+from app import create_app, db
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build an app on a new database file; keyword arguments override Config"""
+    apps = []
+
+    def factory(**overrides):
+        monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path}/app{len(apps)}.db')
+        for key, value in overrides.items():
+            monkeypatch.setattr(Config, key, value, raising=False)
+        app = create_app()
+        app.config['WTF_CSRF_ENABLED'] = False
+        with app.app_context():
+            db.create_all()
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def client_for(app):
+    """Test client logged in as the given user id"""
+    def factory(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        return client
+    return factory
+
+class StatementCounter:
+    """Counts the SQL statements an engine executes inside the with block"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def __len__(self):
+        return len(self.statements)
+
+@pytest.fixture
+def count_statements(app):
+    def factory():
+        with app.app_context():
+            return StatementCounter(db.engine)
+    return factory
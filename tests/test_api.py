@@ -0,0 +1,36 @@
+"""Read-only /api/v1: msgpack negotiation and the notifications unread filter."""
+import msgpack
+
+from app import db
+from app.models.user import User
+from app.models.notification import Notification
+
+def seed_notifications(app):
+    with app.app_context():
+        user = User(username='member', email='member@example.org', password_hash='x', first_name='M', last_name='E')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all([Notification(user_id=user.id, title=f'Note {i}', message='m',
+                                         notification_type='system', is_read=i % 2 == 0) for i in range(4)])
+        db.session.commit()
+        return user.id
+
+def test_msgpack_body_matches_json(app, client_for):
+    client = client_for(seed_notifications(app))
+    as_json = client.get('/api/v1/notifications', headers={'Accept': 'application/json'})
+    as_msgpack = client.get('/api/v1/notifications', headers={'Accept': 'application/msgpack'})
+
+    assert as_msgpack.status_code == 200
+    assert as_msgpack.mimetype == 'application/msgpack'
+    assert msgpack.unpackb(as_msgpack.data) == as_json.get_json()
+    assert as_msgpack.headers['ETag'] != as_json.headers['ETag']
+
+def test_unread_filter_honours_its_value(app, client_for):
+    client = client_for(seed_notifications(app))
+
+    def titles(query):
+        return [row['title'] for row in client.get(f'/api/v1/notifications?{query}').get_json()['data']]
+
+    assert titles('unread=1') == ['Note 1', 'Note 3']
+    assert titles('unread=0') == titles('') == ['Note 0', 'Note 1', 'Note 2', 'Note 3']
+    assert client.get('/api/v1/notifications?unread=yes').status_code == 400
@@ -0,0 +1,74 @@
+"""The dashboard runs a fixed number of statements however many projects a PI has."""
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.meeting import Meeting
+from app.models.notification import Notification
+
+# Login (identity load), stats, team size, due-soon count, summaries with
+# member counts, meetings, pending tasks and notifications
+DASHBOARD_STATEMENTS = 10
+
+def seed_portfolio(app, username, projects):
+    """A PI with `projects` projects, each with a team, tasks and a meeting"""
+    with app.app_context():
+        pi = User(username=username, email=f'{username}@example.org', password_hash='x',
+                  first_name='Pat', last_name=username, role='pi')
+        members = [User(username=f'{username}-m{i}', email=f'{username}-m{i}@example.org',
+                        password_hash='x', first_name='Sam', last_name=str(i)) for i in range(3)]
+        db.session.add_all([pi] + members)
+        db.session.flush()
+        for i in range(projects):
+            project = Project(title=f'{username} project {i}', project_id=f'{username.upper()}-{i}',
+                              description='Seeded project',
+                              start_date=date.today(), end_date=date.today() + timedelta(days=365),
+                              status='active', funding_amount=1000, pi_id=pi.id)
+            project.team_members = members
+            db.session.add(project)
+            db.session.flush()
+            db.session.add_all([Task(title=f'Task {i}-{n}', project_id=project.id, created_by_id=pi.id,
+                                     assigned_to_id=members[n].id, status=['todo', 'in_progress'][n % 2],
+                                     due_date=date.today() + timedelta(days=n)) for n in range(2)])
+            meeting = Meeting(title=f'Meeting {i}', meeting_date=datetime.now() + timedelta(days=1),
+                              project_id=project.id, created_by_id=pi.id)
+            meeting.attendees = members
+            db.session.add(meeting)
+        db.session.add(Notification(user_id=pi.id, title='Hello', message='Welcome',
+                                    notification_type='system'))
+        db.session.commit()
+        return pi.id
+
+def test_dashboard_statement_count_does_not_grow_with_portfolio(app, client_for, count_statements):
+    small = seed_portfolio(app, 'small', 5)
+    large = seed_portfolio(app, 'large', 200)
+
+    counts = {}
+    for pi_id in (small, large):
+        client = client_for(pi_id)
+        with count_statements() as statements:
+            response = client.get('/dashboard')
+        assert response.status_code == 200
+        counts[pi_id] = len(statements)
+
+    assert counts[small] == counts[large] == DASHBOARD_STATEMENTS, counts
+
+def test_due_soon_card_counts_open_tasks_due_within_a_week(app, client_for):
+    pi_id = seed_portfolio(app, 'solo', 1)
+    with app.app_context():
+        project = Project.query.filter_by(pi_id=pi_id).one()
+        today = date.today()
+        # Already seeded: due today and tomorrow. Overdue counts; later, undated or done does not
+        for title, due_date, status in [('Overdue', today - timedelta(days=3), 'todo'),
+                                        ('Next month', today + timedelta(days=30), 'todo'),
+                                        ('Undated', None, 'in_progress'),
+                                        ('Done', today, 'completed')]:
+            db.session.add(Task(title=title, project_id=project.id, created_by_id=pi_id,
+                                due_date=due_date, status=status))
+        db.session.commit()
+
+    html = client_for(pi_id).get('/dashboard').get_data(as_text=True)
+    card = html[html.index('Tasks Due Soon'):]
+    assert card[card.index('<h3'):card.index('</h3>')].endswith('>3')
@@ -0,0 +1,34 @@
+"""Cached identities are not trusted after another process changes the user."""
+from datetime import date, timedelta
+
+from app import create_app, db
+from app.models.user import User
+from app.models.project import Project
+
+def test_membership_removed_by_another_process_revokes_access(app, client_for):
+    with app.app_context():
+        pi = User(username='pi', email='pi@example.org', password_hash='x', first_name='P', last_name='I', role='pi')
+        member = User(username='member', email='member@example.org', password_hash='x', first_name='M', last_name='E')
+        project = Project(title='Shared', project_id='SHARED-1', description='d', start_date=date.today(),
+                          end_date=date.today() + timedelta(days=30), status='active', owner=pi)
+        project.team_members = [member]
+        db.session.add(project)
+        db.session.commit()
+        member_id, project_id = member.id, project.id
+
+    client = client_for(member_id)
+    assert client.get(f'/projects/{project_id}').status_code == 200
+
+    # A second app on the same database stands in for another worker process,
+    # whose commit cannot clear this process's cache
+    other = create_app()
+    try:
+        with other.app_context():
+            project = db.session.get(Project, project_id)
+            project.team_members = []
+            db.session.commit()
+    finally:
+        with other.app_context():
+            db.engine.dispose()
+
+    assert client.get(f'/projects/{project_id}').status_code == 403
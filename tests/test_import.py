@@ -0,0 +1,20 @@
+"""Bulk import reports malformed rows instead of failing the request."""
+import json
+
+from app import db
+from app.models.user import User
+from app.services.import_service import ImportService
+
+def test_json_rows_that_are_not_objects_are_row_errors(app):
+    with app.app_context():
+        pi = User(username='pi', email='pi@example.org', password_hash='x', first_name='P', last_name='I', role='pi')
+        db.session.add(pi)
+        db.session.commit()
+
+        data = ImportService.parse(json.dumps([1, 'x']), 'users.json')
+        report = ImportService.run(data, pi, notify=False)
+
+        assert not report.ok
+        assert len(report.errors) == 2
+        assert all('expected an object' in error for error in report.errors)
+        assert User.query.count() == 1
@@ -0,0 +1,92 @@
+"""Outbox delivery against a local aiosmtpd server."""
+import socket
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('aiosmtpd')
+from aiosmtpd.controller import Controller
+
+from app import db
+from app.models.outbound_email import OutboundEmail
+from app.services.email_service import EmailService
+from app.services.mail_outbox import MailOutboxWorker, get_connection_pool
+
+class RecordingHandler:
+    """Accepts or rejects every message, noting which SMTP session carried it"""
+
+    def __init__(self, reject=False):
+        self.reject = reject
+        self.sessions = []
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.append(id(session))
+        if self.reject:
+            return '550 Mailbox unavailable'
+        self.messages.append(envelope)
+        return '250 Message accepted for delivery'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server(request):
+    handler = RecordingHandler(reject=getattr(request, 'param', False))
+    controller = Controller(handler, hostname='localhost', port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+@pytest.fixture
+def mail_app(make_app, smtp_server):
+    # A username queues mail; no password, so the worker does not authenticate
+    app = make_app(MAIL_SERVER='localhost', MAIL_PORT=smtp_server.port, MAIL_USE_TLS=False,
+                   MAIL_USE_SSL=False, MAIL_USERNAME='outbox-test', MAIL_PASSWORD=None,
+                   MAIL_MAX_ATTEMPTS=2, MAIL_RETRY_BACKOFF=30)
+    yield app
+    get_connection_pool(app).close_all()
+
+def queue_emails(count):
+    for i in range(count):
+        assert EmailService.send_email(f'Outbox test {i}', [f'user{i}@example.org'], f'<p>Body {i}</p>')
+
+def test_batch_is_delivered_over_one_pooled_connection(mail_app, smtp_server):
+    with mail_app.app_context():
+        queue_emails(5)
+        sent = MailOutboxWorker.process_outbox(batch_size=5, max_batches=1)
+        emails = OutboundEmail.query.order_by(OutboundEmail.id).all()
+        statuses = {email.status for email in emails}
+        sent_at = [email.sent_at for email in emails]
+
+    handler = smtp_server.handler
+    assert sent == 5
+    assert statuses == {'sent'}
+    assert all(sent_at)
+    assert [envelope.rcpt_tos for envelope in handler.messages] == [[f'user{i}@example.org'] for i in range(5)]
+    assert len(set(handler.sessions)) == 1
+
+@pytest.mark.parametrize('smtp_server', [True], indirect=True)
+def test_rejected_email_backs_off_then_dead_letters(mail_app, smtp_server):
+    with mail_app.app_context():
+        queue_emails(1)
+        assert MailOutboxWorker.process_outbox() == 0
+        email = OutboundEmail.query.one()
+        assert (email.status, email.attempts) == ('pending', 1)
+        assert email.next_attempt_at > datetime.utcnow()
+        assert '550' in email.last_error
+
+        # Not due yet: the backoff keeps it out of the next run
+        assert MailOutboxWorker.process_outbox() == 0
+        assert db.session.get(OutboundEmail, email.id).attempts == 1
+
+        # Once due it fails again and MAIL_MAX_ATTEMPTS (2) dead-letters it
+        OutboundEmail.query.update({OutboundEmail.next_attempt_at: datetime.utcnow()})
+        db.session.commit()
+        assert MailOutboxWorker.process_outbox() == 0
+        email = db.session.get(OutboundEmail, email.id)
+        assert (email.status, email.attempts) == ('dead', 2)
+
+    assert len(smtp_server.handler.sessions) == 2
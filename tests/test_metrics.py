@@ -0,0 +1,16 @@
+"""/metrics is closed to remote clients unless they present METRICS_TOKEN."""
+
+def test_without_token_only_direct_loopback_requests_are_served(app):
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code == 403
+    # A reverse proxy on the same host forwards remote clients from loopback
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.7'}).status_code == 403
+
+def test_token_is_required_when_configured(make_app):
+    client = make_app(METRICS_TOKEN='scrape-secret').test_client()
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'},
+                          environ_base={'REMOTE_ADDR': '203.0.113.7'})
+    assert response.status_code == 200
+    assert b'http_request_duration_seconds' in response.data
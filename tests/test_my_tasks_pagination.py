@@ -0,0 +1,42 @@
+"""My Tasks pages through an assignee's tasks by due date, undated tasks last."""
+from datetime import date, timedelta
+
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+
+def test_keyset_pages_put_undated_tasks_last(app, client_for):
+    with app.app_context():
+        pi = User(username='pi', email='pi@example.org', password_hash='x', first_name='P', last_name='I', role='pi')
+        member = User(username='member', email='member@example.org', password_hash='x',
+                      first_name='M', last_name='E')
+        db.session.add_all([pi, member])
+        db.session.flush()
+        project = Project(title='Board', project_id='BOARD', description='d', start_date=date.today(),
+                          end_date=date.today() + timedelta(days=90), pi_id=pi.id)
+        db.session.add(project)
+        db.session.flush()
+        # Every third task is undated; dated ones repeat so ties fall back to id
+        tasks = [Task(title=f'Task {i}', project_id=project.id, created_by_id=pi.id, assigned_to_id=member.id,
+                      due_date=None if i % 3 == 0 else date.today() + timedelta(days=i % 4))
+                 for i in range(14)]
+        db.session.add_all(tasks)
+        db.session.commit()
+        expected = [task.id for task in sorted(tasks, key=lambda task: (task.due_date is None,
+                                                                         task.due_date or date.min, task.id))]
+        member_id = member.id
+
+    client = client_for(member_id)
+    seen, cursor = [], None
+    while True:
+        query = {'format': 'json', 'limit': 4}
+        if cursor:
+            query['cursor'] = cursor
+        page = client.get('/tasks/my-tasks', query_string=query).get_json()
+        seen += [task['id'] for task in page['tasks']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == expected
@@ -0,0 +1,34 @@
+"""Held notification connections are capped per process; the rest poll."""
+import time
+
+from app import db
+from app.models.user import User
+from app.services.notification_broker import broker
+
+def seed_user(app):
+    with app.app_context():
+        user = User(username='reader', email='reader@example.org', password_hash='x', first_name='R', last_name='E')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+def test_over_the_cap_streams_are_refused_and_polls_answer_at_once(make_app):
+    app = make_app(NOTIFICATION_MAX_STREAMS=1, NOTIFICATION_STREAM_TIMEOUT=0, NOTIFICATION_LONGPOLL_TIMEOUT=30)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(seed_user(app))
+    held = broker.subscribe(-1, limit=1)
+    try:
+        assert client.get('/notifications/stream').status_code == 503
+        started = time.monotonic()
+        body = client.get('/notifications/poll').get_json()
+        assert time.monotonic() - started < 5
+        assert body['notifications'] == [] and body['wait'] == app.config['NOTIFICATION_POLL_INTERVAL']
+    finally:
+        broker.unsubscribe(-1, held)
+
+    response = client.get('/notifications/stream')
+    assert response.status_code == 200
+    assert b'event: unread' in response.data
+    response.close()
+    assert broker.subscriber_count() == 0
@@ -0,0 +1,15 @@
+"""No page behind the main controllers falls back to a full table scan."""
+from datetime import date
+
+from app.utils.query_plans import check_query_plans
+from benchmarks.datagen import generate
+
+def test_main_pages_use_indexes(app):
+    with app.app_context():
+        generate('tiny', seed=1, anchor=date(2026, 1, 15), log=lambda message: None)
+        queries = check_query_plans(app)
+
+    assert queries, 'no queries captured'
+    scans = {f'{query.url}: {" ".join(query.statement.split())}': query.full_scans
+             for query in queries if query.full_scans}
+    assert not scans, scans
@@ -0,0 +1,29 @@
+"""Project archiving keys on real activity, not counter bookkeeping."""
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.archived_project import ArchivedProject
+from app.services.retention_service import RetentionService
+
+def test_counter_upkeep_does_not_keep_a_finished_project_alive(app):
+    long_ago = date.today() - timedelta(days=400)
+    with app.app_context():
+        pi = User(username='pi', email='pi@example.org', password_hash='x', first_name='P', last_name='I', role='pi')
+        project = Project(title='Finished', project_id='DONE-1', description='d', status='completed',
+                          start_date=long_ago - timedelta(days=365), end_date=long_ago, owner=pi,
+                          updated_at=datetime.combine(long_ago, datetime.min.time()))
+        db.session.add(project)
+        db.session.flush()
+        # Inserting a task applies counter deltas; the repair command recomputes them all
+        db.session.add(Task(title='Wrap up', project_id=project.id, created_by_id=pi.id, status='completed'))
+        db.session.commit()
+        Project.refresh_task_counters([project.id])
+        db.session.commit()
+        assert db.session.get(Project, project.id).updated_at.date() == long_ago
+
+        assert RetentionService.archive_projects(days=30) == 1
+        assert Project.query.count() == 0
+        assert ArchivedProject.query.count() == 1